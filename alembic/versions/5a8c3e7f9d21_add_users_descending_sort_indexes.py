@@ -0,0 +1,35 @@
+"""add DESC NULLS LAST indexes for descending user sorts
+
+Revision ID: 5a8c3e7f9d21
+Revises: 9e2b6d4f1c07
+Create Date: 2026-10-18 21:07:15.482903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a8c3e7f9d21'
+down_revision: Union[str, None] = '9e2b6d4f1c07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# A backward scan of an ascending index yields DESC NULLS FIRST, so descending
+# sorts on nullable columns, which keep NULLs last, need their own indexes.
+DESCENDING_INDEXES = (
+    ('ix_users_created_at_desc_id', 'created_at'),
+    ('ix_users_last_login_at_desc_id', 'last_login_at'),
+)
+
+
+def upgrade() -> None:
+    for name, column in DESCENDING_INDEXES:
+        op.create_index(name, 'users', [sa.text(f'{column} DESC NULLS LAST'), sa.text('id DESC')], unique=False)
+
+
+def downgrade() -> None:
+    for name, _ in reversed(DESCENDING_INDEXES):
+        op.drop_index(name, table_name='users')
@@ -0,0 +1,41 @@
+"""add trigram and prefix indexes for user search
+
+Revision ID: 7c4e1a9d2b35
+Revises: 3b9d2f4c8a11
+Create Date: 2026-10-18 14:03:27.541907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c4e1a9d2b35'
+down_revision: Union[str, None] = '3b9d2f4c8a11'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_COLUMNS = ('nickname', 'email', 'first_name', 'last_name')
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for column in SEARCH_COLUMNS:
+        # Trigram index for fuzzy matches (similarity and the % operator).
+        op.create_index(
+            f'ix_users_{column}_trgm', 'users', [sa.text(f'lower({column}) gin_trgm_ops')],
+            unique=False, postgresql_using='gin'
+        )
+        # B-tree index for lower(column) LIKE 'prefix%' regardless of collation.
+        op.create_index(
+            f'ix_users_{column}_prefix', 'users', [sa.text(f'lower({column}) text_pattern_ops')], unique=False
+        )
+
+
+def downgrade() -> None:
+    for column in SEARCH_COLUMNS:
+        op.drop_index(f'ix_users_{column}_prefix', table_name='users')
+        op.drop_index(f'ix_users_{column}_trgm', table_name='users')
+    # pg_trgm is left installed; other objects may depend on it.
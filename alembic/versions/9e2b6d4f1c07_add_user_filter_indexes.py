@@ -0,0 +1,39 @@
+"""add indexes for filtered and sorted user listings
+
+Revision ID: 9e2b6d4f1c07
+Revises: 7c4e1a9d2b35
+Create Date: 2026-10-18 16:21:48.309114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e2b6d4f1c07'
+down_revision: Union[str, None] = '7c4e1a9d2b35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Partial (created_at, id) indexes for the filters that select a small subset of users.
+PARTIAL_INDEXES = (
+    ('ix_users_locked_created_at_id', 'is_locked'),
+    ('ix_users_unverified_created_at_id', 'NOT email_verified'),
+    ('ix_users_professional_created_at_id', 'is_professional'),
+)
+
+
+def upgrade() -> None:
+    op.create_index('ix_users_role_created_at_id', 'users', ['role', 'created_at', 'id'], unique=False)
+    for name, condition in PARTIAL_INDEXES:
+        op.create_index(name, 'users', ['created_at', 'id'], unique=False, postgresql_where=sa.text(condition))
+    op.create_index('ix_users_last_login_at_id', 'users', ['last_login_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_last_login_at_id', table_name='users')
+    for name, _ in reversed(PARTIAL_INDEXES):
+        op.drop_index(name, table_name='users')
+    op.drop_index('ix_users_role_created_at_id', table_name='users')
@@ -1,21 +1,284 @@
+from builtins import Exception, ValueError, bool, classmethod, dict, enumerate, float, isinstance, len, next, range, staticmethod, str, zip
+import asyncio
+import contextlib
+import itertools
+import logging
+import math
+from typing import List, Optional
+from sqlalchemy import Select, TextClause, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import InvalidRequestError
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.utils.db_pool import TimedAsyncQueuePool
+from app.utils.metrics import instrument_engine
+from app.utils.read_your_writes import reads_from_primary
+from app.utils.sql_profiler import SQLProfiler
 
 Base = declarative_base()
+logger = logging.getLogger(__name__)
+
+# Replication delay on a PostgreSQL standby; 0 when it has replayed everything it received
+# (or when the server is not a standby at all).
+REPLICA_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+def _is_sqlite(database_url: str) -> bool:
+    return make_url(database_url).get_backend_name() == "sqlite"
+
+def _is_sqlite_memory(database_url: str) -> bool:
+    if not _is_sqlite(database_url):
+        return False
+    url = make_url(database_url)
+    return url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+
+def _is_read_only_statement(clause) -> bool:
+    if isinstance(clause, Select):
+        return True
+    if isinstance(clause, TextClause):
+        return clause.text.lstrip()[:6].upper().startswith(("SELECT", "SHOW"))
+    return False
+
+class RoutingSession(Session):
+    """
+    Session used for read endpoints.
+
+    Statements go to a healthy replica (the same one for the whole session) or,
+    when none is available, to the primary over a read-only connection. Writes,
+    including flushes, are rejected before they reach any database; the
+    read-only connections reject them again as a second line of defence.
+
+    A replica may trail the primary by up to the configured maximum lag. Clients
+    that wrote within that window read from the primary instead (see
+    ``ReadYourWritesMiddleware``), so they see their own writes; other clients
+    may still read rows that are up to that stale.
+    """
+    def get_bind(self, mapper=None, *, clause=None, **kw):
+        if self._flushing or (clause is not None and not _is_read_only_statement(clause)):
+            raise InvalidRequestError("Read-only session cannot execute writes; use a get_db session instead")
+        if "read_engine" not in self.info:
+            self.info["read_engine"] = Database._choose_read_engine().sync_engine
+        return self.info["read_engine"]
 
 class Database:
-    """Handles database connections and sessions."""
+    """
+    Handles database connections and sessions.
+
+    PostgreSQL (asyncpg) is the production database. ``sqlite+aiosqlite`` URLs
+    are supported for local runs, tests and benchmarks: a file database gets
+    its own pool with WAL journaling, while an in-memory database lives on a
+    single shared connection that the read-only sessions use as well.
+    """
     _engine = None
     _session_factory = None
+    _read_engine = None
+    _read_session_factory = None
+    _replica_engines: List = []
+    _replica_lag: List[float] = []
+    _replica_cycle = None
+    _max_replica_lag = 5.0
+    _lag_check_interval = 5.0
+    _lag_probe_timeout = 2.0
+    _lag_monitor = None
+    _pool_options: dict = {}
+    _profile_sql = False
 
     @classmethod
-    def initialize(cls, database_url: str, echo: bool = False):
-        """Initialize the async engine and sessionmaker."""
+    def initialize(cls, database_url: str, echo: bool = False, replica_urls: Optional[List[str]] = None,
+                   max_replica_lag: float = 5.0, lag_check_interval: float = 5.0, pool_options: Optional[dict] = None,
+                   profile_sql: bool = False, lag_probe_timeout: float = 2.0):
+        """
+        Initialize the async engines and sessionmakers.
+
+        Args:
+            database_url: URL of the primary database; all writes go here.
+            replica_urls: Optional read replicas used by read-only sessions.
+            max_replica_lag: Replicas further behind than this many seconds are skipped.
+            lag_check_interval: How often, in seconds, replica lag is re-measured in the background.
+            pool_options: Connection pool settings applied to every engine: ``pool_size``,
+                ``max_overflow``, ``pool_timeout``, ``pool_recycle``, ``pool_pre_ping`` and
+                the asyncpg ``statement_cache_size``. Each engine gets its own pool.
+            profile_sql: Attach the per-request SQL profiler to every engine.
+            lag_probe_timeout: Seconds a replica gets to answer a lag probe before it
+                is taken out of rotation.
+        """
         if cls._engine is None:  # Ensure engine is created once
-            cls._engine = create_async_engine(database_url, echo=echo, future=True)
+            cls._pool_options = dict(pool_options or {})
+            cls._profile_sql = profile_sql
+            cls._engine = cls._create_engine(database_url, echo, name="primary")
             cls._session_factory = sessionmaker(
                 bind=cls._engine, class_=AsyncSession, expire_on_commit=False, future=True
             )
+            if _is_sqlite_memory(database_url):
+                # A second engine would open a second, empty, in-memory database.
+                cls._read_engine = cls._engine
+            else:
+                cls._read_engine = cls._create_engine(database_url, echo, read_only=True, name="primary_read_only")
+            cls._replica_engines = [
+                cls._create_engine(url, echo, read_only=True, name=f"replica_{index}") for index, url in enumerate(replica_urls or [])
+            ]
+            # Replicas join the rotation once a first probe has measured them.
+            cls._replica_lag = [float("inf")] * len(cls._replica_engines)
+            cls._replica_cycle = itertools.count()
+            cls._max_replica_lag = max_replica_lag
+            cls._lag_check_interval = lag_check_interval
+            cls._lag_probe_timeout = lag_probe_timeout
+            cls._read_session_factory = sessionmaker(
+                class_=AsyncSession, sync_session_class=RoutingSession, expire_on_commit=False, future=True
+            )
+
+    @classmethod
+    def _create_engine(cls, database_url: str, echo: bool, read_only: bool = False, name: str = "primary"):
+        """Create an engine; ``name`` labels its pool in the stats and in the checkout wait metric."""
+        options = dict(cls._pool_options)
+        connect_args = cls._read_only_connect_args(database_url) if read_only else {}
+        statement_cache_size = options.pop("statement_cache_size", None)
+        if statement_cache_size is not None and make_url(database_url).drivername == "postgresql+asyncpg":
+            connect_args["statement_cache_size"] = statement_cache_size
+        if _is_sqlite_memory(database_url):
+            # Every connection to ":memory:" is a new database; keep exactly one.
+            connect_args["check_same_thread"] = False
+            engine = create_async_engine(database_url, echo=echo, future=True, poolclass=StaticPool, connect_args=connect_args)
+        else:
+            engine = create_async_engine(
+                database_url, echo=echo, future=True, poolclass=TimedAsyncQueuePool, pool_logging_name=name,
+                connect_args=connect_args, **options
+            )
+        if _is_sqlite(database_url):
+            cls._configure_sqlite(engine, database_url, read_only)
+        instrument_engine(engine)
+        if cls._profile_sql:
+            SQLProfiler.instrument(engine)
+        return engine
+
+    @staticmethod
+    def _configure_sqlite(engine, database_url: str, read_only: bool):
+        """
+        Set the SQLite pragmas every new connection needs.
+
+        WAL lets readers proceed while a write is in progress, and
+        ``query_only`` plays the part of PostgreSQL's read-only transactions
+        on the read engine.
+        """
+        pragmas = ["PRAGMA foreign_keys=ON"]
+        if not _is_sqlite_memory(database_url):
+            pragmas += ["PRAGMA journal_mode=WAL", "PRAGMA synchronous=NORMAL"]
+        if read_only:
+            pragmas.append("PRAGMA query_only=ON")
+
+        @event.listens_for(engine.sync_engine, "connect")
+        def set_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for pragma in pragmas:
+                cursor.execute(pragma)
+            cursor.close()
+
+    @classmethod
+    async def create_tables(cls):
+        """Create any missing tables; used for SQLite, where there are no migrations to run."""
+        async with cls._engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+
+    @classmethod
+    def is_sqlite(cls) -> bool:
+        return cls._engine is not None and cls._engine.dialect.name == "sqlite"
+
+    @classmethod
+    def get_pool_stats(cls) -> List[dict]:
+        """Occupancy and checkout wait histogram of every engine's connection pool."""
+        engines = [("primary", cls._engine)]
+        if cls._read_engine is not cls._engine:
+            engines.append(("primary_read_only", cls._read_engine))
+        engines += [(f"replica_{index}", engine) for index, engine in enumerate(cls._replica_engines)]
+        return [
+            {"name": name, **engine.pool.stats()}
+            for name, engine in engines
+            if engine is not None and isinstance(engine.pool, TimedAsyncQueuePool)
+        ]
+
+    @staticmethod
+    def _read_only_connect_args(database_url: str) -> dict:
+        """
+        Connection arguments that make every transaction on a connection read-only.
+
+        Setting it once per connection costs no extra round trip per transaction,
+        unlike issuing SET TRANSACTION READ ONLY at each BEGIN.
+        """
+        if make_url(database_url).drivername == "postgresql+asyncpg":
+            return {"server_settings": {"default_transaction_read_only": "on"}}
+        return {}
+
+    @classmethod
+    def _choose_read_engine(cls):
+        """
+        Pick the next replica within the lag limit, round robin, or fall back to the primary.
+
+        Requests from a client that has just written always use the primary.
+        """
+        if reads_from_primary():
+            return cls._read_engine
+        healthy = [engine for engine, lag in zip(cls._replica_engines, cls._replica_lag) if lag <= cls._max_replica_lag]
+        if not healthy:
+            return cls._read_engine
+        return healthy[next(cls._replica_cycle) % len(healthy)]
+
+    @classmethod
+    async def refresh_replica_lag(cls):
+        """Probe every replica at once; one that fails or times out leaves the rotation."""
+        await asyncio.gather(*(cls._probe_replica(index) for index in range(len(cls._replica_engines))))
+
+    @classmethod
+    async def _probe_replica(cls, index: int):
+        try:
+            cls._replica_lag[index] = await asyncio.wait_for(
+                cls._measure_lag(cls._replica_engines[index]), timeout=cls._lag_probe_timeout
+            )
+        except Exception as e:
+            logger.warning(f"Replica {index} unavailable, reading from the primary instead: {e!r}")
+            cls._replica_lag[index] = float("inf")
+
+    @staticmethod
+    async def _measure_lag(engine) -> float:
+        async with engine.connect() as connection:
+            if connection.dialect.name == "postgresql":
+                return float((await connection.execute(REPLICA_LAG_QUERY)).scalar())
+            await connection.execute(text("SELECT 1"))
+            return 0.0
+
+    @classmethod
+    def start_lag_monitor(cls):
+        """Re-measure replica lag every check interval in a background task, off the request path."""
+        if cls._replica_engines and cls._lag_monitor is None:
+            cls._lag_monitor = asyncio.get_running_loop().create_task(cls._monitor_replica_lag())
+
+    @classmethod
+    async def _monitor_replica_lag(cls):
+        while True:
+            await cls.refresh_replica_lag()
+            await asyncio.sleep(cls._lag_check_interval)
+
+    @classmethod
+    async def stop_lag_monitor(cls):
+        monitor, cls._lag_monitor = cls._lag_monitor, None
+        if monitor is not None:
+            monitor.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await monitor
+
+    @classmethod
+    def get_replica_status(cls) -> List[dict]:
+        """
+        Return the last measured lag of each replica and whether it is in rotation.
+
+        The lag is None for a replica that has not answered a probe yet or failed the last one.
+        """
+        return [
+            {"replica": index, "lag_seconds": lag if math.isfinite(lag) else None, "healthy": lag <= cls._max_replica_lag}
+            for index, lag in enumerate(cls._replica_lag)
+        ]
 
     @classmethod
     def get_session_factory(cls):
@@ -23,3 +286,10 @@ class Database:
         if cls._session_factory is None:
             raise ValueError("Database not initialized. Call `initialize()` first.")
         return cls._session_factory
+
+    @classmethod
+    def get_read_session_factory(cls):
+        """Returns the factory for read-only (replica-routed) sessions, ensuring it's initialized."""
+        if cls._read_session_factory is None:
+            raise ValueError("Database not initialized. Call `initialize()` first.")
+        return cls._read_session_factory
@@ -5,7 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import Database
 from app.utils.template_manager import TemplateManager
 from app.services.email_service import EmailService
-from app.services.jwt_service import decode_token
+from app.services.jwt_service import decode_token_cached
 from settings.config import Settings
 from fastapi import Depends
 
@@ -25,7 +25,24 @@ async def get_db() -> AsyncSession:
             yield session
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
-        
+
+async def get_read_db() -> AsyncSession:
+    """
+    Dependency that provides a read-only database session for GET endpoints.
+
+    Reads are served by a read replica when one is configured and not lagging,
+    otherwise by the primary. Nothing is committed; the transaction simply ends
+    when the session closes. A replica can be up to ``replica_max_lag_seconds``
+    behind, so a client that wrote within that window reads from the primary
+    (see ``ReadYourWritesMiddleware``); other clients may see older data.
+    """
+    async_session_factory = Database.get_read_session_factory()
+    async with async_session_factory() as session:
+        try:
+            yield session
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
 
@@ -35,7 +52,7 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    payload = decode_token(token)
+    payload = decode_token_cached(token)
     if payload is None:
         raise credentials_exception
     user_id: str = payload.get("sub")
@@ -3,8 +3,15 @@ from fastapi import FastAPI
 from starlette.responses import JSONResponse
 from app.database import Database
 from app.dependencies import get_settings
-from app.routers import user_routes
+from app.routers import admin_routes, metrics_routes, user_routes
+from app.services.user_service import UserService
 from app.utils.api_description import getDescription
+from app.utils.metrics import MetricsMiddleware
+from app.utils.rate_limit import RateLimitMiddleware, create_rate_limiter
+from app.utils.read_your_writes import ReadYourWritesMiddleware
+from app.utils.sql_profiler import SQLProfiler, SQLProfilerMiddleware
+from app.utils.security import shutdown_hashing_pool
+from app.utils.smtp_connection import SMTPClient
 app = FastAPI(
     title="User Management",
     description=getDescription(),
@@ -17,15 +24,70 @@ app = FastAPI(
     license_info={"name": "MIT", "url": "https://opensource.org/licenses/MIT"},
 )
 
+_settings = get_settings()
+rate_limiter = create_rate_limiter(
+    _settings.rate_limit_backend,
+    _settings.rate_limit_ip_rules,
+    _settings.rate_limit_email_rules,
+    trusted_proxies=_settings.rate_limit_trusted_proxies,
+    sqlite_path=_settings.rate_limit_sqlite_path,
+)
+if _settings.sql_profiler_enabled:
+    SQLProfiler.configure(
+        slow_query_seconds=_settings.sql_slow_query_seconds,
+        explain_slow_queries=_settings.sql_explain_slow_queries,
+        repeat_threshold=_settings.sql_repeated_statement_threshold,
+    )
+    app.add_middleware(SQLProfilerMiddleware, expose_headers=_settings.debug)
+# Clients that just wrote read from the primary until the replicas have caught up.
+if _settings.database_replica_urls:
+    app.add_middleware(ReadYourWritesMiddleware, window_seconds=_settings.replica_max_lag_seconds)
+if _settings.rate_limit_enabled:
+    app.add_middleware(RateLimitMiddleware, limiter=rate_limiter)
+# Added last so it is the outermost layer and also times rejected requests.
+if _settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
 @app.on_event("startup")
 async def startup_event():
     settings = get_settings()
-    Database.initialize(settings.database_url, settings.debug)
+    Database.initialize(
+        settings.database_url,
+        settings.debug,
+        replica_urls=settings.database_replica_urls,
+        max_replica_lag=settings.replica_max_lag_seconds,
+        lag_check_interval=settings.replica_lag_check_interval_seconds,
+        pool_options={
+            "pool_size": settings.db_pool_size,
+            "max_overflow": settings.db_max_overflow,
+            "pool_timeout": settings.db_pool_timeout,
+            "pool_recycle": settings.db_pool_recycle,
+            "pool_pre_ping": settings.db_pool_pre_ping,
+            "statement_cache_size": settings.db_statement_cache_size,
+        },
+        profile_sql=settings.sql_profiler_enabled,
+        lag_probe_timeout=settings.replica_lag_probe_timeout_seconds,
+    )
+    Database.start_lag_monitor()
+    # PostgreSQL schemas are managed by Alembic; a SQLite database is created in place.
+    if Database.is_sqlite():
+        await Database.create_tables()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await Database.stop_lag_monitor()
+    shutdown_hashing_pool()
+    SMTPClient.close_pools()
+    await UserService.close_user_cache()
+    rate_limiter.close()
 
 @app.exception_handler(Exception)
 async def exception_handler(request, exc):
     return JSONResponse(status_code=500, content={"message": "An unexpected error occurred."})
 
 app.include_router(user_routes.router)
+app.include_router(admin_routes.router)
+if _settings.metrics_enabled:
+    app.include_router(metrics_routes.router)
 
 
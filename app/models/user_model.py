@@ -3,11 +3,11 @@ from datetime import datetime
 from enum import Enum
 import uuid
 from sqlalchemy import (
-    Column, String, Integer, DateTime, Boolean, func, Enum as SQLAlchemyEnum
+    Column, String, Integer, Boolean, Index, Uuid, text, Enum as SQLAlchemyEnum
 )
-from sqlalchemy.dialects.postgresql import UUID, ENUM
 from sqlalchemy.orm import Mapped, mapped_column
 from app.database import Base
+from app.utils.db_types import UTCDateTime, utcnow
 
 class UserRole(Enum):
     """Enumeration of user roles within the application, stored as ENUM in the database."""
@@ -52,8 +52,24 @@ class User(Base):
     """
     __tablename__ = "users"
     __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = (
+        # Keyset pagination walks users in (created_at, id) order.
+        Index("ix_users_created_at_id", "created_at", "id"),
+        # Filtered listings: by role, and the small locked / unverified / professional subsets.
+        Index("ix_users_role_created_at_id", "role", "created_at", "id"),
+        Index("ix_users_locked_created_at_id", "created_at", "id", postgresql_where=text("is_locked"), sqlite_where=text("is_locked")),
+        Index("ix_users_unverified_created_at_id", "created_at", "id", postgresql_where=text("NOT email_verified"), sqlite_where=text("NOT email_verified")),
+        Index("ix_users_professional_created_at_id", "created_at", "id", postgresql_where=text("is_professional"), sqlite_where=text("is_professional")),
+        # Sorting by last login; email and nickname sorts use their unique indexes.
+        Index("ix_users_last_login_at_id", "last_login_at", "id"),
+        # Descending sorts keep NULLs last, which a backward scan of the indexes above
+        # cannot produce (it yields DESC NULLS FIRST). SQLite already sorts NULLs first
+        # ascending and last descending, so these are PostgreSQL-only.
+        Index("ix_users_created_at_desc_id", text("created_at DESC NULLS LAST"), text("id DESC")).ddl_if(dialect="postgresql"),
+        Index("ix_users_last_login_at_desc_id", text("last_login_at DESC NULLS LAST"), text("id DESC")).ddl_if(dialect="postgresql"),
+    )
 
-    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
     nickname: Mapped[str] = Column(String(50), unique=True, nullable=False, index=True)
     email: Mapped[str] = Column(String(255), unique=True, nullable=False, index=True)
     first_name: Mapped[str] = Column(String(100), nullable=True)
@@ -64,12 +80,12 @@ class User(Base):
     github_profile_url: Mapped[str] = Column(String(255), nullable=True)
     role: Mapped[UserRole] = Column(SQLAlchemyEnum(UserRole, name='UserRole', create_constraint=False), default=UserRole.ANONYMOUS, nullable=False)
     is_professional: Mapped[bool] = Column(Boolean, default=False)
-    professional_status_updated_at: Mapped[datetime] = Column(DateTime(timezone=True), nullable=True)
-    last_login_at: Mapped[datetime] = Column(DateTime(timezone=True), nullable=True)
+    professional_status_updated_at: Mapped[datetime] = Column(UTCDateTime, nullable=True)
+    last_login_at: Mapped[datetime] = Column(UTCDateTime, nullable=True)
     failed_login_attempts: Mapped[int] = Column(Integer, default=0)
     is_locked: Mapped[bool] = Column(Boolean, default=False)
-    created_at: Mapped[datetime] = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at: Mapped[datetime] = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    created_at: Mapped[datetime] = Column(UTCDateTime, server_default=utcnow())
+    updated_at: Mapped[datetime] = Column(UTCDateTime, server_default=utcnow(), onupdate=utcnow())
     verification_token = Column(String, nullable=True)
     email_verified: Mapped[bool] = Column(Boolean, default=False, nullable=False)
     hashed_password: Mapped[str] = Column(String(255), nullable=False)
@@ -94,4 +110,4 @@ class User(Base):
     def update_professional_status(self, status: bool):
         """Updates the professional status and logs the update time."""
         self.is_professional = status
-        self.professional_status_updated_at = func.now()
+        self.professional_status_updated_at = utcnow()
@@ -0,0 +1,53 @@
+"""
+Operational endpoints for administrators.
+
+These expose runtime internals such as connection pool usage and cache hit
+ratios, so pool and cache sizes can be tuned from measurements instead of guesses.
+"""
+
+from builtins import dict
+from fastapi import APIRouter, Depends
+from fastapi.security import OAuth2PasswordBearer
+from app.database import Database
+from app.dependencies import get_settings, require_role
+from app.schemas.cache_schema import CacheStatsResponse, TokenCacheStatsResponse
+from app.schemas.pool_schema import PoolStatsResponse, ReplicaStatusResponse
+from app.services.jwt_service import get_token_cache_stats
+from app.services.user_service import UserService
+
+router = APIRouter()
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
+
+@router.get("/admin/db-pool", response_model=PoolStatsResponse, name="db_pool_stats", tags=["Administration Requires (Admin Role)"])
+async def db_pool_stats(token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN"]))):
+    """
+    Report connection pool usage for every database engine in this worker.
+
+    Each pool lists its idle and checked-out connections, current overflow and a
+    cumulative histogram of how long checkouts waited for a connection.
+    """
+    return PoolStatsResponse(pools=Database.get_pool_stats())
+
+@router.get("/admin/db-replicas", response_model=ReplicaStatusResponse, name="db_replica_status", tags=["Administration Requires (Admin Role)"])
+async def db_replica_status(token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN"]))):
+    """
+    Report the last measured lag of each read replica and whether reads are routed to it.
+
+    Lag is re-measured in the background every `replica_lag_check_interval_seconds`;
+    replicas lagging more than `replica_max_lag_seconds` are skipped.
+    """
+    return ReplicaStatusResponse(replicas=Database.get_replica_status())
+
+@router.get("/admin/user-cache", response_model=CacheStatsResponse, name="user_cache_stats", tags=["Administration Requires (Admin Role)"])
+async def user_cache_stats(token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN"]))):
+    """
+    Report how often this worker's user lookups were served from the user cache.
+    """
+    return CacheStatsResponse(backend=get_settings().user_cache_backend, **UserService.get_user_cache_stats())
+
+@router.get("/admin/token-cache", response_model=TokenCacheStatsResponse, name="token_cache_stats", tags=["Administration Requires (Admin Role)"])
+async def token_cache_stats(token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN"]))):
+    """
+    Report how often this worker accepted a bearer token from the verified-token cache.
+    """
+    return TokenCacheStatsResponse(**get_token_cache_stats())
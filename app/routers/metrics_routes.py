@@ -0,0 +1,17 @@
+"""
+Prometheus scrape endpoint.
+
+The endpoint is unauthenticated so a scraper needs no token; restrict it to
+the monitoring network at the proxy if the API is exposed publicly.
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import Response
+from app.utils.metrics import PROMETHEUS_CONTENT_TYPE, render_metrics
+
+router = APIRouter()
+
+@router.get("/metrics", include_in_schema=False, name="metrics")
+async def metrics():
+    """Request latency, in-flight requests and dependency timings of this worker, in Prometheus text format."""
+    return Response(content=render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -18,41 +18,144 @@ Key Highlights:
 - Utilizes OAuth2PasswordBearer for securing API endpoints, requiring valid access tokens for operations.
 """
 
-from builtins import dict, int, len, str
-from datetime import timedelta
+from builtins import bool, dict, int, len, list, set, sorted, str, zip
+from datetime import datetime, timedelta
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Response, status, Request
+from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response, status, Request
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.dependencies import get_current_user, get_db, get_email_service, require_role
+from app.database import Database
+from app.dependencies import get_current_user, get_db, get_email_service, get_read_db, require_role
+from app.models.user_model import UserRole
 from app.schemas.pagination_schema import EnhancedPagination
 from app.schemas.token_schema import TokenResponse
-from app.schemas.user_schemas import LoginRequest, UserBase, UserCreate, UserListResponse, UserResponse, UserUpdate
-from app.services.user_service import UserService
+from app.schemas.user_schemas import UserRole as UserRoleSchema
+from app.schemas.user_schemas import BulkImportError, BulkImportResponse, LoginRequest, UserBase, UserCreate, UserListPage, UserListResponse, UserResponse, UserSearchPage, UserSearchResponse, UserUpdate
+from app.services.user_service import DEFAULT_SORT, EXPORT_COLUMNS, LIST_COLUMNS, UserFilters, UserService
 from app.services.jwt_service import create_access_token
-from app.utils.link_generation import create_user_links, generate_pagination_links
+from app.utils.bulk_import import FORMAT_CSV, detect_format, iter_csv_rows, iter_ndjson_rows
+from app.utils.etag import if_none_match, make_etag, versions_from_if_match
+from app.utils.export import EXPORT_MEDIA_TYPES, encode_rows
+from app.utils.link_generation import create_user_links, generate_cursor_pagination_links, generate_pagination_links, generate_search_links
 from app.dependencies import get_settings
 from app.services.email_service import EmailService
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 settings = get_settings()
+
+# List pages go from projected rows straight to JSON through one cached
+# serializer, instead of validating each item and then the whole response again.
+user_list_adapter = TypeAdapter(UserListPage)
+user_search_adapter = TypeAdapter(UserSearchPage)
+
+def user_list_items(rows) -> list:
+    """Projected rows as item dicts, with the model's role converted to the schema enum."""
+    keys = rows[0]._fields if rows else ()
+    items = [dict(zip(keys, row)) for row in rows]
+    for item in items:
+        item["role"] = UserRoleSchema(item["role"].value)
+    return items
+
+def user_list_response(rows, total: int, total_strategy: str, links: list, page: Optional[int] = None) -> Response:
+    body = user_list_adapter.dump_json({
+        "items": user_list_items(rows),
+        "total": total,
+        "total_strategy": total_strategy,
+        "page": page,
+        "size": len(rows),
+        "links": links,
+    })
+    return Response(content=body, media_type="application/json")
+
+@router.get("/users/export", name="export_users", response_class=StreamingResponse, tags=["User Management Requires (Admin or Manager Roles)"])
+async def export_users(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$", description="ndjson or csv."),
+    token: str = Depends(oauth2_scheme),
+    current_user: dict = Depends(require_role(["ADMIN"]))
+):
+    """
+    Stream every user as NDJSON or CSV.
+
+    Only the exported columns are selected, and rows are read from a server-side
+    cursor in batches of `export_batch_size`. The next batch is fetched only once
+    the previous one has been written to the client, so a slow client slows the
+    export down instead of growing server memory.
+    """
+    columns = [column.key for column in EXPORT_COLUMNS]
+
+    async def export_chunks():
+        # The session lives inside the stream: request dependencies are closed before the body is sent.
+        async with Database.get_read_session_factory()() as session:
+            partitions = UserService.stream_export(session, settings.export_batch_size)
+            async for chunk in encode_rows(columns, partitions, export_format):
+                yield chunk
+
+    return StreamingResponse(
+        export_chunks(),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="users.{export_format}"'},
+    )
+
+@router.get("/users/search", response_model=UserSearchResponse, name="search_users", tags=["User Management Requires (Admin or Manager Roles)"])
+async def search_users(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=100, description="Text to match against nickname, email, first and last name."),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the previous page's next link."),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))
+):
+    """
+    Find users by nickname, email, first or last name, best matches first.
+
+    Prefix matches always count; when the database has pg_trgm, similar
+    spellings match too. Results are keyset-paginated through the `next` link.
+    """
+    try:
+        rows, next_cursor = await UserService.search_users(db, q, limit, cursor)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+    body = user_search_adapter.dump_json({
+        "items": user_list_items(rows),
+        "size": len(rows),
+        "links": generate_search_links(request, limit, cursor, next_cursor),
+    })
+    return Response(content=body, media_type="application/json")
+
 @router.get("/users/{user_id}", response_model=UserResponse, name="get_user", tags=["User Management Requires (Admin or Manager Roles)"])
-async def get_user(user_id: UUID, request: Request, db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
+async def get_user(user_id: UUID, request: Request, response: Response, db: AsyncSession = Depends(get_read_db), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
     """
     Endpoint to fetch a user by their unique identifier (UUID).
 
     Utilizes the UserService to query the database asynchronously for the user and constructs a response
     model that includes the user's details along with HATEOAS links for possible next actions.
 
+    The response carries a strong ETag. A request whose If-None-Match holds the
+    current tag gets 304 after a version lookup, without loading the profile.
+
     Args:
         user_id: UUID of the user to fetch.
         request: The request object, used to generate full URLs in the response.
+        response: The response, used to set the ETag header.
         db: Dependency that provides an AsyncSession for database access.
         token: The OAuth2 access token obtained through OAuth2PasswordBearer dependency.
     """
-    user = await UserService.get_by_id(db, user_id)
+    if_none_match_header = request.headers.get("if-none-match")
+    if if_none_match_header:
+        version = await UserService.get_version(db, user_id)
+        if version is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+        etag = make_etag(user_id, version)
+        if if_none_match(if_none_match_header, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    user = await UserService.get_snapshot_by_id(db, user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    response.headers["ETag"] = make_etag(user.id, user.updated_at)
 
     return UserResponse.model_construct(
         id=user.id,
@@ -79,17 +182,23 @@ async def get_user(user_id: UUID, request: Request, db: AsyncSession = Depends(g
 # experience by adhering to REST principles and providing self-discoverable operations.
 
 @router.put("/users/{user_id}", response_model=UserResponse, name="update_user", tags=["User Management Requires (Admin or Manager Roles)"])
-async def update_user(user_id: UUID, user_update: UserUpdate, request: Request, db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
+async def update_user(user_id: UUID, user_update: UserUpdate, request: Request, response: Response, db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
     """
     Update user information.
 
     - **user_id**: UUID of the user to update.
     - **user_update**: UserUpdate model with updated user information.
+    - **If-Match** (header, optional): ETag from a previous read; if the user has changed since, the update is rejected with 412.
     """
     user_data = user_update.model_dump(exclude_unset=True)
-    updated_user = await UserService.update(db, user_id, user_data)
+    versions = versions_from_if_match(request.headers.get("if-match"), user_id)
+    outcome = await UserService.update_if_match(db, user_id, user_data, versions)
+    if outcome.precondition_failed:
+        raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail="User was modified by another request")
+    updated_user = outcome.user
     if not updated_user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    response.headers["ETag"] = make_etag(updated_user.id, updated_user.updated_at)
 
     return UserResponse.model_construct(
         id=updated_user.id,
@@ -139,7 +248,7 @@ async def create_user(user: UserCreate, request: Request, db: AsyncSession = Dep
     Returns:
     - UserResponse: The newly created user's information along with navigation links.
     """
-    existing_user = await UserService.get_by_email(db, user.email)
+    existing_user = await UserService.get_snapshot_by_email(db, user.email)
     if existing_user:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already exists")
     
@@ -163,30 +272,96 @@ async def create_user(user: UserCreate, request: Request, db: AsyncSession = Dep
     )
 
 
+@router.post("/users/bulk", response_model=BulkImportResponse, name="bulk_create_users", tags=["User Management Requires (Admin or Manager Roles)"])
+async def bulk_create_users(request: Request, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_db), email_service: EmailService = Depends(get_email_service), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN"]))):
+    """
+    Create many users from one upload.
+
+    The body is streamed as newline-delimited JSON (`application/x-ndjson`) or CSV
+    with a header row (`text/csv`); each row takes the same fields as `POST /users/`.
+    Rows are processed in batches of `bulk_import_batch_size`: validated, checked for
+    existing emails in one query, hashed in parallel and inserted with one batched
+    INSERT. Verification emails are sent in the background after the response.
+
+    Invalid rows do not stop the import; they are reported with their row number.
+    """
+    import_format = detect_format(request.headers.get("content-type", ""))
+    if import_format is None:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="Upload must be application/x-ndjson or text/csv")
+    parse_rows = iter_csv_rows if import_format == FORMAT_CSV else iter_ndjson_rows
+
+    received, created = 0, 0
+    errors, batch, seen_emails = [], [], set()
+
+    async def import_batch():
+        nonlocal created
+        new_users, failed_rows = await UserService.create_many(db, batch, seen_emails)
+        created += len(new_users)
+        errors.extend(BulkImportError(row=row.row, email=row.email, errors=row.errors) for row in failed_rows)
+        if new_users:
+            background_tasks.add_task(email_service.send_verification_emails, new_users)
+        batch.clear()
+
+    async for row_number, data, error in parse_rows(request.stream()):
+        if row_number > settings.bulk_import_max_rows:
+            errors.append(BulkImportError(row=row_number, errors=[f"Row limit of {settings.bulk_import_max_rows} exceeded; remaining rows were not imported"]))
+            break
+        received = row_number
+        if error:
+            errors.append(BulkImportError(row=row_number, errors=[error]))
+            continue
+        batch.append((row_number, data))
+        if len(batch) >= settings.bulk_import_batch_size:
+            await import_batch()
+    if batch:
+        await import_batch()
+
+    return BulkImportResponse(received=received, created=created, failed=len(errors), errors=sorted(errors, key=lambda error: error.row))
+
+
 @router.get("/users/", response_model=UserListResponse, tags=["User Management Requires (Admin or Manager Roles)"])
 async def list_users(
     request: Request,
     skip: int = 0,
     limit: int = 10,
-    db: AsyncSession = Depends(get_db),
+    pagination: str = Query("offset", pattern="^(offset|cursor)$", description="Use 'cursor' for keyset pagination."),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next/prev link; implies cursor pagination."),
+    count: str = Query("exact", pattern="^(exact|cached|estimated)$", description="How to compute total: exact, cached (TTL) or estimated (planner statistics)."),
+    role: Optional[UserRole] = Query(None, description="Only users with this role."),
+    email_verified: Optional[bool] = Query(None, description="Only users whose email is (or is not) verified."),
+    is_locked: Optional[bool] = Query(None, description="Only locked (or unlocked) accounts."),
+    is_professional: Optional[bool] = Query(None, description="Only users with (or without) professional status."),
+    created_after: Optional[datetime] = Query(None, description="Only users created at or after this time."),
+    created_before: Optional[datetime] = Query(None, description="Only users created before this time."),
+    sort: str = Query(DEFAULT_SORT, pattern="^-?(created_at|email|nickname|last_login_at)$", description="Sort key; prefix with '-' for descending. Cursor pagination supports created_at only."),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))
 ):
-    total_users = await UserService.count(db)
-    users = await UserService.list_users(db, skip, limit)
+    filters = UserFilters(role, email_verified, is_locked, is_professional, created_after, created_before)
+    if cursor is not None or pagination == "cursor":
+        if sort != DEFAULT_SORT:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Cursor pagination only supports sort={DEFAULT_SORT}")
+        total_users, total_strategy = await UserService.total_users(db, count, filters)
+        try:
+            rows, next_cursor, prev_cursor = await UserService.list_users_keyset(db, limit, cursor, columns=LIST_COLUMNS, filters=filters)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+        return user_list_response(
+            rows,
+            total=total_users,
+            total_strategy=total_strategy,
+            links=generate_cursor_pagination_links(request, limit, cursor, next_cursor, prev_cursor)
+        )
 
-    user_responses = [
-        UserResponse.model_validate(user) for user in users
-    ]
-    
-    pagination_links = generate_pagination_links(request, skip, limit, total_users)
-    
-    # Construct the final response with pagination details
-    return UserListResponse(
-        items=user_responses,
+    rows, total_users, total_strategy = await UserService.list_users_with_total(
+        db, skip, limit, count, columns=LIST_COLUMNS, filters=filters, sort=sort
+    )
+    return user_list_response(
+        rows,
         total=total_users,
+        total_strategy=total_strategy,
         page=skip // limit + 1,
-        size=len(user_responses),
-        links=pagination_links  # Ensure you have appropriate logic to create these links
+        links=generate_pagination_links(request, skip, limit, total_users)
     )
 
 
@@ -199,10 +374,11 @@ async def register(user_data: UserCreate, session: AsyncSession = Depends(get_db
 
 @router.post("/login/", response_model=TokenResponse, tags=["Login and Registration"])
 async def login(form_data: OAuth2PasswordRequestForm = Depends(), session: AsyncSession = Depends(get_db)):
-    if await UserService.is_account_locked(session, form_data.username):
+    outcome = await UserService.authenticate(session, form_data.username, form_data.password)
+    if outcome.locked:
         raise HTTPException(status_code=400, detail="Account locked due to too many failed login attempts.")
 
-    user = await UserService.login_user(session, form_data.username, form_data.password)
+    user = outcome.account
     if user:
         access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
 
@@ -216,10 +392,11 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), session: Async
 
 @router.post("/login/", include_in_schema=False, response_model=TokenResponse, tags=["Login and Registration"])
 async def login(form_data: OAuth2PasswordRequestForm = Depends(), session: AsyncSession = Depends(get_db)):
-    if await UserService.is_account_locked(session, form_data.username):
+    outcome = await UserService.authenticate(session, form_data.username, form_data.password)
+    if outcome.locked:
         raise HTTPException(status_code=400, detail="Account locked due to too many failed login attempts.")
 
-    user = await UserService.login_user(session, form_data.username, form_data.password)
+    user = outcome.account
     if user:
         access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
 
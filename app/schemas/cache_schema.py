@@ -0,0 +1,28 @@
+from builtins import float, int
+from typing import Optional
+from pydantic import BaseModel, Field
+
+class CacheStatsResponse(BaseModel):
+    backend: str = Field(..., description="Configured cache backend: memory, redis or none.")
+    hits: int = Field(..., description="Lookups answered from the cache by this worker.")
+    misses: int = Field(..., description="Lookups that fell through to the database.")
+    hit_ratio: float = Field(..., description="hits / (hits + misses); 0 before the first lookup.")
+    evictions: int = Field(..., description="Entries dropped to stay within the size limit.")
+    size: Optional[int] = Field(None, description="Entries currently held; null when the store cannot tell cheaply.")
+
+    class Config:
+        json_schema_extra = {
+            "example": {"backend": "memory", "hits": 940, "misses": 60, "hit_ratio": 0.94, "evictions": 0, "size": 57}
+        }
+
+class TokenCacheStatsResponse(BaseModel):
+    hits: int = Field(..., description="Bearer tokens accepted from the verified-token cache by this worker.")
+    misses: int = Field(..., description="Tokens that had to be decoded and verified.")
+    hit_ratio: float = Field(..., description="hits / (hits + misses); 0 before the first lookup.")
+    size: int = Field(..., description="Verified tokens currently cached.")
+    max_size: int = Field(..., description="Configured token_cache_size.")
+
+    class Config:
+        json_schema_extra = {
+            "example": {"hits": 1880, "misses": 120, "hit_ratio": 0.94, "size": 97, "max_size": 4096}
+        }
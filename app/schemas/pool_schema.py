@@ -0,0 +1,63 @@
+from builtins import bool, float, int, str
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+class WaitBucket(BaseModel):
+    le: Optional[float] = Field(..., description="Upper bound of the bucket in seconds (cumulative); null for the unbounded last bucket.")
+    count: int = Field(..., description="Checkouts that waited at most `le` seconds.")
+
+class CheckoutWait(BaseModel):
+    count: int = Field(..., description="Number of connection checkouts recorded.")
+    sum_seconds: float = Field(..., description="Total time spent waiting for connections.")
+    timeouts: int = Field(..., description="Checkouts that gave up after pool_timeout.")
+    buckets: List[WaitBucket]
+
+class PoolStats(BaseModel):
+    name: str = Field(..., description="Engine the pool belongs to: primary, primary_read_only or replica_<n>.")
+    size: int = Field(..., description="Configured pool size.")
+    checked_in: int = Field(..., description="Idle connections in the pool.")
+    checked_out: int = Field(..., description="Connections currently in use.")
+    overflow: int = Field(..., description="Connections open beyond the pool size.")
+    max_overflow: int = Field(..., description="Configured overflow limit.")
+    checkout_wait: CheckoutWait
+
+class PoolStatsResponse(BaseModel):
+    pools: List[PoolStats]
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "pools": [{
+                    "name": "primary",
+                    "size": 5,
+                    "checked_in": 3,
+                    "checked_out": 2,
+                    "overflow": 0,
+                    "max_overflow": 10,
+                    "checkout_wait": {
+                        "count": 120,
+                        "sum_seconds": 0.042,
+                        "timeouts": 0,
+                        "buckets": [{"le": 0.001, "count": 117}, {"le": 0.025, "count": 120}]
+                    }
+                }]
+            }
+        }
+
+class ReplicaStatus(BaseModel):
+    replica: int = Field(..., description="Position of the replica in database_replica_urls.")
+    lag_seconds: Optional[float] = Field(..., description="Last measured replication lag; null until the replica answers a probe, or after it fails one.")
+    healthy: bool = Field(..., description="Whether read sessions are currently routed to this replica.")
+
+class ReplicaStatusResponse(BaseModel):
+    replicas: List[ReplicaStatus]
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "replicas": [
+                    {"replica": 0, "lag_seconds": 0.2, "healthy": True},
+                    {"replica": 1, "lag_seconds": None, "healthy": False}
+                ]
+            }
+        }
@@ -1,11 +1,13 @@
-from builtins import ValueError, any, bool, str
+from builtins import ValueError, any, bool, int, str
 from pydantic import BaseModel, EmailStr, Field, validator, root_validator
 from typing import Optional, List
+from typing_extensions import TypedDict
 from datetime import datetime
 from enum import Enum
 import uuid
 import re
 
+from app.schemas.pagination_schema import PaginationLink
 from app.utils.nickname_gen import generate_nickname
 
 class UserRole(str, Enum):
@@ -122,5 +124,36 @@ class UserListResponse(BaseModel):
         "github_profile_url": "https://github.com/johndoe"
     }])
     total: int = Field(..., example=100)
-    page: int = Field(..., example=1)
+    total_strategy: str = Field("exact", example="exact", description="How total was computed: exact, cached or estimated.")
+    page: Optional[int] = Field(None, example=1, description="Page number for offset pagination; null in cursor mode.")
     size: int = Field(..., example=10)
+    links: List[PaginationLink] = Field(default_factory=list)
+
+class BulkImportError(BaseModel):
+    row: int = Field(..., example=3, description="1-based position of the row in the upload, not counting a CSV header.")
+    email: Optional[str] = Field(None, example="john.doe@example.com")
+    errors: List[str] = Field(..., example=["Email already exists"])
+
+class BulkImportResponse(BaseModel):
+    received: int = Field(..., example=1000, description="Rows read from the upload.")
+    created: int = Field(..., example=998)
+    failed: int = Field(..., example=2)
+    errors: List[BulkImportError] = Field(default_factory=list)
+
+class UserSearchResponse(BaseModel):
+    items: List[UserResponse] = Field(..., description="Matches, best first.")
+    size: int = Field(..., example=10)
+    links: List[PaginationLink] = Field(default_factory=list, description="self, and next while more matches remain.")
+
+# Plain-dict mirrors of UserResponse and the list and search responses. Pages
+# are serialized from projected rows through these, so items are neither built
+# as models nor validated; the JSON matches the model schemas.
+UserListItem = TypedDict("UserListItem", {name: field.annotation for name, field in UserResponse.model_fields.items()})
+UserListPage = TypedDict("UserListPage", {
+    **{name: field.annotation for name, field in UserListResponse.model_fields.items()},
+    "items": List[UserListItem],
+})
+UserSearchPage = TypedDict("UserSearchPage", {
+    **{name: field.annotation for name, field in UserSearchResponse.model_fields.items()},
+    "items": List[UserListItem],
+})
@@ -1,10 +1,17 @@
 # email_service.py
 from builtins import ValueError, dict, str
+from typing import List
 from settings.config import settings
 from app.utils.smtp_connection import SMTPClient
 from app.utils.template_manager import TemplateManager
 from app.models.user_model import User
 
+EMAIL_SUBJECTS = {
+    'email_verification': "Verify Your Account",
+    'password_reset': "Password Reset Instructions",
+    'account_locked': "Account Locked Notification"
+}
+
 class EmailService:
     def __init__(self, template_manager: TemplateManager):
         self.smtp_client = SMTPClient(
@@ -16,22 +23,29 @@ class EmailService:
         self.template_manager = template_manager
 
     async def send_user_email(self, user_data: dict, email_type: str):
-        subject_map = {
-            'email_verification': "Verify Your Account",
-            'password_reset': "Password Reset Instructions",
-            'account_locked': "Account Locked Notification"
-        }
-
-        if email_type not in subject_map:
+        if email_type not in EMAIL_SUBJECTS:
             raise ValueError("Invalid email type")
 
-        html_content = self.template_manager.render_template(email_type, **user_data)
-        self.smtp_client.send_email(subject_map[email_type], html_content, user_data['email'])
+        html_content = self.template_manager.render_template_from_file(email_type, **user_data)
+        await self.smtp_client.send_email_async(EMAIL_SUBJECTS[email_type], html_content, user_data['email'])
 
-    async def send_verification_email(self, user: User):
+    def _verification_email_data(self, user: User) -> dict:
         verification_url = f"{settings.server_base_url}verify-email/{user.id}/{user.verification_token}"
-        await self.send_user_email({
+        return {
             "name": user.first_name,
             "verification_url": verification_url,
             "email": user.email
-        }, 'email_verification')
\ No newline at end of file
+        }
+
+    async def send_verification_email(self, user: User):
+        await self.send_user_email(self._verification_email_data(user), 'email_verification')
+
+    async def send_verification_emails(self, users: List[User]):
+        """Render verification emails for many users and send them as one batch over a pooled connection."""
+        emails = []
+        for user in users:
+            user_data = self._verification_email_data(user)
+            html_content = self.template_manager.render_template_from_file('email_verification', **user_data)
+            emails.append((EMAIL_SUBJECTS['email_verification'], html_content, user.email))
+        if emails:
+            await self.smtp_client.send_emails_async(emails)
\ No newline at end of file
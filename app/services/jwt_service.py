@@ -1,9 +1,19 @@
 # app/services/jwt_service.py
-from builtins import dict, str
+from builtins import dict, int, len, str
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
 import jwt
 from datetime import datetime, timedelta
 from settings.config import settings
 
+# Verified payloads keyed by a digest of the token, evicted LRU and at the token's expiry.
+_token_cache: OrderedDict = OrderedDict()
+_token_cache_lock = threading.Lock()
+_token_cache_stats = {"hits": 0, "misses": 0}
+
 def create_access_token(*, data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
     # Convert role to uppercase before encoding the JWT
@@ -20,3 +30,48 @@ def decode_token(token: str):
         return decoded
     except jwt.PyJWTError:
         return None
+
+def decode_token_cached(token: str) -> Optional[dict]:
+    """
+    Decode a token, reusing the verified payload of a token seen before.
+
+    Entries expire at the token's ``exp`` claim, so a cached token is never
+    accepted after it would have failed verification. Invalid tokens are not cached.
+    """
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    now = time.time()
+    with _token_cache_lock:
+        entry = _token_cache.get(key)
+        if entry is not None:
+            expires_at, payload = entry
+            if expires_at > now:
+                _token_cache.move_to_end(key)
+                _token_cache_stats["hits"] += 1
+                return payload
+            del _token_cache[key]
+        _token_cache_stats["misses"] += 1
+
+    payload = decode_token(token)
+    if payload is None or "exp" not in payload:
+        return payload
+    with _token_cache_lock:
+        _token_cache[key] = (payload["exp"], payload)
+        _token_cache.move_to_end(key)
+        while len(_token_cache) > settings.token_cache_size:
+            _token_cache.popitem(last=False)
+    return payload
+
+def get_token_cache_stats() -> dict:
+    """Return hit/miss counters, the hit ratio and the current size of the verified-token cache."""
+    with _token_cache_lock:
+        stats = {**_token_cache_stats, "size": len(_token_cache), "max_size": settings.token_cache_size}
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+    return stats
+
+def clear_token_cache():
+    """Drop all cached tokens and reset the counters."""
+    with _token_cache_lock:
+        _token_cache.clear()
+        _token_cache_stats["hits"] = 0
+        _token_cache_stats["misses"] = 0
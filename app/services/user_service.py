@@ -1,17 +1,21 @@
-from builtins import Exception, bool, classmethod, int, str
+from builtins import Exception, ValueError, bool, classmethod, dict, getattr, int, len, list, range, set, staticmethod, str, zip
+import asyncio
 from datetime import datetime, timezone
 import secrets
-from typing import Optional, Dict, List
+import time
+from typing import AsyncIterator, Optional, Dict, List, NamedTuple, Sequence, Set, Tuple
 from pydantic import ValidationError
-from sqlalchemy import func, null, update, select
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import Float, Row, and_, case, cast, func, insert, null, or_, update, select, text, tuple_
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.dependencies import get_email_service, get_settings
 from app.models.user_model import User
 from app.schemas.user_schemas import UserCreate, UserUpdate
-from app.utils.nickname_gen import generate_nickname
-from app.utils.security import generate_verification_token, hash_password, verify_password
-from uuid import UUID
+from app.utils.cache import CacheBackend, create_cache_backend
+from app.utils.cursor import CURSOR_NEXT, CURSOR_PREV, decode_cursor, decode_search_cursor, encode_cursor, encode_search_cursor
+from app.utils.nickname_gen import generate_nicknames
+from app.utils.security import generate_verification_token, hash_password_async, verify_password_async
+from uuid import UUID, uuid4
 from app.services.email_service import EmailService
 from app.models.user_model import UserRole
 import logging
@@ -19,9 +23,118 @@ import logging
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+COUNT_EXACT = "exact"
+COUNT_CACHED = "cached"
+COUNT_ESTIMATED = "estimated"
+COUNT_CACHE_MAX_ENTRIES = 256
+# Sort keys accepted by list_users; prefix with "-" for descending. Ties are broken by id.
+SORT_COLUMNS = {
+    "created_at": User.created_at,
+    "email": User.email,
+    "nickname": User.nickname,
+    "last_login_at": User.last_login_at,
+}
+DEFAULT_SORT = "created_at"
+NICKNAME_BATCH_SIZE = 8
+NICKNAME_INSERT_ATTEMPTS = 3
+# Columns behind a UserResponse list item, plus created_at for keyset cursors.
+LIST_COLUMNS = (
+    User.id, User.nickname, User.email, User.first_name, User.last_name, User.bio,
+    User.profile_picture_url, User.linkedin_profile_url, User.github_profile_url,
+    User.role, User.is_professional, User.created_at,
+)
+# Columns matched by user search, nickname and email first.
+SEARCH_COLUMNS = (User.nickname, User.email, User.first_name, User.last_name)
+# Columns written by the user export; secrets such as password hashes and tokens are never exported.
+EXPORT_COLUMNS = (
+    User.id, User.nickname, User.email, User.first_name, User.last_name, User.role,
+    User.is_professional, User.email_verified, User.is_locked, User.last_login_at,
+    User.created_at, User.updated_at,
+)
+
+class UserSnapshot(NamedTuple):
+    """Immutable copy of a user's public columns, as kept by the user cache; credentials are never cached."""
+    id: UUID
+    nickname: str
+    email: str
+    first_name: Optional[str]
+    last_name: Optional[str]
+    bio: Optional[str]
+    profile_picture_url: Optional[str]
+    linkedin_profile_url: Optional[str]
+    github_profile_url: Optional[str]
+    role: UserRole
+    is_professional: bool
+    email_verified: bool
+    is_locked: bool
+    last_login_at: Optional[datetime]
+    created_at: datetime
+    updated_at: datetime
+
+SNAPSHOT_COLUMNS = tuple(getattr(User, name) for name in UserSnapshot._fields)
+
+class LoginOutcome(NamedTuple):
+    account: Optional[Row]
+    locked: bool
+
+class UserFilters(NamedTuple):
+    """
+    Optional filters for listing users; None means "any".
+
+    Being hashable, a filter set also keys the cached counts.
+    """
+    role: Optional[UserRole] = None
+    email_verified: Optional[bool] = None
+    is_locked: Optional[bool] = None
+    is_professional: Optional[bool] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+
+    def conditions(self) -> list:
+        conditions = [
+            getattr(User, name) == getattr(self, name)
+            for name in ("role", "email_verified", "is_locked", "is_professional")
+            if getattr(self, name) is not None
+        ]
+        if self.created_after is not None:
+            conditions.append(User.created_at >= self.created_after)
+        if self.created_before is not None:
+            conditions.append(User.created_at < self.created_before)
+        return conditions
+
+NO_FILTERS = UserFilters()
+
+class UpdateOutcome(NamedTuple):
+    user: Optional[User]
+    precondition_failed: bool
+
+class BulkRowError(NamedTuple):
+    row: int
+    email: Optional[str]
+    errors: List[str]
+
 class UserService:
+    # (count, expires_at) per filter set
+    _count_cache: Dict[UserFilters, Tuple[int, float]] = {}
+    _trigram_available: Optional[bool] = None
+    # Read-through cache of UserSnapshot entries ("user:<id>") and email -> id mappings ("email:<email>").
+    _user_cache: CacheBackend = create_cache_backend(
+        settings.user_cache_backend, settings.user_cache_max_entries, settings.user_cache_redis_url, prefix="users:"
+    )
+
+    @classmethod
+    async def _execute_read(cls, session: AsyncSession, query):
+        """Run a SELECT without committing; the transaction ends with the session."""
+        try:
+            return await session.execute(query)
+        except SQLAlchemyError as e:
+            logger.error(f"Database error: {e}")
+            await session.rollback()
+            return None
+
     @classmethod
-    async def _execute_query(cls, session: AsyncSession, query):
+    async def _execute_write(cls, session: AsyncSession, query):
+        """Run a data-modifying statement and commit the unit of work."""
         try:
             result = await session.execute(query)
             await session.commit()
@@ -34,7 +147,7 @@ class UserService:
     @classmethod
     async def _fetch_user(cls, session: AsyncSession, **filters) -> Optional[User]:
         query = select(User).filter_by(**filters)
-        result = await cls._execute_query(session, query)
+        result = await cls._execute_read(session, query)
         return result.scalars().first() if result else None
 
     @classmethod
@@ -49,23 +162,87 @@ class UserService:
     async def get_by_email(cls, session: AsyncSession, email: str) -> Optional[User]:
         return await cls._fetch_user(session, email=email)
 
+    @classmethod
+    async def get_snapshot_by_id(cls, session: AsyncSession, user_id: UUID) -> Optional[UserSnapshot]:
+        """
+        Return a user's public columns, served from the user cache when possible.
+
+        Writes through this service invalidate the entry; other changes show
+        up once it expires after ``user_cache_ttl_seconds``. Use ``get_by_id``
+        for a user that is going to be modified.
+        """
+        snapshot = await cls._user_cache.get(f"user:{user_id}")
+        if snapshot is None:
+            snapshot = await cls._load_snapshot(session, User.id == user_id)
+        return snapshot
+
+    @classmethod
+    async def get_snapshot_by_email(cls, session: AsyncSession, email: str) -> Optional[UserSnapshot]:
+        """
+        Like ``get_snapshot_by_id``, keyed by email.
+
+        The email entry only maps to an id; a mapping left behind by an email
+        change no longer matches the snapshot and is treated as a miss.
+        """
+        user_id = await cls._user_cache.get(f"email:{email}")
+        if user_id is not None:
+            snapshot = await cls._user_cache.get(f"user:{user_id}")
+            if snapshot is not None and snapshot.email == email:
+                return snapshot
+        return await cls._load_snapshot(session, User.email == email)
+
+    @classmethod
+    async def _load_snapshot(cls, session: AsyncSession, condition) -> Optional[UserSnapshot]:
+        result = await cls._execute_read(session, select(*SNAPSHOT_COLUMNS).where(condition))
+        row = result.first() if result else None
+        if row is None:
+            return None
+        snapshot = UserSnapshot(*row)
+        await cls._user_cache.set(f"user:{snapshot.id}", snapshot, settings.user_cache_ttl_seconds)
+        await cls._user_cache.set(f"email:{snapshot.email}", snapshot.id, settings.user_cache_ttl_seconds)
+        return snapshot
+
+    @classmethod
+    async def invalidate_cached_user(cls, user_id: UUID):
+        """Drop a user's cached snapshot after it changed."""
+        await cls._user_cache.delete(f"user:{user_id}")
+
+    @classmethod
+    def get_user_cache_stats(cls) -> dict:
+        return cls._user_cache.stats()
+
+    @classmethod
+    async def clear_user_cache(cls):
+        await cls._user_cache.clear()
+
+    @classmethod
+    async def close_user_cache(cls):
+        await cls._user_cache.close()
+
     @classmethod
     async def create(cls, session: AsyncSession, user_data: Dict[str, str], email_service: EmailService) -> Optional[User]:
         try:
             validated_data = UserCreate(**user_data).model_dump()
-            existing_user = await cls.get_by_email(session, validated_data['email'])
+            existing_user = await cls.get_snapshot_by_email(session, validated_data['email'])
             if existing_user:
                 logger.error("User with given email already exists.")
                 return None
-            validated_data['hashed_password'] = hash_password(validated_data.pop('password'))
+            validated_data['hashed_password'] = await hash_password_async(validated_data.pop('password'))
             new_user = User(**validated_data)
             new_user.verification_token = generate_verification_token()
-            new_nickname = generate_nickname()
-            while await cls.get_by_nickname(session, new_nickname):
-                new_nickname = generate_nickname()
-            new_user.nickname = new_nickname
-            session.add(new_user)
-            await session.commit()
+            for attempt in range(NICKNAME_INSERT_ATTEMPTS):
+                new_user.nickname = await cls._allocate_nickname(session)
+                session.add(new_user)
+                try:
+                    await session.commit()
+                    break
+                except IntegrityError as e:
+                    # Another request claimed the nickname (or email) between the check and the insert.
+                    await session.rollback()
+                    if "nickname" not in str(e.orig) or attempt == NICKNAME_INSERT_ATTEMPTS - 1:
+                        logger.error(f"Could not insert user: {e}")
+                        return None
+            cls._invalidate_cached_count()
             await email_service.send_verification_email(new_user)
             
             return new_user
@@ -73,27 +250,161 @@ class UserService:
             logger.error(f"Validation error during user creation: {e}")
             return None
 
+    @classmethod
+    async def _allocate_nickname(cls, session: AsyncSession, batch_size: int = NICKNAME_BATCH_SIZE) -> str:
+        """
+        Pick a free nickname, checking a whole batch of candidates in one query.
+
+        With a generator space of hundreds of millions of names the first batch
+        almost always contains a free one, so this stays at one round trip as the
+        users table grows.
+        """
+        return (await cls._allocate_nicknames(session, 1, batch_size))[0]
+
+    @classmethod
+    async def _allocate_nicknames(cls, session: AsyncSession, count: int, batch_size: int = NICKNAME_BATCH_SIZE) -> List[str]:
+        """Pick ``count`` distinct free nicknames, normally with a single query."""
+        nicknames: List[str] = []
+        chosen: Set[str] = set()
+        while len(nicknames) < count:
+            missing = count - len(nicknames)
+            candidates = [name for name in generate_nicknames(missing + batch_size - 1) if name not in chosen]
+            result = await cls._execute_read(session, select(User.nickname).where(User.nickname.in_(candidates)))
+            taken = set(result.scalars().all()) if result else set()
+            for nickname in candidates:
+                if nickname not in taken and len(nicknames) < count:
+                    nicknames.append(nickname)
+                    chosen.add(nickname)
+        return nicknames
+
+    @classmethod
+    async def create_many(cls, session: AsyncSession, rows: List[Tuple[int, Dict[str, str]]], seen_emails: Set[str]) -> Tuple[List[User], List[BulkRowError]]:
+        """
+        Validate and insert a batch of users for a bulk import.
+
+        The batch costs one email lookup, one nickname query, one batched (executemany)
+        INSERT and one commit; passwords are hashed concurrently on the hashing
+        pool. Verification emails are left to the caller.
+
+        :param rows: ``(row_number, data)`` pairs from the upload.
+        :param seen_emails: Emails accepted earlier in the same upload; updated in place.
+        :return: The inserted users (detached, carrying their verification tokens) and the rejected rows.
+        """
+        errors: List[BulkRowError] = []
+        accepted: List[Tuple[int, Dict[str, str]]] = []
+        for row_number, data in rows:
+            try:
+                validated_data = UserCreate(**data).model_dump()
+            except ValidationError as e:
+                messages = [f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()]
+                errors.append(BulkRowError(row_number, data.get("email"), messages))
+                continue
+            if validated_data["email"] in seen_emails:
+                errors.append(BulkRowError(row_number, validated_data["email"], ["Duplicate email in upload"]))
+                continue
+            seen_emails.add(validated_data["email"])
+            accepted.append((row_number, validated_data))
+        if not accepted:
+            return [], errors
+
+        result = await cls._execute_read(session, select(User.email).where(User.email.in_([data["email"] for _, data in accepted])))
+        existing = set(result.scalars().all()) if result else set()
+        for row_number, data in accepted:
+            if data["email"] in existing:
+                errors.append(BulkRowError(row_number, data["email"], ["Email already exists"]))
+        accepted = [(row_number, data) for row_number, data in accepted if data["email"] not in existing]
+        if not accepted:
+            return [], errors
+
+        hashed_passwords = await asyncio.gather(*(hash_password_async(data.pop("password")) for _, data in accepted))
+        nicknames = await cls._allocate_nicknames(session, len(accepted))
+        for (_, data), hashed_password, nickname in zip(accepted, hashed_passwords, nicknames):
+            data.update(
+                id=uuid4(), hashed_password=hashed_password, nickname=nickname,
+                verification_token=generate_verification_token(),
+            )
+        try:
+            await session.execute(insert(User.__table__), [data for _, data in accepted])
+            await session.commit()
+        except IntegrityError:
+            # A concurrent writer took one of the emails or nicknames; find it row by row.
+            await session.rollback()
+            return await cls._create_one_by_one(session, accepted, errors)
+        cls._invalidate_cached_count()
+        return [User(**data) for _, data in accepted], errors
+
+    @classmethod
+    async def _create_one_by_one(cls, session: AsyncSession, accepted: List[Tuple[int, Dict[str, str]]], errors: List[BulkRowError]) -> Tuple[List[User], List[BulkRowError]]:
+        created: List[User] = []
+        for row_number, data in accepted:
+            try:
+                await session.execute(insert(User.__table__), [data])
+                await session.commit()
+                created.append(User(**data))
+            except IntegrityError as e:
+                await session.rollback()
+                field = "Nickname" if "nickname" in str(e.orig) else "Email"
+                errors.append(BulkRowError(row_number, data["email"], [f"{field} already exists"]))
+        cls._invalidate_cached_count()
+        return created, errors
+
     @classmethod
     async def update(cls, session: AsyncSession, user_id: UUID, update_data: Dict[str, str]) -> Optional[User]:
+        return (await cls.update_if_match(session, user_id, update_data)).user
+
+    @classmethod
+    async def update_if_match(cls, session: AsyncSession, user_id: UUID, update_data: Dict[str, str],
+                              versions: Optional[Sequence[datetime]] = None) -> UpdateOutcome:
+        """
+        Update a user, optionally only while its ``updated_at`` is one of ``versions``.
+
+        The version check is part of the UPDATE statement, so a concurrent
+        write cannot slip in between the check and the write, and a stale
+        version costs one statement that changes nothing.
+
+        :return: The updated user, or None with ``precondition_failed`` set if
+            the user exists but has moved on from every given version.
+        """
         try:
             # validated_data = UserUpdate(**update_data).dict(exclude_unset=True)
             validated_data = UserUpdate(**update_data).dict(exclude_unset=True)
 
             if 'password' in validated_data:
-                validated_data['hashed_password'] = hash_password(validated_data.pop('password'))
-            query = update(User).where(User.id == user_id).values(**validated_data).execution_options(synchronize_session="fetch")
-            await cls._execute_query(session, query)
-            updated_user = await cls.get_by_id(session, user_id)
-            if updated_user:
-                session.refresh(updated_user)  # Explicitly refresh the updated user object
-                logger.info(f"User {user_id} updated successfully.")
-                return updated_user
-            else:
+                validated_data['hashed_password'] = await hash_password_async(validated_data.pop('password'))
+            query = update(User).where(User.id == user_id)
+            if versions is not None:
+                query = query.where(User.updated_at.in_(versions))
+            query = query.values(**validated_data).returning(User.id).execution_options(synchronize_session="fetch")
+            result = await cls._execute_write(session, query)
+            if result is None or result.first() is None:
+                if versions is not None and await cls._fetch_user(session, id=user_id) is not None:
+                    return UpdateOutcome(None, True)
                 logger.error(f"User {user_id} not found after update attempt.")
-            return None
+                return UpdateOutcome(None, False)
+            cls._invalidate_cached_count()
+            await cls.invalidate_cached_user(user_id)
+            # populate_existing reloads the server-set updated_at into an already loaded instance.
+            query = select(User).where(User.id == user_id).execution_options(populate_existing=True)
+            updated_user = (await session.execute(query)).scalars().first()
+            logger.info(f"User {user_id} updated successfully.")
+            return UpdateOutcome(updated_user, False)
         except Exception as e:  # Broad exception handling for debugging
             logger.error(f"Error during user update: {e}")
-            return None
+            return UpdateOutcome(None, False)
+
+    @classmethod
+    async def get_version(cls, session: AsyncSession, user_id: UUID) -> Optional[datetime]:
+        """
+        Return a user's ``updated_at`` for conditional requests, or None if there is no such user.
+
+        A cached snapshot answers without a query; otherwise only the one
+        column is read, without loading or caching the profile.
+        """
+        snapshot = await cls._user_cache.get(f"user:{user_id}")
+        if snapshot is not None:
+            return snapshot.updated_at
+        result = await cls._execute_read(session, select(User.updated_at).where(User.id == user_id))
+        return result.scalar() if result else None
 
     @classmethod
     async def delete(cls, session: AsyncSession, user_id: UUID) -> bool:
@@ -103,50 +414,239 @@ class UserService:
             return False
         await session.delete(user)
         await session.commit()
+        cls._invalidate_cached_count()
+        await cls.invalidate_cached_user(user_id)
         return True
 
     @classmethod
-    async def list_users(cls, session: AsyncSession, skip: int = 0, limit: int = 10) -> List[User]:
-        query = select(User).offset(skip).limit(limit)
-        result = await cls._execute_query(session, query)
-        return result.scalars().all() if result else []
+    async def _fetch_page(cls, session: AsyncSession, query, columns: Optional[Sequence] = None) -> list:
+        result = await cls._execute_read(session, query)
+        if not result:
+            return []
+        return list(result.all() if columns else result.scalars().all())
+
+    @staticmethod
+    def _order_by(sort: str) -> list:
+        """
+        Translate a whitelisted sort key into ORDER BY clauses.
+
+        NULLs sort last either way. NOT NULL columns leave NULLS LAST out, so that
+        scanning their index in either direction matches the order exactly; the
+        nullable ones have a ``DESC NULLS LAST`` index for descending sorts. Ties
+        are broken by id, except on unique columns, which have none.
+
+        :raises ValueError: If the key is not in ``SORT_COLUMNS``.
+        """
+        descending = sort.startswith("-")
+        column = SORT_COLUMNS.get(sort.lstrip("-"))
+        if column is None:
+            raise ValueError(f"Unsupported sort key: {sort}")
+        order = column.desc() if descending else column.asc()
+        if column.nullable:
+            order = order.nulls_last()
+        if column.unique:
+            return [order]
+        return [order, User.id.desc() if descending else User.id]
+
+    @classmethod
+    async def list_users(cls, session: AsyncSession, skip: int = 0, limit: int = 10, columns: Optional[Sequence] = None,
+                         filters: UserFilters = NO_FILTERS, sort: str = DEFAULT_SORT) -> List[User]:
+        """
+        Fetch a page of users.
+
+        :param columns: Load only these columns as rows (e.g. ``LIST_COLUMNS``) instead of ``User`` entities.
+        :param filters: Only users matching these filters.
+        :param sort: A ``SORT_COLUMNS`` key, optionally prefixed with "-" for descending.
+        :raises ValueError: If the sort key is not supported.
+        """
+        query = (select(*columns) if columns else select(User)).where(*filters.conditions())
+        query = query.order_by(*cls._order_by(sort)).offset(skip).limit(limit)
+        return await cls._fetch_page(session, query, columns)
+
+    @classmethod
+    async def list_users_keyset(cls, session: AsyncSession, limit: int = 10, cursor: Optional[str] = None, columns: Optional[Sequence] = None,
+                                filters: UserFilters = NO_FILTERS) -> Tuple[List[User], Optional[str], Optional[str]]:
+        """
+        List users in (created_at, id) order using keyset pagination.
+
+        Unlike OFFSET, the cost of a page does not grow with its depth and
+        concurrent inserts cannot shift rows between pages.
+
+        :param cursor: Opaque cursor from a previous page, or None for the first page.
+        :param columns: Load only these columns as rows instead of ``User`` entities;
+            they must include ``created_at`` and ``id``.
+        :param filters: Only users matching these filters.
+        :return: The page of users plus the next and previous cursors (None at either end).
+        :raises ValueError: If the cursor cannot be decoded.
+        """
+        sort_key = tuple_(User.created_at, User.id)
+        query = (select(*columns) if columns else select(User)).where(*filters.conditions())
+        direction = CURSOR_NEXT
+        if cursor:
+            created_at, user_id, direction = decode_cursor(cursor)
+            if direction == CURSOR_PREV:
+                query = query.where(sort_key < tuple_(created_at, user_id))
+            else:
+                query = query.where(sort_key > tuple_(created_at, user_id))
+        if direction == CURSOR_PREV:
+            query = query.order_by(User.created_at.desc(), User.id.desc())
+        else:
+            query = query.order_by(User.created_at, User.id)
+        users = await cls._fetch_page(session, query.limit(limit + 1), columns)
+        has_more = len(users) > limit
+        users = users[:limit]
+        if direction == CURSOR_PREV:
+            users.reverse()
+        if not users:
+            return users, None, None
+
+        first, last = users[0], users[-1]
+        if direction == CURSOR_PREV:
+            has_next, has_prev = True, has_more
+        else:
+            has_next, has_prev = has_more, cursor is not None
+        next_cursor = encode_cursor(last.created_at, last.id, CURSOR_NEXT) if has_next else None
+        prev_cursor = encode_cursor(first.created_at, first.id, CURSOR_PREV) if has_prev else None
+        return users, next_cursor, prev_cursor
+
+    @classmethod
+    async def has_trigram_search(cls, session: AsyncSession) -> bool:
+        """Whether the pg_trgm extension is installed; checked once per process."""
+        if cls._trigram_available is None:
+            if session.get_bind().dialect.name != "postgresql":
+                cls._trigram_available = False
+            else:
+                result = await cls._execute_read(session, text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"))
+                cls._trigram_available = bool(result and result.scalar())
+        return cls._trigram_available
+
+    @classmethod
+    async def search_users(cls, session: AsyncSession, q: str, limit: int = 10, cursor: Optional[str] = None) -> Tuple[List[Row], Optional[str]]:
+        """
+        Search nickname, email, first and last name, best matches first.
+
+        With pg_trgm installed, rows that start with the query or are
+        trigram-similar to it match, ranked by similarity with a bonus for
+        prefix matches. Without it, only prefix matches are returned, ranked
+        exact match, then nickname/email prefix, then name prefix. Both use the
+        ``lower(column)`` indexes created by the search migration.
+
+        :param cursor: Opaque cursor from the previous page, or None for the first page.
+        :return: ``LIST_COLUMNS`` rows plus ``rank``, and the next page's cursor (None on the last page).
+        :raises ValueError: If the cursor cannot be decoded.
+        """
+        term = q.strip().lower()
+        pattern = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        # Backslash is already PostgreSQL's LIKE escape character; other databases need it spelled out.
+        escape = None if session.get_bind().dialect.name == "postgresql" else "\\"
+        fields = [func.lower(column) for column in SEARCH_COLUMNS]
+        prefix_matches = [field.like(pattern, escape=escape) for field in fields]
+        if await cls.has_trigram_search(session):
+            similarity = func.greatest(*(func.similarity(field, term) for field in fields))
+            rank = cast(similarity + case((or_(*prefix_matches), 1.0), else_=0.0), Float)
+            condition = or_(*prefix_matches, *(field.op("%")(term) for field in fields))
+        else:
+            rank = cast(case(
+                (or_(*(field == term for field in fields)), 1.0),
+                (or_(*prefix_matches[:2]), 0.75),
+                else_=0.5,
+            ), Float)
+            condition = or_(*prefix_matches)
+
+        query = select(*LIST_COLUMNS, rank.label("rank")).where(condition)
+        if cursor:
+            last_rank, last_id = decode_search_cursor(cursor)
+            query = query.where(or_(rank < last_rank, and_(rank == last_rank, User.id > last_id)))
+        query = query.order_by(rank.desc(), User.id).limit(limit + 1)
+        rows = await cls._fetch_page(session, query, LIST_COLUMNS)
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, encode_search_cursor(rows[-1].rank, rows[-1].id)
+
+    @classmethod
+    async def stream_export(cls, session: AsyncSession, batch_size: int = 1000) -> AsyncIterator[Sequence[Row]]:
+        """
+        Yield the export columns of every user, ``batch_size`` rows at a time.
+
+        Rows come from a server-side cursor in (created_at, id) order, so only
+        one batch is held in memory and the next is fetched only when the
+        consumer asks for it.
+        """
+        query = select(*EXPORT_COLUMNS).order_by(User.created_at, User.id).execution_options(yield_per=batch_size)
+        result = await session.stream(query)
+        async for partition in result.partitions():
+            yield partition
 
     @classmethod
     async def register_user(cls, session: AsyncSession, user_data: Dict[str, str], get_email_service) -> Optional[User]:
         return await cls.create(session, user_data, get_email_service)
     
 
+    @classmethod
+    async def authenticate(cls, session: AsyncSession, email: str, password: str) -> LoginOutcome:
+        """
+        Check a login attempt with one lookup and one atomic update.
+
+        Only the columns login needs are loaded. A failed attempt increments
+        ``failed_login_attempts`` and locks the account in a single
+        ``UPDATE ... RETURNING``, so parallel attempts cannot lose increments.
+        A successful login or a lockout drops the user's cached snapshot.
+
+        :return: The authenticated account row (id, email, role) or None, and whether the account is locked.
+        """
+        query = select(
+            User.id, User.email, User.role, User.hashed_password, User.email_verified, User.is_locked
+        ).where(User.email == email)
+        account = (await session.execute(query)).first()
+        if account is None:
+            return LoginOutcome(None, False)
+        if account.is_locked:
+            return LoginOutcome(None, True)
+        if not account.email_verified:
+            return LoginOutcome(None, False)
+
+        if await verify_password_async(password, account.hashed_password):
+            query = update(User).where(User.id == account.id).values(
+                failed_login_attempts=0, last_login_at=datetime.now(timezone.utc)
+            )
+            await session.execute(query)
+            await session.commit()
+            await cls.invalidate_cached_user(account.id)
+            return LoginOutcome(account, False)
+
+        attempts = func.coalesce(User.failed_login_attempts, 0) + 1
+        query = (
+            update(User)
+            .where(User.id == account.id)
+            .values(failed_login_attempts=attempts, is_locked=or_(User.is_locked, attempts >= settings.max_login_attempts))
+            .returning(User.is_locked)
+            .execution_options(synchronize_session="fetch")
+        )
+        locked = (await session.execute(query)).scalar()
+        await session.commit()
+        if locked:
+            cls._invalidate_cached_count()
+            await cls.invalidate_cached_user(account.id)
+            logger.info(f"Account {account.id} locked after too many failed login attempts.")
+        return LoginOutcome(None, False)
+
     @classmethod
     async def login_user(cls, session: AsyncSession, email: str, password: str) -> Optional[User]:
-        user = await cls.get_by_email(session, email)
-        if user:
-            if user.email_verified is False:
-                return None
-            if user.is_locked:
-                return None
-            if verify_password(password, user.hashed_password):
-                user.failed_login_attempts = 0
-                user.last_login_at = datetime.now(timezone.utc)
-                session.add(user)
-                await session.commit()
-                return user
-            else:
-                user.failed_login_attempts += 1
-                if user.failed_login_attempts >= settings.max_login_attempts:
-                    user.is_locked = True
-                session.add(user)
-                await session.commit()
-        return None
+        outcome = await cls.authenticate(session, email, password)
+        if outcome.account is None:
+            return None
+        return await cls.get_by_id(session, outcome.account.id)
 
     @classmethod
     async def is_account_locked(cls, session: AsyncSession, email: str) -> bool:
-        user = await cls.get_by_email(session, email)
-        return user.is_locked if user else False
+        snapshot = await cls.get_snapshot_by_email(session, email)
+        return bool(snapshot and snapshot.is_locked)
 
 
     @classmethod
     async def reset_password(cls, session: AsyncSession, user_id: UUID, new_password: str) -> bool:
-        hashed_password = hash_password(new_password)
+        hashed_password = await hash_password_async(new_password)
         user = await cls.get_by_id(session, user_id)
         if user:
             user.hashed_password = hashed_password
@@ -154,6 +654,8 @@ class UserService:
             user.is_locked = False  # Unlocking the user account, if locked
             session.add(user)
             await session.commit()
+            cls._invalidate_cached_count()
+            await cls.invalidate_cached_user(user_id)
             return True
         return False
 
@@ -166,21 +668,121 @@ class UserService:
             user.role = UserRole.AUTHENTICATED
             session.add(user)
             await session.commit()
+            cls._invalidate_cached_count()
+            await cls.invalidate_cached_user(user_id)
             return True
         return False
 
     @classmethod
-    async def count(cls, session: AsyncSession) -> int:
+    async def count(cls, session: AsyncSession, filters: UserFilters = NO_FILTERS) -> int:
         """
         Count the number of users in the database.
 
         :param session: The AsyncSession instance for database access.
+        :param filters: Only count users matching these filters.
         :return: The count of users.
         """
-        query = select(func.count()).select_from(User)
+        query = select(func.count()).select_from(User).where(*filters.conditions())
         result = await session.execute(query)
         count = result.scalar()
         return count
+
+    @classmethod
+    async def count_cached(cls, session: AsyncSession, filters: UserFilters = NO_FILTERS) -> int:
+        """
+        Return the exact user count, reusing it for ``user_count_cache_ttl_seconds``.
+
+        Counts are cached per filter set. The cache is dropped whenever this
+        process creates, deletes or updates a user.
+        """
+        cached = cls._count_cache.get(filters)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+        count = await cls.count(session, filters)
+        cls._store_cached_count(count, filters)
+        return count
+
+    @classmethod
+    async def count_estimated(cls, session: AsyncSession) -> Optional[int]:
+        """
+        Return the planner's row estimate for the users table from ``pg_class``.
+
+        :return: The estimate, or None when the table has not been analyzed yet
+            or the database is not PostgreSQL.
+        """
+        if session.get_bind().dialect.name != "postgresql":
+            return None
+        query = text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)")
+        result = await session.execute(query, {"table_name": User.__tablename__})
+        estimate = result.scalar()
+        return estimate if estimate is not None and estimate > 0 else None
+
+    @classmethod
+    async def total_users(cls, session: AsyncSession, count_strategy: str = COUNT_EXACT, filters: UserFilters = NO_FILTERS) -> Tuple[int, str]:
+        """
+        Count users with the requested strategy.
+
+        :return: The total and the strategy that actually produced it; an
+            unavailable estimate falls back to an exact count, and so does
+            any estimate request with filters, since the table statistics
+            only describe the whole table.
+        """
+        if count_strategy == COUNT_ESTIMATED:
+            estimate = await cls.count_estimated(session) if filters == NO_FILTERS else None
+            if estimate is not None:
+                return estimate, COUNT_ESTIMATED
+            return await cls.count(session, filters), COUNT_EXACT
+        if count_strategy == COUNT_CACHED:
+            return await cls.count_cached(session, filters), COUNT_CACHED
+        return await cls.count(session, filters), COUNT_EXACT
+
+    @classmethod
+    async def list_users_with_total(cls, session: AsyncSession, skip: int = 0, limit: int = 10, count_strategy: str = COUNT_EXACT, columns: Optional[Sequence] = None,
+                                    filters: UserFilters = NO_FILTERS, sort: str = DEFAULT_SORT) -> Tuple[List[User], int, str]:
+        """
+        Fetch a page of users together with the total number of matching users.
+
+        The exact strategy reads the total from a ``count(*) OVER()`` window in
+        the page query itself, so a single statement serves both.
+
+        :param columns: Load only these columns as rows instead of ``User`` entities.
+        :param filters: Only users matching these filters, in both the page and the total.
+        :param sort: A ``SORT_COLUMNS`` key, optionally prefixed with "-" for descending.
+        :return: The users, the total and the strategy that produced the total.
+        :raises ValueError: If the sort key is not supported.
+        """
+        order_by = cls._order_by(sort)
+        if count_strategy != COUNT_EXACT:
+            total, used_strategy = await cls.total_users(session, count_strategy, filters)
+            return await cls.list_users(session, skip, limit, columns, filters, sort), total, used_strategy
+
+        selected = columns if columns else (User,)
+        query = (
+            select(*selected, func.count().over().label("total"))
+            .where(*filters.conditions())
+            .order_by(*order_by)
+            .offset(skip)
+            .limit(limit)
+        )
+        result = await cls._execute_read(session, query)
+        rows = result.all() if result else []
+        if rows:
+            total = rows[0].total
+            cls._store_cached_count(total, filters)
+            return (rows if columns else [row.User for row in rows]), total, COUNT_EXACT
+        # An empty page carries no window value; only past the end does that need a count.
+        total = await cls.count(session, filters) if skip > 0 else 0
+        return [], total, COUNT_EXACT
+
+    @classmethod
+    def _store_cached_count(cls, count: int, filters: UserFilters = NO_FILTERS):
+        if len(cls._count_cache) >= COUNT_CACHE_MAX_ENTRIES and filters not in cls._count_cache:
+            cls._count_cache.clear()
+        cls._count_cache[filters] = (count, time.monotonic() + settings.user_count_cache_ttl_seconds)
+
+    @classmethod
+    def _invalidate_cached_count(cls):
+        cls._count_cache.clear()
     
     @classmethod
     async def unlock_user_account(cls, session: AsyncSession, user_id: UUID) -> bool:
@@ -190,5 +792,7 @@ class UserService:
             user.failed_login_attempts = 0  # Optionally reset failed login attempts
             session.add(user)
             await session.commit()
+            cls._invalidate_cached_count()
+            await cls.invalidate_cached_user(user_id)
             return True
         return False
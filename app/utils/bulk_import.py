@@ -0,0 +1,86 @@
+from builtins import UnicodeDecodeError, ValueError, dict, int, isinstance, len, next, str, zip
+import codecs
+import csv
+import json
+from typing import AsyncIterator, Optional, Tuple
+
+FORMAT_NDJSON = "ndjson"
+FORMAT_CSV = "csv"
+
+# A parsed row: its 1-based position in the upload, the data (None if the row
+# could not be parsed) and the parse error, if any.
+ParsedRow = Tuple[int, Optional[dict], Optional[str]]
+
+def detect_format(content_type: str) -> Optional[str]:
+    """Map a request Content-Type onto an import format, or None if unsupported."""
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if media_type in ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/json-seq"):
+        return FORMAT_NDJSON
+    if media_type in ("text/csv", "application/csv"):
+        return FORMAT_CSV
+    return None
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a byte stream as UTF-8 and yield it line by line without buffering the whole body."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+async def iter_ndjson_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRow]:
+    """Yield one row per non-blank line of newline-delimited JSON objects."""
+    row_number = 0
+    try:
+        async for line in iter_lines(chunks):
+            if not line.strip():
+                continue
+            row_number += 1
+            try:
+                data = json.loads(line)
+            except ValueError as e:
+                yield row_number, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(data, dict):
+                yield row_number, None, "Each line must be a JSON object"
+                continue
+            yield row_number, data, None
+    except UnicodeDecodeError:
+        yield row_number + 1, None, "Body is not valid UTF-8"
+
+async def iter_csv_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRow]:
+    """
+    Yield one row per CSV record, keyed by the header line.
+
+    Quoted fields may span lines: a record is complete once its quotes balance.
+    Empty cells are left out so optional fields fall back to their defaults.
+    """
+    header = None
+    row_number = 0
+    record = ""
+    try:
+        async for line in iter_lines(chunks):
+            record = f"{record}\n{line}" if record else line
+            if record.count('"') % 2:
+                continue
+            text, record = record, ""
+            if not text.strip():
+                continue
+            values = next(csv.reader([text]))
+            if header is None:
+                header = [name.strip() for name in values]
+                continue
+            row_number += 1
+            if len(values) != len(header):
+                yield row_number, None, f"Expected {len(header)} columns, got {len(values)}"
+                continue
+            yield row_number, {name: value for name, value in zip(header, values) if value != ""}, None
+        if record:
+            yield row_number + 1, None, "Unterminated quoted field"
+    except UnicodeDecodeError:
+        yield row_number + 1, None, "Body is not valid UTF-8"
@@ -0,0 +1,183 @@
+from builtins import Exception, ImportError, RuntimeError, ValueError, dict, float, int, len, str
+import logging
+import pickle
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+CACHE_MEMORY = "memory"
+CACHE_REDIS = "redis"
+CACHE_NONE = "none"
+
+class CacheBackend(ABC):
+    """
+    Key/value store behind a read-through cache.
+
+    Values must be immutable: the in-process backend hands out the stored
+    object itself. Hit and miss counters are kept per process.
+    """
+    def __init__(self):
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float):
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str):
+        ...
+
+    async def clear(self):
+        """Drop every entry and reset the counters."""
+        with self._stats_lock:
+            for name in self._stats:
+                self._stats[name] = 0
+
+    async def close(self):
+        pass
+
+    def size(self) -> Optional[int]:
+        """Number of entries held, or None when the store cannot tell cheaply."""
+        return None
+
+    def stats(self) -> dict:
+        """Hit/miss counters, the hit ratio and the current size."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        return {**stats, "hit_ratio": stats["hits"] / lookups if lookups else 0.0, "size": self.size()}
+
+class NullCacheBackend(CacheBackend):
+    """Caches nothing; every lookup is a miss."""
+    async def get(self, key: str) -> Optional[Any]:
+        self._count("misses")
+        return None
+
+    async def set(self, key: str, value: Any, ttl: float):
+        pass
+
+    async def delete(self, key: str):
+        pass
+
+    def size(self) -> Optional[int]:
+        return 0
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    In-process cache with a TTL per entry and LRU eviction beyond ``max_entries``.
+
+    Each worker process has its own copy, so a write in one worker is only
+    seen by the others once their entry expires.
+    """
+    def __init__(self, max_entries: int = 10000):
+        super().__init__()
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._count("hits")
+                    return value
+                del self._entries[key]
+        self._count("misses")
+        return None
+
+    async def set(self, key: str, value: Any, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._count("evictions")
+
+    async def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    async def clear(self):
+        with self._lock:
+            self._entries.clear()
+        await super().clear()
+
+    def size(self) -> Optional[int]:
+        with self._lock:
+            return len(self._entries)
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Cache shared by all workers through Redis; entries expire server-side.
+
+    Values are pickled, so the Redis instance must be trusted. Redis errors
+    are logged and treated as misses, letting reads fall through to the
+    database. Needs the optional ``redis`` package.
+    """
+    def __init__(self, url: str, prefix: str = "cache:"):
+        super().__init__()
+        try:
+            from redis import asyncio as redis
+        except ImportError:
+            raise RuntimeError("The redis cache backend needs the 'redis' package: pip install redis")
+        self._client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[Any]:
+        try:
+            data = await self._client.get(self.prefix + key)
+        except Exception as e:
+            logger.warning(f"Redis cache unavailable: {e}")
+            data = None
+        if data is None:
+            self._count("misses")
+            return None
+        self._count("hits")
+        return pickle.loads(data)
+
+    async def set(self, key: str, value: Any, ttl: float):
+        try:
+            await self._client.set(self.prefix + key, pickle.dumps(value), px=int(ttl * 1000))
+        except Exception as e:
+            logger.warning(f"Redis cache unavailable: {e}")
+
+    async def delete(self, key: str):
+        try:
+            await self._client.delete(self.prefix + key)
+        except Exception as e:
+            logger.warning(f"Redis cache unavailable: {e}")
+
+    async def clear(self):
+        async for key in self._client.scan_iter(match=self.prefix + "*"):
+            await self._client.delete(key)
+        await super().clear()
+
+    async def close(self):
+        await self._client.aclose()
+
+def create_cache_backend(kind: str, max_entries: int = 10000, redis_url: Optional[str] = None, prefix: str = "cache:") -> CacheBackend:
+    """Build the backend named by ``kind``: 'memory', 'redis' or 'none'."""
+    if kind == CACHE_MEMORY:
+        return MemoryCacheBackend(max_entries)
+    if kind == CACHE_REDIS:
+        return RedisCacheBackend(redis_url, prefix)
+    if kind == CACHE_NONE:
+        return NullCacheBackend()
+    raise ValueError(f"Unknown cache backend: {kind}")
@@ -0,0 +1,60 @@
+from builtins import ValueError, dict, float, len, str
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Tuple
+from uuid import UUID
+
+CURSOR_NEXT = "next"
+CURSOR_PREV = "prev"
+
+def encode_cursor(created_at: datetime, user_id: UUID, direction: str = CURSOR_NEXT) -> str:
+    """
+    Encode a keyset position as an opaque, URL-safe cursor.
+
+    The cursor points just past (``next``) or just before (``prev``) the row
+    identified by its ``(created_at, id)`` key.
+    """
+    return _encode_payload({"t": created_at.isoformat(), "id": str(user_id), "d": direction})
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID, str]:
+    """
+    Decode a cursor produced by :func:`encode_cursor`.
+
+    Raises:
+        ValueError: If the cursor is malformed or has been tampered with.
+    """
+    try:
+        payload = _decode_payload(cursor)
+        direction = payload["d"]
+        if direction not in (CURSOR_NEXT, CURSOR_PREV):
+            raise ValueError(f"Unknown cursor direction: {direction}")
+        return datetime.fromisoformat(payload["t"]), UUID(payload["id"]), direction
+    except (binascii.Error, UnicodeError, json.JSONDecodeError, KeyError, TypeError, AttributeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+
+def encode_search_cursor(rank: float, user_id: UUID) -> str:
+    """Encode the position after a search result, which is ordered by (rank desc, id)."""
+    return _encode_payload({"r": rank, "id": str(user_id)})
+
+def decode_search_cursor(cursor: str) -> Tuple[float, UUID]:
+    """
+    Decode a cursor produced by :func:`encode_search_cursor`.
+
+    Raises:
+        ValueError: If the cursor is malformed or has been tampered with.
+    """
+    try:
+        payload = _decode_payload(cursor)
+        return float(payload["r"]), UUID(payload["id"])
+    except (binascii.Error, UnicodeError, json.JSONDecodeError, KeyError, TypeError, AttributeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+
+def _encode_payload(payload: dict) -> str:
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def _decode_payload(cursor: str) -> dict:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
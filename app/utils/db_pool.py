@@ -0,0 +1,53 @@
+from builtins import dict, max, zip
+import time
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.utils.metrics import DB_POOL_CHECKOUT_WAIT
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool that records the time each checkout takes, including
+    waiting for a free connection and opening a new one.
+
+    Waits go to the ``db_pool_checkout_wait_seconds`` histogram, labelled with
+    the pool's ``logging_name`` (set through ``pool_logging_name``), so they
+    are also published on ``/metrics`` and survive the engine being disposed.
+    """
+    @property
+    def name(self) -> str:
+        return self.logging_name or "default"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started, self.name, "timeout")
+            raise
+        DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started, self.name, "ok")
+        return connection
+
+    def checkout_wait(self) -> dict:
+        """Checkout waits of this pool's name, successful and timed out together."""
+        ok = DB_POOL_CHECKOUT_WAIT.snapshot(self.name, "ok")
+        timed_out = DB_POOL_CHECKOUT_WAIT.snapshot(self.name, "timeout")
+        return {
+            "count": ok["count"] + timed_out["count"],
+            "sum_seconds": ok["sum"] + timed_out["sum"],
+            "timeouts": timed_out["count"],
+            "buckets": [
+                {"le": bucket["le"], "count": bucket["count"] + other["count"]}
+                for bucket, other in zip(ok["buckets"], timed_out["buckets"])
+            ],
+        }
+
+    def stats(self) -> dict:
+        """Current pool occupancy plus the checkout wait histogram."""
+        return {
+            "size": self.size(),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": max(self.overflow(), 0),
+            "max_overflow": self._max_overflow,
+            "checkout_wait": self.checkout_wait(),
+        }
@@ -0,0 +1,45 @@
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import DateTime
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from sqlalchemy.types import TypeDecorator
+
+class utcnow(FunctionElement):
+    """
+    The current time as a server-side default, on PostgreSQL and SQLite alike.
+
+    PostgreSQL gets ``now()``. SQLite has no such function, so it gets the UTC
+    time in the text format SQLAlchemy itself stores datetimes in, padded to
+    microseconds, so that server-set and client-set values compare equal.
+    """
+    type = DateTime(timezone=True)
+    inherit_cache = True
+
+@compiles(utcnow)
+def _utcnow_default(element, compiler, **kw):
+    return "now()"
+
+@compiles(utcnow, "sqlite")
+def _utcnow_sqlite(element, compiler, **kw):
+    return "strftime('%Y-%m-%d %H:%M:%f000', 'now')"
+
+class UTCDateTime(TypeDecorator):
+    """
+    ``DateTime(timezone=True)`` that always hands back timezone-aware UTC values.
+
+    PostgreSQL stores the offset itself; SQLite keeps plain text, so values are
+    converted to UTC on the way in and marked as UTC on the way out.
+    """
+    impl = DateTime(timezone=True)
+    cache_ok = True
+
+    def process_bind_param(self, value: Optional[datetime], dialect) -> Optional[datetime]:
+        if value is not None and value.tzinfo is not None:
+            return value.astimezone(timezone.utc)
+        return value
+
+    def process_result_value(self, value: Optional[datetime], dialect) -> Optional[datetime]:
+        if value is not None and value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value
@@ -0,0 +1,58 @@
+from builtins import ValueError, int, len, str
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from uuid import UUID
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+def _as_utc(value: datetime) -> datetime:
+    # Naive timestamps are stored in UTC.
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+def make_etag(resource_id: UUID, updated_at: datetime) -> str:
+    """
+    Strong ETag for a version of a resource: its id and ``updated_at`` in microseconds.
+
+    The version can be read back from the tag, so an If-Match precondition
+    becomes a plain ``updated_at`` comparison in the UPDATE statement.
+    """
+    return f'"{resource_id.hex}-{(_as_utc(updated_at) - EPOCH) // MICROSECOND:x}"'
+
+def parse_etags(header: str) -> List[str]:
+    """Split an If-Match / If-None-Match header into entity tags; "*" is returned as is."""
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+def if_none_match(header: Optional[str], etag: str) -> bool:
+    """True if If-None-Match lists ``etag`` (weak comparison) or is "*"."""
+    if not header:
+        return False
+    for tag in parse_etags(header):
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+def versions_from_if_match(header: Optional[str], resource_id: UUID) -> Optional[List[datetime]]:
+    """
+    The ``updated_at`` values an If-Match header accepts for ``resource_id``.
+
+    None means no version constraint (no header, or "*"). Weak and foreign
+    tags never match under the strong comparison If-Match requires, so they
+    are left out; an empty list therefore means the precondition cannot hold.
+    """
+    if not header:
+        return None
+    versions = []
+    for tag in parse_etags(header):
+        if tag == "*":
+            return None
+        if len(tag) < 2 or not tag.startswith('"') or not tag.endswith('"'):
+            continue
+        tag_id, _, micros = tag[1:-1].partition("-")
+        if tag_id != resource_id.hex:
+            continue
+        try:
+            versions.append(EPOCH + int(micros, 16) * MICROSECOND)
+        except ValueError:
+            continue
+    return versions
@@ -0,0 +1,55 @@
+from builtins import bool, isinstance, str, zip
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import AsyncIterator, Sequence
+from uuid import UUID
+
+EXPORT_NDJSON = "ndjson"
+EXPORT_CSV = "csv"
+EXPORT_MEDIA_TYPES = {EXPORT_NDJSON: "application/x-ndjson", EXPORT_CSV: "text/csv"}
+
+def _json_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.name
+    return value
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return _json_value(value)
+
+async def encode_rows(columns: Sequence[str], partitions: AsyncIterator[Sequence], export_format: str) -> AsyncIterator[bytes]:
+    """
+    Encode batches of row tuples as NDJSON or CSV, one chunk of bytes per batch.
+
+    Yielding a whole batch at a time keeps the number of writes to the client
+    low while memory stays bounded by the batch size.
+    """
+    if export_format == EXPORT_CSV:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(columns)
+        async for rows in partitions:
+            writer.writerows([_csv_value(value) for value in row] for row in rows)
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+        return
+
+    async for rows in partitions:
+        lines = [
+            json.dumps({column: _json_value(value) for column, value in zip(columns, row)}, separators=(",", ":"))
+            for row in rows
+        ]
+        yield ("\n".join(lines) + "\n").encode("utf-8")
@@ -1,48 +1,115 @@
-from builtins import dict, int, max, str
-from typing import List, Callable
-from urllib.parse import urlencode
+from builtins import dict, int, len, max, str
+from typing import Dict, List, Callable, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
 from uuid import UUID
 
 from fastapi import Request
+from pydantic_core import Url
 from app.schemas.link_schema import Link
 from app.schemas.pagination_schema import PaginationLink
 
+# Query parameters that pagination links set themselves; any others on the
+# current request (filters, count strategy, ...) are carried over unchanged.
+PAGINATION_PARAMS = ("skip", "limit", "cursor", "pagination")
+USER_ID_PLACEHOLDER = "__user_id__"
+LINK_TEMPLATE_CACHE_SIZE = 256
+USER_ACTIONS = (
+    ("self", "get_user", "GET", "view"),
+    ("update", "update_user", "PUT", "update"),
+    ("delete", "delete_user", "DELETE", "delete"),
+)
+
+# Absolute user URL templates keyed by (base URL, route name); resolving a route is
+# far slower than formatting a string, and there are only a handful of base URLs.
+_user_link_templates: Dict[Tuple[str, str], str] = {}
+
 # Utility function to create a link
 def create_link(rel: str, href: str, method: str = "GET", action: str = None) -> Link:
     return Link(rel=rel, href=href, method=method, action=action)
 
-def create_pagination_link(rel: str, base_url: str, params: dict) -> PaginationLink:
-    # Ensure parameters are added in a specific order
-    query_string = f"skip={params['skip']}&limit={params['limit']}"
-    return PaginationLink(rel=rel, href=f"{base_url}?{query_string}")
+def _query_string(preserved: List[Tuple[str, str]], params: dict) -> str:
+    return urlencode(preserved + [(key, value) for key, value in params.items()])
+
+def create_pagination_link(rel: str, base_url: str, params: dict, preserved: List[Tuple[str, str]] = None) -> PaginationLink:
+    # Preserved parameters come first, then params in the order given. The href is
+    # a Url, as HttpUrl expects, so list pages serialize it without type warnings.
+    return PaginationLink.model_construct(rel=rel, href=Url(f"{base_url}?{_query_string(preserved or [], params)}"))
+
+def _split_request_url(request: Request) -> Tuple[str, List[Tuple[str, str]]]:
+    """Return the request URL without its query, and the query parameters pagination links keep."""
+    base_url, _, query = str(request.url).partition("?")
+    preserved = [(key, value) for key, value in parse_qsl(query, keep_blank_values=True) if key not in PAGINATION_PARAMS]
+    return base_url, preserved
+
+def _user_link_template(request: Request, route_name: str) -> str:
+    key = (str(request.base_url), route_name)
+    template = _user_link_templates.get(key)
+    if template is None:
+        url = str(request.url_for(route_name, user_id=USER_ID_PLACEHOLDER))
+        template = url.replace("{", "{{").replace("}", "}}").replace(USER_ID_PLACEHOLDER, "{user_id}")
+        if len(_user_link_templates) >= LINK_TEMPLATE_CACHE_SIZE:
+            _user_link_templates.clear()
+        _user_link_templates[key] = template
+    return template
 
 def create_user_links(user_id: UUID, request: Request) -> List[Link]:
     """
     Generate navigation links for user actions.
+
+    Route URLs are resolved once per base URL and then filled in with string
+    formatting; the links are built from trusted URLs without re-validation.
     """
-    actions = [
-        ("self", "get_user", "GET", "view"),
-        ("update", "update_user", "PUT", "update"),
-        ("delete", "delete_user", "DELETE", "delete")
-    ]
+    user_id = str(user_id)
     return [
-        create_link(rel, str(request.url_for(action, user_id=str(user_id))), method, action_desc)
-        for rel, action, method, action_desc in actions
+        Link.model_construct(rel=rel, href=_user_link_template(request, route_name).format(user_id=user_id), action=action_desc)
+        for rel, route_name, method, action_desc in USER_ACTIONS
     ]
 
 def generate_pagination_links(request: Request, skip: int, limit: int, total_items: int) -> List[PaginationLink]:
-    base_url = str(request.url)
+    base_url, preserved = _split_request_url(request)
     total_pages = (total_items + limit - 1) // limit
     links = [
-        create_pagination_link("self", base_url, {'skip': skip, 'limit': limit}),
-        create_pagination_link("first", base_url, {'skip': 0, 'limit': limit}),
-        create_pagination_link("last", base_url, {'skip': max(0, (total_pages - 1) * limit), 'limit': limit})
+        create_pagination_link("self", base_url, {'skip': skip, 'limit': limit}, preserved),
+        create_pagination_link("first", base_url, {'skip': 0, 'limit': limit}, preserved),
+        create_pagination_link("last", base_url, {'skip': max(0, (total_pages - 1) * limit), 'limit': limit}, preserved)
     ]
 
     if skip + limit < total_items:
-        links.append(create_pagination_link("next", base_url, {'skip': skip + limit, 'limit': limit}))
+        links.append(create_pagination_link("next", base_url, {'skip': skip + limit, 'limit': limit}, preserved))
 
     if skip > 0:
-        links.append(create_pagination_link("prev", base_url, {'skip': max(skip - limit, 0), 'limit': limit}))
+        links.append(create_pagination_link("prev", base_url, {'skip': max(skip - limit, 0), 'limit': limit}, preserved))
+
+    return links
+
+def generate_cursor_pagination_links(request: Request, limit: int, cursor: Optional[str], next_cursor: Optional[str], prev_cursor: Optional[str]) -> List[PaginationLink]:
+    """
+    Generate keyset pagination links carrying opaque cursors instead of offsets.
+    """
+    base_url, preserved = _split_request_url(request)
+    self_params = {'cursor': cursor, 'limit': limit} if cursor else {'pagination': 'cursor', 'limit': limit}
+    links = [
+        create_pagination_link("self", base_url, self_params, preserved),
+        create_pagination_link("first", base_url, {'pagination': 'cursor', 'limit': limit}, preserved)
+    ]
+
+    if next_cursor:
+        links.append(create_pagination_link("next", base_url, {'cursor': next_cursor, 'limit': limit}, preserved))
+
+    if prev_cursor:
+        links.append(create_pagination_link("prev", base_url, {'cursor': prev_cursor, 'limit': limit}, preserved))
+
+    return links
+
+def generate_search_links(request: Request, limit: int, cursor: Optional[str], next_cursor: Optional[str]) -> List[PaginationLink]:
+    """
+    Generate links for a page of search results; the query and other parameters are kept.
+    """
+    base_url, preserved = _split_request_url(request)
+    self_params = {'cursor': cursor, 'limit': limit} if cursor else {'limit': limit}
+    links = [create_pagination_link("self", base_url, self_params, preserved)]
+
+    if next_cursor:
+        links.append(create_pagination_link("next", base_url, {'cursor': next_cursor, 'limit': limit}, preserved))
 
     return links
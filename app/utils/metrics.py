@@ -0,0 +1,279 @@
+"""
+In-process metrics rendered in the Prometheus text exposition format.
+
+Histograms and gauges keep one set of counters per label combination behind
+a lock; an observation is a bisect and a few additions, cheap enough to stay
+on in production. Every worker keeps its own numbers, so scrape each worker
+(or aggregate in Prometheus) rather than expecting host-wide totals here.
+"""
+
+from builtins import dict, float, getattr, int, isinstance, len, list, repr, sorted, str, sum, zip
+import bisect
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Tuple
+
+from sqlalchemy import event
+from starlette.routing import Match
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds, in seconds, for request latency and dependency timing histograms.
+LATENCY_BUCKETS: Tuple[float, ...] = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _format_value(value: float) -> str:
+    if isinstance(value, int) or value == int(value):
+        return str(int(value))
+    return repr(value)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _label_text(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+class Histogram:
+    """Cumulative histogram per label combination, like Prometheus client histograms."""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # label values -> [per-bucket counts (+ the unbounded one), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, *labels: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def count(self, *labels: str) -> int:
+        with self._lock:
+            series = self._series.get(labels)
+            return sum(series[0]) if series else 0
+
+    def snapshot(self, *labels: str) -> dict:
+        """Count, sum and cumulative bucket counts of one series; the unbounded last bucket has ``le`` None."""
+        with self._lock:
+            series = self._series.get(labels)
+            counts, total = (list(series[0]), series[1]) if series else ([0] * (len(self.buckets) + 1), 0.0)
+        cumulative = 0
+        buckets = []
+        for bound, count in zip(list(self.buckets) + [None], counts):
+            cumulative += count
+            buckets.append({"le": bound, "count": cumulative})
+        return {"count": cumulative, "sum": total, "buckets": buckets}
+
+    def render(self) -> List[str]:
+        with self._lock:
+            snapshot = [(labels, list(series[0]), series[1]) for labels, series in self._series.items()]
+        lines = []
+        for labels, counts, total in sorted(snapshot):
+            base = _label_text(self.labelnames, labels)
+            prefix = base + "," if base else ""
+            cumulative = 0
+            for bound, count in zip(list(self.buckets) + ["+Inf"], counts):
+                cumulative += count
+                le = bound if isinstance(bound, str) else _format_value(bound)
+                lines.append(f'{self.name}_bucket{{{prefix}le="{le}"}} {cumulative}')
+            suffix = f"{{{base}}}" if base else ""
+            lines.append(f"{self.name}_sum{suffix} {_format_value(total)}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+class Gauge:
+    """Value per label combination that goes up and down."""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str):
+        with self._lock:
+            self._values[labels] = value
+
+    def value(self, *labels: str) -> float:
+        with self._lock:
+            return self._values.get(labels, 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            snapshot = sorted(self._values.items())
+        lines = []
+        for labels, value in snapshot:
+            base = _label_text(self.labelnames, labels)
+            lines.append(f"{self.name}{{{base}}} {_format_value(value)}" if base else f"{self.name} {_format_value(value)}")
+        return lines
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Time to handle an HTTP request, by route template.", ("method", "route", "status")
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "HTTP requests currently being handled, by route template.", ("method", "route")
+)
+PASSWORD_HASH_DURATION = Histogram(
+    "password_hash_duration_seconds", "Time to hash or verify a password, including the wait for a hashing worker.", ("function",)
+)
+PASSWORD_HASH_QUEUE_DEPTH = Gauge(
+    "password_hash_queue_depth", "Password hashing jobs submitted to the hashing pool and not yet finished."
+)
+PASSWORD_HASH_QUEUE_WAIT = Histogram(
+    "password_hash_queue_wait_seconds", "Time a password hashing job waited for a free hashing worker.", ("function",)
+)
+PASSWORD_HASH_WORKERS = Gauge(
+    "password_hash_workers", "Workers in the password hashing pool, once it has been started.", ("executor",)
+)
+SMTP_SEND_DURATION = Histogram(
+    "smtp_send_duration_seconds", "Time to hand emails to the SMTP server.", ("function",)
+)
+TEMPLATE_RENDER_DURATION = Histogram(
+    "template_render_duration_seconds", "Time to render an email template.", ("template",)
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds", "Time spent executing SQL statements, by statement type.", ("operation",)
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time to check a connection out of a pool, including waiting for a free one; outcome is ok or timeout.",
+    ("pool", "outcome"),
+)
+
+REGISTRY = [
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS_IN_PROGRESS,
+    PASSWORD_HASH_DURATION,
+    PASSWORD_HASH_QUEUE_DEPTH,
+    PASSWORD_HASH_QUEUE_WAIT,
+    PASSWORD_HASH_WORKERS,
+    SMTP_SEND_DURATION,
+    TEMPLATE_RENDER_DURATION,
+    DB_QUERY_DURATION,
+    DB_POOL_CHECKOUT_WAIT,
+]
+
+def render_metrics() -> str:
+    """Render every registered metric in the Prometheus text format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+SQL_OPERATIONS = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+def _statement_operation(statement: str) -> str:
+    head = statement.lstrip()[:6].upper()
+    for operation in SQL_OPERATIONS:
+        if head.startswith(operation):
+            return operation
+    return "OTHER"
+
+# Called as observer(conn, statement, parameters, seconds) after each statement.
+QueryObserver = Callable[[Any, str, Any, float], None]
+
+# Extra observers per instrumented sync engine, fed by the same timing hook as DB_QUERY_DURATION.
+_query_observers: "weakref.WeakKeyDictionary[Any, List[QueryObserver]]" = weakref.WeakKeyDictionary()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started_at"].pop()
+    DB_QUERY_DURATION.observe(elapsed, _statement_operation(statement))
+    for observer in _query_observers.get(conn.engine, ()):
+        observer(conn, statement, parameters, elapsed)
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute; drop its start time.
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started_at"):
+        connection.info["query_started_at"].pop()
+
+def instrument_engine(engine):
+    """Record the duration of every statement an (async or sync) engine executes."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(sync_engine, "handle_error", _handle_error)
+
+def observe_queries(engine, observer: QueryObserver):
+    """
+    Instrument the engine and also pass every statement's duration to ``observer``,
+    so that other instrumentation reuses this timing instead of measuring again.
+    """
+    sync_engine = getattr(engine, "sync_engine", engine)
+    instrument_engine(sync_engine)
+    observers = _query_observers.setdefault(sync_engine, [])
+    if observer not in observers:
+        observers.append(observer)
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request latency and in-flight requests per route.
+
+    Requests are labelled with the matched route template (e.g.
+    "/users/{user_id}"), never the raw path, so label values stay bounded;
+    anything that matches no route is counted as "unmatched".
+    """
+    def __init__(self, app):
+        self.app = app
+
+    def _route_template(self, scope) -> str:
+        router = scope["app"].router if "app" in scope else None
+        for route in getattr(router, "routes", ()):
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route.path
+        return "unmatched"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = self._route_template(scope)
+        status_code = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status_code[0] = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_PROGRESS.inc(method, route)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, method, route, str(status_code[0]))
+            HTTP_REQUESTS_IN_PROGRESS.dec(method, route)
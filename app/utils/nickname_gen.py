@@ -1,10 +1,37 @@
-from builtins import str
+from builtins import int, len, str
 import random
+from typing import List
 
+ADJECTIVES = [
+    "agile", "amber", "bold", "brave", "bright", "brisk", "calm", "clever", "cosmic", "crisp",
+    "curious", "daring", "eager", "fancy", "fierce", "fluffy", "gentle", "gleeful", "golden", "happy",
+    "hardy", "humble", "jolly", "keen", "kind", "lively", "lucky", "merry", "mighty", "misty",
+    "nimble", "noble", "plucky", "polite", "proud", "quick", "quiet", "rapid", "rosy", "rustic",
+    "shiny", "silent", "silver", "sleek", "sly", "smart", "snowy", "spry", "steady", "stormy",
+    "sunny", "swift", "tidy", "tiny", "vivid", "wacky", "warm", "wild", "wise", "witty",
+    "zany", "zesty", "cheery", "dapper",
+]
+ANIMALS = [
+    "badger", "beaver", "bison", "bobcat", "camel", "cheetah", "cobra", "condor", "cougar", "coyote",
+    "crane", "dingo", "dolphin", "donkey", "eagle", "falcon", "ferret", "finch", "fox", "gecko",
+    "gibbon", "giraffe", "heron", "hippo", "ibis", "iguana", "jaguar", "koala", "lemur", "leopard",
+    "lion", "llama", "lynx", "macaw", "marmot", "meerkat", "mink", "moose", "narwhal", "ocelot",
+    "octopus", "orca", "otter", "owl", "panda", "panther", "parrot", "pelican", "penguin", "puffin",
+    "python", "quokka", "rabbit", "raccoon", "raven", "salmon", "seal", "sloth", "sparrow", "tapir",
+    "tiger", "toucan", "walrus", "wombat",
+]
+NUMBER_SPACE = 100000
 
 def generate_nickname() -> str:
     """Generate a URL-safe nickname using adjectives and animal names."""
-    adjectives = ["clever", "jolly", "brave", "sly", "gentle"]
-    animals = ["panda", "fox", "raccoon", "koala", "lion"]
-    number = random.randint(0, 999)
-    return f"{random.choice(adjectives)}_{random.choice(animals)}_{number}"
+    number = random.randrange(NUMBER_SPACE)
+    return f"{random.choice(ADJECTIVES)}_{random.choice(ANIMALS)}_{number}"
+
+def generate_nicknames(count: int) -> List[str]:
+    """Generate ``count`` distinct nickname candidates to check against the database in one query."""
+    candidates = []
+    while len(candidates) < count:
+        nickname = generate_nickname()
+        if nickname not in candidates:
+            candidates.append(nickname)
+    return candidates
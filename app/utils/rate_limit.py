@@ -0,0 +1,316 @@
+"""
+Token-bucket rate limiting for sensitive endpoints such as login and registration.
+
+Each rule allows a burst of N requests and refills at N per period, counted
+separately per client IP and, where configured, per target email address. The
+buckets live either in process memory or in a small SQLite file that every
+worker on the host opens, so the limits hold across workers.
+"""
+
+from builtins import BaseException, Exception, KeyError, ValueError, bool, bytes, dict, float, int, isinstance, len, list, max, min, property, staticmethod, str
+import json
+import logging
+import math
+import sqlite3
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional
+from urllib.parse import parse_qs
+
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_MEMORY = "memory"
+RATE_LIMIT_SQLITE = "sqlite"
+
+PERIODS = {"second": 1.0, "minute": 60.0, "hour": 3600.0, "day": 86400.0}
+# Request bodies larger than this are not parsed for a target email.
+MAX_INSPECTED_BODY = 64 * 1024
+# How many bucket updates a process makes between purges of refilled buckets.
+PRUNE_EVERY = 1000
+# How long a worker waits for another worker's lock on the SQLite file before giving up.
+SQLITE_BUSY_TIMEOUT = 0.1
+
+class RateLimit(NamedTuple):
+    """A burst of ``capacity`` requests, refilled at ``capacity`` per ``period`` seconds."""
+    capacity: int
+    period: float
+
+    @property
+    def refill_rate(self) -> float:
+        return self.capacity / self.period
+
+def parse_rate(rate: str) -> RateLimit:
+    """Parse a rate such as "10/minute" or "5/second"."""
+    count, _, period = rate.partition("/")
+    try:
+        capacity = int(count)
+        seconds = PERIODS[period.strip().lower()]
+    except (KeyError, ValueError):
+        raise ValueError(f"Invalid rate limit {rate!r}; expected '<count>/<second|minute|hour|day>'")
+    if capacity < 1:
+        raise ValueError(f"Invalid rate limit {rate!r}; the count must be positive")
+    return RateLimit(capacity, seconds)
+
+def _refill(tokens: float, updated_at: float, limit: RateLimit, now: float) -> float:
+    return min(float(limit.capacity), tokens + max(now - updated_at, 0.0) * limit.refill_rate)
+
+def _take(tokens: float, limit: RateLimit):
+    """Spend one token; return the new level and how long the caller must wait if none was left."""
+    if tokens >= 1.0:
+        return tokens - 1.0, 0.0
+    return tokens, (1.0 - tokens) / limit.refill_rate
+
+class MemoryRateLimitBackend:
+    """Buckets in process memory; each worker enforces the limits on its own."""
+    # A hit never waits on I/O, so it runs directly on the event loop.
+    blocking = False
+
+    def __init__(self):
+        # key -> (tokens, updated_at, full_at)
+        self._buckets: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._updates = 0
+
+    def hit(self, key: str, limit: RateLimit, now: float) -> float:
+        """Count one request against ``key``; return 0 if allowed, else seconds until it would be."""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            tokens = _refill(bucket[0], bucket[1], limit, now) if bucket else float(limit.capacity)
+            tokens, retry_after = _take(tokens, limit)
+            self._buckets[key] = (tokens, now, now + (limit.capacity - tokens) / limit.refill_rate)
+            self._updates += 1
+            if self._updates % PRUNE_EVERY == 0:
+                self._buckets = {k: v for k, v in self._buckets.items() if v[2] > now}
+            return retry_after
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+    def close(self):
+        pass
+
+class SQLiteRateLimitBackend:
+    """
+    Buckets in a SQLite file shared by all workers on the host.
+
+    Each update runs in a ``BEGIN IMMEDIATE`` transaction, so concurrent
+    workers never lose a hit. The data is disposable, which is why the file
+    skips fsync; a crash at worst forgets some recent requests. Hits wait on
+    the file lock, so callers run them in a worker thread, and a lock held
+    longer than ``busy_timeout`` fails the hit rather than queueing requests.
+    """
+    blocking = True
+
+    def __init__(self, path: str, busy_timeout: float = SQLITE_BUSY_TIMEOUT):
+        self.path = path
+        self._connection = sqlite3.connect(path, timeout=busy_timeout, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._updates = 0
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=OFF")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit_buckets "
+                "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL, full_at REAL NOT NULL)"
+            )
+
+    def hit(self, key: str, limit: RateLimit, now: float) -> float:
+        """Count one request against ``key``; return 0 if allowed, else seconds until it would be."""
+        with self._lock:
+            connection = self._connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = connection.execute(
+                    "SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?", (key,)
+                ).fetchone()
+                tokens = _refill(row[0], row[1], limit, now) if row else float(limit.capacity)
+                tokens, retry_after = _take(tokens, limit)
+                full_at = now + (limit.capacity - tokens) / limit.refill_rate
+                connection.execute(
+                    "INSERT OR REPLACE INTO rate_limit_buckets (key, tokens, updated_at, full_at) VALUES (?, ?, ?, ?)",
+                    (key, tokens, now, full_at),
+                )
+                self._updates += 1
+                if self._updates % PRUNE_EVERY == 0:
+                    # A bucket that has refilled completely behaves exactly like a missing one.
+                    connection.execute("DELETE FROM rate_limit_buckets WHERE full_at <= ?", (now,))
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            return retry_after
+
+    def reset(self):
+        with self._lock:
+            self._connection.execute("DELETE FROM rate_limit_buckets")
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+class RateLimiter:
+    """
+    Applies per-route rules keyed by client IP and by target email.
+
+    ``ip_rules`` and ``email_rules`` map request paths (e.g. "/login/") to
+    rates such as "10/minute". ``trusted_proxies`` is the number of reverse
+    proxies in front of the app; the client IP is taken from that many entries
+    from the right of X-Forwarded-For, so a client cannot pick its own key by
+    sending the header itself. With 0 the header is ignored.
+    """
+    def __init__(self, backend, ip_rules: Dict[str, str], email_rules: Dict[str, str], trusted_proxies: int = 1):
+        self.backend = backend
+        self.ip_rules = {path: parse_rate(rate) for path, rate in ip_rules.items()}
+        self.email_rules = {path: parse_rate(rate) for path, rate in email_rules.items()}
+        self.trusted_proxies = trusted_proxies
+
+    @property
+    def blocking(self) -> bool:
+        """Whether ``check`` may wait on I/O and belongs off the event loop."""
+        return self.backend.blocking
+
+    def applies_to(self, path: str) -> bool:
+        return path in self.ip_rules or path in self.email_rules
+
+    def wants_email(self, path: str) -> bool:
+        return path in self.email_rules
+
+    def client_ip(self, peer: Optional[str], forwarded_for: Optional[str]) -> str:
+        if forwarded_for and self.trusted_proxies > 0:
+            hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()]
+            if hops:
+                return hops[-min(self.trusted_proxies, len(hops))]
+        return peer or "unknown"
+
+    def check(self, path: str, ip: str, email: Optional[str] = None, now: Optional[float] = None) -> float:
+        """Count a request; return 0 if it may proceed, else the seconds to wait before retrying."""
+        now = time.time() if now is None else now
+        retry_after = 0.0
+        limit = self.ip_rules.get(path)
+        if limit is not None:
+            retry_after = self.backend.hit(f"ip:{path}:{ip}", limit, now)
+        limit = self.email_rules.get(path)
+        if limit is not None and email:
+            retry_after = max(retry_after, self.backend.hit(f"email:{path}:{email}", limit, now))
+        return retry_after
+
+    def reset(self):
+        """Forget all buckets."""
+        self.backend.reset()
+
+    def close(self):
+        self.backend.close()
+
+def create_rate_limiter(backend: str, ip_rules: Dict[str, str], email_rules: Dict[str, str],
+                        trusted_proxies: int = 1, sqlite_path: Optional[str] = None) -> RateLimiter:
+    """Build a limiter on the 'sqlite' (shared by the workers on a host) or 'memory' backend."""
+    if backend == RATE_LIMIT_SQLITE:
+        store = SQLiteRateLimitBackend(sqlite_path)
+    elif backend == RATE_LIMIT_MEMORY:
+        store = MemoryRateLimitBackend()
+    else:
+        raise ValueError(f"Unknown rate limit backend: {backend}")
+    return RateLimiter(store, ip_rules, email_rules, trusted_proxies)
+
+def extract_email(content_type: str, body: bytes) -> Optional[str]:
+    """Find the target account in a login form ("username") or a JSON body ("email")."""
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    try:
+        if media_type == "application/x-www-form-urlencoded":
+            values = parse_qs(body.decode("utf-8"))
+            email = (values.get("username") or values.get("email") or [None])[0]
+        elif media_type == "application/json":
+            data = json.loads(body)
+            email = data.get("email") if isinstance(data, dict) else None
+        else:
+            return None
+    except ValueError:
+        return None
+    return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware that answers 429 with Retry-After once a client or a
+    target email runs out of requests on a limited route.
+
+    Only requests to limited routes are inspected; when a route is limited by
+    email, its (small) body is read up front and replayed to the application.
+    If the limiter's store fails (for example, the SQLite file stays locked),
+    the error is logged and the request is let through unlimited.
+    """
+    def __init__(self, app, limiter: RateLimiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.limiter.applies_to(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        headers = {name.decode("latin-1"): value.decode("latin-1") for name, value in scope["headers"]}
+        peer = scope["client"][0] if scope.get("client") else None
+        ip = self.limiter.client_ip(peer, headers.get("x-forwarded-for"))
+        email = None
+        if self.limiter.wants_email(scope["path"]):
+            messages, body = await self._read_body(receive)
+            if body is not None:
+                email = extract_email(headers.get("content-type", ""), body)
+            receive = self._replay(messages, receive)
+
+        retry_after = await self._check(scope["path"], ip, email)
+        if retry_after > 0:
+            await self._reject(send, retry_after)
+            return
+        await self.app(scope, receive, send)
+
+    async def _check(self, path: str, ip: str, email: Optional[str]) -> float:
+        try:
+            if self.limiter.blocking:
+                return await run_in_threadpool(self.limiter.check, path, ip, email)
+            return self.limiter.check(path, ip, email)
+        except Exception as e:
+            logger.warning(f"Rate limiter unavailable, allowing {path} request: {e}")
+            return 0.0
+
+    @staticmethod
+    async def _read_body(receive):
+        """Read the request body; the body is None if it is larger than MAX_INSPECTED_BODY."""
+        messages: List[dict] = []
+        size = 0
+        while True:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request":
+                return messages, None
+            size += len(message.get("body", b""))
+            if size > MAX_INSPECTED_BODY:
+                return messages, None
+            if not message.get("more_body", False):
+                return messages, b"".join(m.get("body", b"") for m in messages)
+
+    @staticmethod
+    def _replay(messages: List[dict], receive):
+        pending = list(messages)
+
+        async def replay():
+            if pending:
+                return pending.pop(0)
+            return await receive()
+        return replay
+
+    @staticmethod
+    async def _reject(send, retry_after: float):
+        body = json.dumps({"detail": "Too many requests. Try again later."}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"retry-after", str(math.ceil(retry_after)).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,70 @@
+"""
+Read-your-writes consistency for reads served by replicas.
+
+A replica may trail the primary by up to ``replica_max_lag_seconds``, so a
+client could read back the old version of a row it has just changed. Every
+successful write request (an unsafe method answered below 400) therefore
+stamps the client with a cookie holding the time of the write. For the length
+of the lag window after that, the client's read sessions use the primary.
+"""
+
+from builtins import ValueError, abs, bool, dict, float, list, str
+import math
+import time
+from contextvars import ContextVar
+from http.cookies import CookieError, SimpleCookie
+from typing import Optional
+
+LAST_WRITE_COOKIE = "last_write_at"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_reads_from_primary: ContextVar[bool] = ContextVar("reads_from_primary", default=False)
+
+def reads_from_primary() -> bool:
+    """Whether the current request comes from a client that wrote within the lag window."""
+    return _reads_from_primary.get()
+
+def last_write_at(cookie_header: str) -> Optional[float]:
+    """The write time carried by a Cookie header, or None if it has none or it is malformed."""
+    cookies = SimpleCookie()
+    try:
+        cookies.load(cookie_header)
+        morsel = cookies.get(LAST_WRITE_COOKIE)
+        return float(morsel.value) if morsel is not None else None
+    except (CookieError, ValueError):
+        return None
+
+class ReadYourWritesMiddleware:
+    """
+    ASGI middleware that stamps writing clients and routes their reads to the primary.
+
+    The cookie expires with the window, and a stamp older than the window (or
+    further in the future than that, from a skewed clock) is ignored.
+    """
+    def __init__(self, app, window_seconds: float):
+        self.app = app
+        self.window_seconds = window_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        cookie_header = b"; ".join(value for name, value in scope["headers"] if name == b"cookie")
+        written_at = last_write_at(cookie_header.decode("latin-1")) if cookie_header else None
+        recent = written_at is not None and abs(time.time() - written_at) < self.window_seconds
+
+        async def send_with_stamp(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                cookie = (
+                    f"{LAST_WRITE_COOKIE}={time.time():.3f}; Max-Age={math.ceil(self.window_seconds)}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+                message = dict(message, headers=list(message.get("headers", [])) + [(b"set-cookie", cookie.encode("latin-1"))])
+            await send(message)
+
+        token = _reads_from_primary.set(recent)
+        try:
+            await self.app(scope, receive, send if scope["method"] in SAFE_METHODS else send_with_stamp)
+        finally:
+            _reads_from_primary.reset(token)
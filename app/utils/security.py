@@ -1,8 +1,15 @@
 # app/security.py
-from builtins import Exception, ValueError, bool, int, str
+from builtins import Exception, ValueError, bool, dict, int, max, str
+import asyncio
 import secrets
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
 import bcrypt
 from logging import getLogger
+from settings.config import settings
+from app.utils.metrics import PASSWORD_HASH_DURATION, PASSWORD_HASH_QUEUE_DEPTH, PASSWORD_HASH_QUEUE_WAIT, PASSWORD_HASH_WORKERS
 
 # Set up logging
 logger = getLogger(__name__)
@@ -50,4 +57,84 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         raise ValueError("Authentication process encountered an unexpected error") from e
 
 def generate_verification_token():
-    return secrets.token_urlsafe(16)  # Generates a secure 16-byte URL-safe token
\ No newline at end of file
+    return secrets.token_urlsafe(16)  # Generates a secure 16-byte URL-safe token
+
+# Bcrypt at cost 12 takes a few hundred milliseconds, so the async variants below
+# hand the work to a dedicated, bounded pool instead of blocking the event loop.
+_hash_executor: Optional[Executor] = None
+_hash_executor_lock = threading.Lock()
+_hash_stats = {
+    "submitted": 0,
+    "completed": 0,
+    "in_flight": 0,
+    "wait_seconds_total": 0.0,
+    "wait_seconds_max": 0.0,
+}
+
+def _get_hash_executor() -> Executor:
+    """Lazily create the password hashing pool sized from settings."""
+    global _hash_executor
+    if _hash_executor is None:
+        with _hash_executor_lock:
+            if _hash_executor is None:
+                workers = max(1, settings.password_hash_workers)
+                if settings.password_hash_executor == "process":
+                    _hash_executor = ProcessPoolExecutor(max_workers=workers)
+                else:
+                    _hash_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+                PASSWORD_HASH_WORKERS.set(workers, settings.password_hash_executor)
+    return _hash_executor
+
+def _timed_call(func, *args):
+    """Run ``func`` in a pool worker and report when the worker picked it up."""
+    return time.monotonic(), func(*args)
+
+async def _run_in_hash_pool(func, *args):
+    loop = asyncio.get_running_loop()
+    submitted_at = time.monotonic()
+    _hash_stats["submitted"] += 1
+    _hash_stats["in_flight"] += 1
+    PASSWORD_HASH_QUEUE_DEPTH.inc()
+    try:
+        started_at, result = await loop.run_in_executor(_get_hash_executor(), _timed_call, func, *args)
+    finally:
+        _hash_stats["in_flight"] -= 1
+        _hash_stats["completed"] += 1
+        PASSWORD_HASH_QUEUE_DEPTH.dec()
+    PASSWORD_HASH_DURATION.observe(time.monotonic() - submitted_at, func.__name__)
+    waited = max(0.0, started_at - submitted_at)
+    PASSWORD_HASH_QUEUE_WAIT.observe(waited, func.__name__)
+    _hash_stats["wait_seconds_total"] += waited
+    _hash_stats["wait_seconds_max"] = max(_hash_stats["wait_seconds_max"], waited)
+    return result
+
+async def hash_password_async(password: str, rounds: int = 12) -> str:
+    """Hash a password in the hashing pool without blocking the event loop."""
+    return await _run_in_hash_pool(hash_password, password, rounds)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in the hashing pool without blocking the event loop."""
+    return await _run_in_hash_pool(verify_password, plain_password, hashed_password)
+
+def get_hashing_pool_stats() -> dict:
+    """
+    Return a snapshot of the hashing pool metrics.
+
+    The queue depth, queue wait and worker count are also published on ``/metrics``.
+
+    ``in_flight`` is the queue depth (jobs submitted but not finished) and the
+    wait figures measure how long jobs sat in the queue before a worker started them.
+    """
+    stats = dict(_hash_stats)
+    stats["workers"] = max(1, settings.password_hash_workers)
+    stats["executor"] = settings.password_hash_executor
+    stats["wait_seconds_avg"] = stats["wait_seconds_total"] / stats["completed"] if stats["completed"] else 0.0
+    return stats
+
+def shutdown_hashing_pool():
+    """Shut down the hashing pool; it is recreated on next use."""
+    global _hash_executor
+    with _hash_executor_lock:
+        if _hash_executor is not None:
+            _hash_executor.shutdown(wait=True)
+            _hash_executor = None
@@ -1,31 +1,184 @@
 # smtp_client.py
-from builtins import Exception, int, str
+from builtins import ConnectionError, Exception, classmethod, float, int, len, list, staticmethod, str
+import asyncio
+import queue
 import smtplib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from typing import List, Tuple
 from settings.config import settings
+from app.utils.metrics import SMTP_SEND_DURATION
 import logging
 
+class SMTPConnectionPool:
+    """
+    Keeps up to ``size`` authenticated SMTP connections open and hands them out
+    to blocking senders, so STARTTLS and login happen once per connection
+    rather than once per message.
+
+    Sends run on the pool's own ``size`` worker threads rather than the loop's
+    default executor, so a slow server never holds more threads than it has
+    connection slots and cannot starve unrelated ``to_thread`` work.
+    """
+    def __init__(self, server: str, port: int, username: str, password: str, size: int = 4, use_tls: bool = True, timeout: float = 10.0):
+        self.server = server
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="smtp")
+
+    def _connect(self) -> smtplib.SMTP:
+        connection = smtplib.SMTP(self.server, self.port, timeout=self.timeout)
+        try:
+            connection.ehlo()
+            if self.use_tls:
+                connection.starttls()
+                connection.ehlo()
+            # Local SMTP stand-ins used for load tests usually do not offer AUTH.
+            if self.username and connection.has_extn("auth"):
+                connection.login(self.username, self.password)
+        except Exception:
+            self._discard(connection)
+            raise
+        return connection
+
+    @staticmethod
+    def _discard(connection: smtplib.SMTP):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _checkout(self) -> smtplib.SMTP:
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            return self._connect()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _checkin(self, connection: smtplib.SMTP, healthy: bool = True):
+        if healthy:
+            self._idle.put(connection)
+        else:
+            self._discard(connection)
+        self._slots.release()
+
+    def send_messages(self, messages: List[Tuple[str, str, str]]):
+        """
+        Send ``(sender, recipient, message)`` tuples back to back over one pooled connection.
+
+        A connection the server has dropped (for example after an idle timeout)
+        is replaced and the message retried once.
+        """
+        connection = self._checkout()
+        healthy = False
+        try:
+            for sender, recipient, message in messages:
+                try:
+                    connection.sendmail(sender, recipient, message)
+                except (smtplib.SMTPServerDisconnected, ConnectionError):
+                    logging.info("SMTP connection to %s lost, reconnecting", self.server)
+                    self._discard(connection)
+                    connection = self._connect()
+                    connection.sendmail(sender, recipient, message)
+            healthy = True
+        finally:
+            self._checkin(connection, healthy)
+
+    async def send_messages_async(self, messages: List[Tuple[str, str, str]]):
+        """Run ``send_messages`` on the pool's dedicated worker threads."""
+        await asyncio.get_running_loop().run_in_executor(self._executor, self.send_messages, messages)
+
+    def close(self):
+        """Wait for in-flight sends, then close all idle connections."""
+        self._executor.shutdown(wait=True)
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                connection.quit()
+            except Exception:
+                self._discard(connection)
+
 class SMTPClient:
+    # Pools are shared by every client pointing at the same server and account,
+    # so short-lived EmailService instances still reuse open connections.
+    _pools = {}
+    _pools_lock = threading.Lock()
+
     def __init__(self, server: str, port: int, username: str, password: str):
         self.server = server
         self.port = port
         self.username = username
         self.password = password
 
+    def _build_message(self, subject: str, html_content: str, recipient: str) -> str:
+        message = MIMEMultipart('alternative')
+        message['Subject'] = subject
+        message['From'] = self.username
+        message['To'] = recipient
+        message.attach(MIMEText(html_content, 'html'))
+        return message.as_string()
+
     def send_email(self, subject: str, html_content: str, recipient: str):
         try:
-            message = MIMEMultipart('alternative')
-            message['Subject'] = subject
-            message['From'] = self.username
-            message['To'] = recipient
-            message.attach(MIMEText(html_content, 'html'))
+            message = self._build_message(subject, html_content, recipient)
 
-            with smtplib.SMTP(self.server, self.port) as server:
+            with SMTP_SEND_DURATION.time("send_email"), smtplib.SMTP(self.server, self.port) as server:
                 server.starttls()  # Use TLS
                 server.login(self.username, self.password)
-                server.sendmail(self.username, recipient, message.as_string())
+                server.sendmail(self.username, recipient, message)
             logging.info(f"Email sent to {recipient}")
         except Exception as e:
             logging.error(f"Failed to send email: {str(e)}")
             raise
+
+    def _get_pool(self) -> SMTPConnectionPool:
+        key = (self.server, self.port, self.username)
+        with self._pools_lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = SMTPConnectionPool(
+                    self.server, self.port, self.username, self.password,
+                    size=settings.smtp_pool_size, use_tls=settings.smtp_use_tls, timeout=settings.smtp_timeout
+                )
+                self._pools[key] = pool
+            return pool
+
+    async def send_email_async(self, subject: str, html_content: str, recipient: str):
+        """Send one email over a pooled connection without blocking the event loop."""
+        await self.send_emails_async([(subject, html_content, recipient)])
+
+    async def send_emails_async(self, emails: List[Tuple[str, str, str]]):
+        """Send ``(subject, html_content, recipient)`` tuples in one batch over a pooled connection."""
+        messages = [(self.username, recipient, self._build_message(subject, html_content, recipient))
+                    for subject, html_content, recipient in emails]
+        try:
+            with SMTP_SEND_DURATION.time("send_emails_async"):
+                await self._get_pool().send_messages_async(messages)
+            logging.info(f"Sent {len(messages)} email(s) via {self.server}")
+        except Exception as e:
+            logging.error(f"Failed to send email: {str(e)}")
+            raise
+
+    @classmethod
+    def close_pools(cls):
+        """Close every pooled SMTP connection and its worker threads."""
+        with cls._pools_lock:
+            pools = list(cls._pools.values())
+            cls._pools.clear()
+        for pool in pools:
+            pool.close()
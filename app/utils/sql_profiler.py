@@ -0,0 +1,149 @@
+"""
+Opt-in per-request SQL profiling.
+
+While a request is profiled, every statement executed on an instrumented
+engine is counted and timed against that request through a context variable.
+At the end of the request statements that ran many times with the same SQL
+text (the usual N+1 shape) are reported. Independently, any statement slower
+than the threshold is logged with its parameters and, if enabled, the
+EXPLAIN ANALYZE plan of a SELECT.
+"""
+
+from builtins import Exception, classmethod, dict, float, int, list, repr, staticmethod, str
+import logging
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+from app.utils.metrics import observe_queries
+
+logger = logging.getLogger(__name__)
+
+# Longest parameter repr written to the slow query log.
+MAX_LOGGED_PARAMETERS = 500
+
+class QueryProfile:
+    """Statements executed while handling one request."""
+    def __init__(self):
+        self.statement_count = 0
+        self.db_seconds = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, seconds: float):
+        self.statement_count += 1
+        self.db_seconds += seconds
+        self.shapes[statement] += 1
+
+    def repeated_statements(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statements executed at least ``threshold`` times, most frequent first."""
+        return [(statement, count) for statement, count in self.shapes.most_common() if count >= threshold]
+
+_current_profile: ContextVar[Optional[QueryProfile]] = ContextVar("sql_profile", default=None)
+
+class SQLProfiler:
+    """Engine instrumentation and settings shared by all profiled requests."""
+    slow_query_seconds = 0.5
+    explain_slow_queries = False
+    repeat_threshold = 5
+
+    @classmethod
+    def configure(cls, slow_query_seconds: float = 0.5, explain_slow_queries: bool = False, repeat_threshold: int = 5):
+        """
+        Args:
+            slow_query_seconds: Statements taking at least this long are logged.
+            explain_slow_queries: Also log the EXPLAIN ANALYZE plan of slow SELECTs
+                (PostgreSQL only). The SELECT runs a second time to produce it.
+            repeat_threshold: Report statements a request executed at least this often.
+        """
+        cls.slow_query_seconds = slow_query_seconds
+        cls.explain_slow_queries = explain_slow_queries
+        cls.repeat_threshold = repeat_threshold
+
+    @classmethod
+    def instrument(cls, engine):
+        """Attach the profiler to an (async or sync) engine."""
+        observe_queries(engine, _observe_query)
+
+    @staticmethod
+    @contextmanager
+    def profile() -> Iterator[QueryProfile]:
+        """Collect the statements executed inside the block (in this task) into a QueryProfile."""
+        profile = QueryProfile()
+        token = _current_profile.set(profile)
+        try:
+            yield profile
+        finally:
+            _current_profile.reset(token)
+
+    @staticmethod
+    def current() -> Optional[QueryProfile]:
+        return _current_profile.get()
+
+def _observe_query(conn, statement, parameters, elapsed: float):
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.record(statement, elapsed)
+    if elapsed >= SQLProfiler.slow_query_seconds:
+        _log_slow_query(conn, statement, parameters, elapsed)
+
+def _log_slow_query(conn, statement, parameters, elapsed: float):
+    logger.warning(
+        f"Slow query ({elapsed * 1000:.1f} ms): {statement} parameters={repr(parameters)[:MAX_LOGGED_PARAMETERS]}"
+    )
+    if not SQLProfiler.explain_slow_queries or conn.dialect.name != "postgresql":
+        return
+    if not statement.lstrip()[:6].upper().startswith("SELECT"):
+        return
+    # A separate DBAPI cursor leaves the original result unread for the caller, the raw
+    # cursor fires no engine events, and the savepoint keeps a failure from aborting
+    # the caller's transaction.
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute("SAVEPOINT sql_profiler_explain")
+        try:
+            cursor.execute(f"EXPLAIN ANALYZE {statement}", parameters)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+            cursor.execute("RELEASE SAVEPOINT sql_profiler_explain")
+        except Exception:
+            cursor.execute("ROLLBACK TO SAVEPOINT sql_profiler_explain")
+            raise
+        logger.warning(f"Plan of slow query:\n{plan}")
+    except Exception as e:
+        logger.warning(f"Could not capture the plan of a slow query: {e}")
+    finally:
+        cursor.close()
+
+class SQLProfilerMiddleware:
+    """
+    ASGI middleware that profiles the SQL of each request.
+
+    Repeated statements are logged once the request finishes. With
+    ``expose_headers`` (debug mode), the response carries X-DB-Query-Count
+    and X-DB-Time-Ms.
+    """
+    def __init__(self, app, expose_headers: bool = False):
+        self.app = app
+        self.expose_headers = expose_headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start" and self.expose_headers:
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-query-count", str(profile.statement_count).encode("latin-1")))
+                headers.append((b"x-db-time-ms", f"{profile.db_seconds * 1000:.2f}".encode("latin-1")))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        with SQLProfiler.profile() as profile:
+            try:
+                await self.app(scope, receive, send_with_headers)
+            finally:
+                for statement, count in profile.repeated_statements(SQLProfiler.repeat_threshold):
+                    logger.warning(
+                        f"Possible N+1: {scope['method']} {scope['path']} executed the same statement {count} times: {statement}"
+                    )
@@ -1,5 +1,27 @@
+import html
+import os
+import re
+import string
+import threading
 import markdown2
 from pathlib import Path
+from app.utils.metrics import TEMPLATE_RENDER_DURATION
+
+EMAIL_STYLES = {
+    'body': 'font-family: Arial, sans-serif; font-size: 16px; color: #333333; background-color: #ffffff; line-height: 1.5;',
+    'h1': 'font-size: 24px; color: #333333; font-weight: bold; margin-top: 20px; margin-bottom: 10px;',
+    'p': 'font-size: 16px; color: #666666; margin: 10px 0; line-height: 1.6;',
+    'a': 'color: #0056b3; text-decoration: none; font-weight: bold;',
+    'footer': 'font-size: 12px; color: #777777; padding: 20px 0;',
+    'ul': 'list-style-type: none; padding: 0;',
+    'li': 'margin-bottom: 10px;'
+}
+_STYLED_TAG_PATTERN = re.compile('<(%s)>' % '|'.join(tag for tag in EMAIL_STYLES if tag != 'body'))
+
+# Compiled templates shared by every TemplateManager, keyed by (templates_dir, template_name)
+# and stored with the mtimes of the files they were built from.
+_compiled_templates = {}
+_compiled_templates_lock = threading.Lock()
 
 class TemplateManager:
     def __init__(self):
@@ -15,22 +37,10 @@ class TemplateManager:
 
     def _apply_email_styles(self, html: str) -> str:
         """Apply advanced CSS styles inline for email compatibility with excellent typography."""
-        styles = {
-            'body': 'font-family: Arial, sans-serif; font-size: 16px; color: #333333; background-color: #ffffff; line-height: 1.5;',
-            'h1': 'font-size: 24px; color: #333333; font-weight: bold; margin-top: 20px; margin-bottom: 10px;',
-            'p': 'font-size: 16px; color: #666666; margin: 10px 0; line-height: 1.6;',
-            'a': 'color: #0056b3; text-decoration: none; font-weight: bold;',
-            'footer': 'font-size: 12px; color: #777777; padding: 20px 0;',
-            'ul': 'list-style-type: none; padding: 0;',
-            'li': 'margin-bottom: 10px;'
-        }
         # Wrap entire HTML content in <div> with body style
-        styled_html = f'<div style="{styles["body"]}">{html}</div>'
-        # Apply styles to each HTML element
-        for tag, style in styles.items():
-            if tag != 'body':  # Skip the body style since it's already applied to the <div>
-                styled_html = styled_html.replace(f'<{tag}>', f'<{tag} style="{style}">')
-        return styled_html
+        styled_html = f'<div style="{EMAIL_STYLES["body"]}">{html}</div>'
+        # Apply styles to every plain element tag in one pass
+        return _STYLED_TAG_PATTERN.sub(lambda match: f'<{match.group(1)} style="{EMAIL_STYLES[match.group(1)]}">', styled_html)
 
     def render_template(self, template_str: str, context: dict = None) -> str:
         """
@@ -44,16 +54,56 @@ class TemplateManager:
             rendered = rendered.replace(f"{{{{ {k} }}}}", str(v))
         return rendered
 
-    # (The original render_template for file-based templates remains for production use)
-    def render_template_from_file(self, template_name: str, **context) -> str:
-        """Render a markdown template with given context, applying advanced email styles."""
+    def _compile_template(self, template_name: str) -> str:
+        """
+        Convert header, body and footer into one styled HTML format string.
+
+        Each ``{field}`` in the body is swapped for a plain-text slot marker
+        before the markdown conversion and restored afterwards, so rendering
+        only has to interpolate the context.
+        """
         header = self._read_template('header.md')
         footer = self._read_template('footer.md')
-
-        # Read main template and format it with provided context
         main_template = self._read_template(f'{template_name}.md')
-        main_content = main_template.format(**context)
 
-        full_markdown = f"{header}\n{main_content}\n{footer}"
-        html_content = markdown2.markdown(full_markdown)
-        return self._apply_email_styles(html_content)
+        slots = []
+        parts = []
+        for literal_text, field_name, format_spec, conversion in string.Formatter().parse(main_template):
+            parts.append(literal_text)
+            if field_name is not None:
+                marker = f"TMPLSLOT{len(slots)}X"
+                field = field_name + (f"!{conversion}" if conversion else "") + (f":{format_spec}" if format_spec else "")
+                slots.append((marker, "{" + field + "}"))
+                parts.append(marker)
+
+        full_markdown = f"{header}\n{''.join(parts)}\n{footer}"
+        styled_html = self._apply_email_styles(markdown2.markdown(full_markdown))
+        compiled = styled_html.replace("{", "{{").replace("}", "}}")
+        for marker, field in slots:
+            compiled = compiled.replace(marker, field)
+        return compiled
+
+    def _get_compiled_template(self, template_name: str) -> str:
+        names = ('header.md', 'footer.md', f'{template_name}.md')
+        mtimes = tuple(os.stat(self.templates_dir / name).st_mtime_ns for name in names)
+        key = (str(self.templates_dir), template_name)
+        cached = _compiled_templates.get(key)
+        if cached is not None and cached[0] == mtimes:
+            return cached[1]
+        compiled = self._compile_template(template_name)
+        with _compiled_templates_lock:
+            _compiled_templates[key] = (mtimes, compiled)
+        return compiled
+
+    # (The original render_template for file-based templates remains for production use)
+    def render_template_from_file(self, template_name: str, **context) -> str:
+        """
+        Render a markdown template with given context, applying advanced email styles.
+
+        The styled HTML is compiled once per template and rebuilt when any of its
+        files change on disk. String values are HTML-escaped as they are inserted.
+        """
+        with TEMPLATE_RENDER_DURATION.time(template_name):
+            compiled = self._get_compiled_template(template_name)
+            escaped = {key: html.escape(value) if isinstance(value, str) else value for key, value in context.items()}
+            return compiled.format(**escaped)
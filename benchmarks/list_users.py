@@ -0,0 +1,94 @@
+"""
+Compare the cost of turning a 100-user page into a JSON response on the old
+path (ORM entities, per-item model_validate, response_model validation and
+jsonable_encoder) and the projection path used by GET /users/ (column rows
+serialized by one cached TypeAdapter.dump_json).
+
+Only response building is measured; no database is needed.
+
+Run from the project root:
+
+    python -m benchmarks.list_users [iterations]
+"""
+from builtins import int, isinstance, len, next, print, range, sorted
+import asyncio
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+from fastapi.routing import APIRoute, serialize_response
+from fastapi.responses import JSONResponse
+from sqlalchemy.engine import result_tuple
+
+from app.main import app
+from app.models.user_model import User, UserRole
+from app.routers.user_routes import user_list_response
+from app.schemas.user_schemas import UserListResponse, UserResponse
+from app.services.user_service import LIST_COLUMNS
+
+PAGE_SIZE = 100
+
+
+def make_users():
+    now = datetime.now(timezone.utc)
+    return [
+        User(
+            id=uuid.uuid4(), nickname=f"bench_user_{i}", email=f"bench_{i}@example.com",
+            first_name="Bench", last_name=f"User{i}", bio="Benchmark user " * 5,
+            profile_picture_url=f"https://example.com/pictures/{i}.jpg",
+            linkedin_profile_url=f"https://linkedin.com/in/bench{i}",
+            github_profile_url=f"https://github.com/bench{i}",
+            role=UserRole.AUTHENTICATED, is_professional=False, hashed_password="x" * 60,
+            verification_token="t" * 32, created_at=now, updated_at=now,
+        )
+        for i in range(PAGE_SIZE)
+    ]
+
+
+def make_rows(users):
+    keys = [column.key for column in LIST_COLUMNS]
+    make_row = result_tuple(keys)
+    return [make_row([getattr(user, key) for key in keys]) for user in users]
+
+
+async def old_path(users, response_field):
+    items = [UserResponse.model_validate(user) for user in users]
+    page = UserListResponse(items=items, total=1000, page=1, size=len(items), links=[])
+    content = await serialize_response(field=response_field, response_content=page)
+    return JSONResponse(content).body
+
+
+def new_path(rows):
+    return user_list_response(rows, total=1000, total_strategy="exact", links=[], page=1).body
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    return ordered[len(ordered) // 2], ordered[int(len(ordered) * 0.99) - 1]
+
+
+async def main(iterations: int = 2000):
+    route = next(r for r in app.routes if isinstance(r, APIRoute) and r.path == "/users/" and "GET" in r.methods)
+    users = make_users()
+    rows = make_rows(users)
+
+    old_samples, new_samples = [], []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await old_path(users, route.response_field)
+        old_samples.append(time.perf_counter() - started)
+        started = time.perf_counter()
+        new_path(rows)
+        new_samples.append(time.perf_counter() - started)
+
+    old_p50, old_p99 = percentiles(old_samples)
+    new_p50, new_p99 = percentiles(new_samples)
+    print(f"page of {PAGE_SIZE} users, {iterations} iterations")
+    print(f"old path:        p50 {old_p50 * 1e3:7.3f} ms   p99 {old_p99 * 1e3:7.3f} ms")
+    print(f"projection path: p50 {new_p50 * 1e3:7.3f} ms   p99 {new_p99 * 1e3:7.3f} ms")
+    print(f"speedup:         p50 {old_p50 / new_p50:5.1f}x      p99 {old_p99 / new_p99:5.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000))
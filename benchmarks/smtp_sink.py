@@ -0,0 +1,90 @@
+"""
+A minimal SMTP server that accepts every message and throws it away.
+
+Load tests point the application at it so that registration and user
+creation exercise the real SMTP client code without a mail provider. It
+offers neither STARTTLS nor AUTH, so run the app with SMTP_USE_TLS=false.
+
+Run on its own from the project root:
+
+    python -m benchmarks.smtp_sink [port]
+"""
+from builtins import ConnectionError, int, len, print, str
+import asyncio
+import sys
+
+
+class SMTPSink:
+    """Speaks just enough SMTP for smtplib; counts the messages it receives."""
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self.messages_received = 0
+        self._server = None
+        self._connections = {}
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            # Clients such as the app's SMTP pool keep their connections open.
+            for writer in self._connections:
+                writer.close()
+            await asyncio.gather(*self._connections.values(), return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        async def reply(line: str):
+            writer.write(line.encode("ascii") + b"\r\n")
+            await writer.drain()
+
+        self._connections[writer] = asyncio.current_task()
+        try:
+            await reply("220 smtp-sink ready")
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command = line[:4].decode("ascii", "replace").upper()
+                if command == "EHLO":
+                    await reply("250-smtp-sink")
+                    await reply("250 8BITMIME")
+                elif command == "DATA":
+                    await reply("354 End data with <CR><LF>.<CR><LF>")
+                    while await reader.readline() not in (b".\r\n", b".\n", b""):
+                        pass
+                    self.messages_received += 1
+                    await reply("250 OK: queued")
+                elif command == "QUIT":
+                    await reply("221 Bye")
+                    break
+                else:
+                    # HELO, MAIL, RCPT, RSET and NOOP all succeed.
+                    await reply("250 OK")
+        except ConnectionError:
+            pass
+        finally:
+            self._connections.pop(writer, None)
+            writer.close()
+
+
+async def main(port: int = 2525):
+    sink = SMTPSink(port=port)
+    await sink.start()
+    print(f"SMTP sink listening on {sink.host}:{sink.port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await sink.stop()
+        print(f"{sink.messages_received} messages received")
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2525))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,40 @@
+"""
+Measure the per-request cost of authenticating an admin call with and without
+the verified-token cache.
+
+Run from the project root:
+
+    python -m benchmarks.token_cache [iterations]
+"""
+from builtins import dict, int, len, min, print
+import sys
+import timeit
+from unittest.mock import patch
+
+from app.dependencies import get_current_user, require_role
+from app.services import jwt_service
+from app.services.jwt_service import clear_token_cache, create_access_token
+
+
+def authenticate_admin(token: str) -> dict:
+    """Run the same dependency chain FastAPI runs for an admin endpoint."""
+    return require_role(["ADMIN", "MANAGER"])(get_current_user(token))
+
+
+def main(iterations: int = 20000):
+    token = create_access_token(data={"sub": "admin@example.com", "role": "ADMIN"})
+
+    with patch("app.dependencies.decode_token_cached", jwt_service.decode_token):
+        uncached = min(timeit.repeat(lambda: authenticate_admin(token), number=iterations, repeat=5)) / iterations
+
+    clear_token_cache()
+    authenticate_admin(token)
+    cached = min(timeit.repeat(lambda: authenticate_admin(token), number=iterations, repeat=5)) / iterations
+
+    print(f"uncached: {uncached * 1e6:8.2f} us/request")
+    print(f"cached:   {cached * 1e6:8.2f} us/request")
+    print(f"saving:   {(uncached - cached) * 1e6:8.2f} us/request ({uncached / cached:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -15,6 +15,7 @@ Fixtures:
 
 # Standard library imports
 from builtins import range
+import itertools
 from datetime import datetime
 from unittest.mock import patch
 from uuid import uuid4
@@ -28,13 +29,14 @@ from sqlalchemy.orm import sessionmaker
 from faker import Faker
 
 # Application-specific imports
-from app.main import app
+from app.main import app, rate_limiter
 from app.database import Base, Database
 from app.models.user_model import User, UserRole
-from app.dependencies import get_db, get_settings
+from app.dependencies import get_db, get_read_db, get_settings
 from app.utils.security import hash_password
 from app.utils.template_manager import TemplateManager
 from app.services.email_service import EmailService
+from app.services.user_service import UserService
 from app.services.jwt_service import create_access_token
 
 fake = Faker()
@@ -58,6 +60,7 @@ def email_service():
 async def async_client(db_session):
     async with AsyncClient(app=app, base_url="http://testserver") as client:
         app.dependency_overrides[get_db] = lambda: db_session
+        app.dependency_overrides[get_read_db] = lambda: db_session
         try:
             yield client
         finally:
@@ -70,6 +73,18 @@ def initialize_database():
     except Exception as e:
         pytest.fail(f"Failed to initialize the database: {str(e)}")
 
+# every test starts with full rate limit buckets
+@pytest.fixture(scope="function", autouse=True)
+def reset_rate_limits():
+    rate_limiter.reset()
+    yield
+
+# cached user snapshots would otherwise outlive the tables they were read from
+@pytest.fixture(scope="function", autouse=True)
+async def clear_user_cache():
+    await UserService.clear_user_cache()
+    yield
+
 # this function setup and tears down (drops tales) for each test function, so you have a clean database for each test.
 @pytest.fixture(scope="function", autouse=True)
 async def setup_database():
@@ -89,6 +104,16 @@ async def db_session(setup_database):
         finally:
             await session.close()
 
+# registers the test database a second time, as a read replica
+@pytest.fixture(scope="function")
+async def fake_replica(monkeypatch):
+    replica = create_async_engine(settings.database_url, connect_args=Database._read_only_connect_args(settings.database_url))
+    monkeypatch.setattr(Database, "_replica_engines", [replica])
+    monkeypatch.setattr(Database, "_replica_lag", [0.0])
+    monkeypatch.setattr(Database, "_replica_cycle", itertools.count())
+    yield replica
+    await replica.dispose()
+
 @pytest.fixture(scope="function")
 async def locked_user(db_session):
     unique_email = fake.email()
@@ -0,0 +1,73 @@
+from builtins import float, range
+import pytest
+from app.database import Database
+from app.services.jwt_service import clear_token_cache
+from app.services.user_service import UserService
+
+
+@pytest.mark.asyncio
+async def test_db_pool_stats_admin(async_client, admin_user, admin_token):
+    async with Database.get_session_factory()() as session:
+        await UserService.get_by_id(session, admin_user.id)
+    response = await async_client.get("/admin/db-pool", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    pools = {pool["name"]: pool for pool in response.json()["pools"]}
+    assert {"primary", "primary_read_only"} <= pools.keys()
+    primary = pools["primary"]
+    assert primary["checked_out"] == 0
+    assert primary["checkout_wait"]["count"] >= 1
+    assert primary["checkout_wait"]["buckets"][-1]["count"] == primary["checkout_wait"]["count"]
+    await Database._engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_db_pool_stats_requires_admin(async_client, manager_token):
+    response = await async_client.get("/admin/db-pool", headers={"Authorization": f"Bearer {manager_token}"})
+    assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_db_replica_status(async_client, admin_token, fake_replica, monkeypatch):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    monkeypatch.setattr(Database, "_replica_lag", [float("inf")])
+    response = await async_client.get("/admin/db-replicas", headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {"replicas": [{"replica": 0, "lag_seconds": None, "healthy": False}]}
+    await Database.refresh_replica_lag()
+    response = await async_client.get("/admin/db-replicas", headers=headers)
+    assert response.json() == {"replicas": [{"replica": 0, "lag_seconds": 0.0, "healthy": True}]}
+
+
+@pytest.mark.asyncio
+async def test_db_replica_status_requires_admin(async_client, manager_token):
+    response = await async_client.get("/admin/db-replicas", headers={"Authorization": f"Bearer {manager_token}"})
+    assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_user_cache_stats(async_client, admin_user, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    for _ in range(2):
+        response = await async_client.get(f"/users/{admin_user.id}", headers=headers)
+        assert response.status_code == 200
+    response = await async_client.get("/admin/user-cache", headers=headers)
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["backend"] == "memory"
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+    assert stats["hit_ratio"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_token_cache_stats(async_client, admin_user, admin_token):
+    clear_token_cache()
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    for _ in range(2):
+        response = await async_client.get(f"/users/{admin_user.id}", headers=headers)
+        assert response.status_code == 200
+    response = await async_client.get("/admin/token-cache", headers=headers)
+    assert response.status_code == 200
+    stats = response.json()
+    # The stats request itself is the third lookup of the same token.
+    assert (stats["hits"], stats["misses"], stats["size"]) == (2, 1, 1)
+    assert stats["hit_ratio"] == pytest.approx(2 / 3)
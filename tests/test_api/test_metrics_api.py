@@ -0,0 +1,21 @@
+from builtins import str
+import pytest
+from app.utils.metrics import HTTP_REQUESTS_IN_PROGRESS
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(async_client, admin_user, admin_token):
+    response = await async_client.get(f"/users/{admin_user.id}", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    response = await async_client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert '# TYPE http_request_duration_seconds histogram' in body
+    assert 'http_request_duration_seconds_count{method="GET",route="/users/{user_id}",status="200"}' in body
+    assert 'password_hash_duration_seconds_count{function="verify_password"}' in body
+    assert 'password_hash_queue_wait_seconds_count{function="verify_password"}' in body
+    assert "\npassword_hash_queue_depth 0\n" in body
+    assert 'password_hash_workers{executor="' in body
+    assert str(admin_user.id) not in body
+    assert HTTP_REQUESTS_IN_PROGRESS.value("GET", "/users/{user_id}") == 0
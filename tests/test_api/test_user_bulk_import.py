@@ -0,0 +1,52 @@
+import json
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.services.user_service import UserService
+
+
+@pytest.mark.asyncio
+async def test_bulk_import_ndjson(async_client, admin_token, db_session):
+    lines = [
+        {"email": "bulk_a@example.com", "password": "ValidPassword123!", "first_name": "A"},
+        {"email": "bulk_b@example.com", "password": "ValidPassword123!"},
+        {"email": "bulk_a@example.com", "password": "ValidPassword123!"},
+        {"email": "bulk_c@example.com", "password": "weak"},
+    ]
+    body = "\n".join(json.dumps(line) for line in lines) + "\nnot json\n"
+    headers = {"Authorization": f"Bearer {admin_token}", "Content-Type": "application/x-ndjson"}
+    with patch("app.services.email_service.EmailService.send_verification_emails", AsyncMock()) as send:
+        response = await async_client.post("/users/bulk", content=body, headers=headers)
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["received"], result["created"], result["failed"]) == (5, 2, 3)
+    assert [error["row"] for error in result["errors"]] == [3, 4, 5]
+    assert result["errors"][0]["errors"] == ["Duplicate email in upload"]
+    send.assert_awaited_once()
+    assert sorted(user.email for user in send.await_args.args[0]) == ["bulk_a@example.com", "bulk_b@example.com"]
+    assert (await UserService.get_by_email(db_session, "bulk_b@example.com")) is not None
+
+
+@pytest.mark.asyncio
+async def test_bulk_import_csv_in_batches(async_client, admin_token, monkeypatch):
+    monkeypatch.setattr("app.routers.user_routes.settings.bulk_import_batch_size", 2)
+    body = "email,password,first_name\n" + "".join(f"csv_{i}@example.com,ValidPassword123!,User{i}\n" for i in range(5))
+    headers = {"Authorization": f"Bearer {admin_token}", "Content-Type": "text/csv"}
+    with patch("app.services.email_service.EmailService.send_verification_emails", AsyncMock()) as send:
+        response = await async_client.post("/users/bulk", content=body, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["created"] == 5
+    assert send.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_bulk_import_rejects_unknown_content_type(async_client, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}", "Content-Type": "application/json"}
+    response = await async_client.post("/users/bulk", content="[]", headers=headers)
+    assert response.status_code == 415
+
+
+@pytest.mark.asyncio
+async def test_bulk_import_requires_admin(async_client, manager_token):
+    headers = {"Authorization": f"Bearer {manager_token}", "Content-Type": "text/csv"}
+    response = await async_client.post("/users/bulk", content="email\n", headers=headers)
+    assert response.status_code == 403
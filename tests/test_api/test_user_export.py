@@ -0,0 +1,41 @@
+import csv
+import io
+import json
+import pytest
+from app.database import Database
+
+
+@pytest.fixture
+async def export_headers(admin_token):
+    yield {"Authorization": f"Bearer {admin_token}"}
+    # The export opens its own session from the application's engine.
+    await Database._read_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_export_ndjson(async_client, export_headers, users_with_same_role_50_users):
+    response = await async_client.get("/users/export", headers=export_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 51  # the 50 users plus the admin
+    assert {"id", "email", "nickname", "role", "created_at"} <= rows[0].keys()
+    assert "hashed_password" not in rows[0] and "verification_token" not in rows[0]
+    assert {row["email"] for row in rows} >= {user.email for user in users_with_same_role_50_users}
+
+
+@pytest.mark.asyncio
+async def test_export_csv_in_small_batches(async_client, export_headers, users_with_same_role_50_users, monkeypatch):
+    monkeypatch.setattr("app.routers.user_routes.settings.export_batch_size", 7)
+    response = await async_client.get("/users/export?format=csv", headers=export_headers)
+    assert response.status_code == 200
+    assert response.headers["content-disposition"] == 'attachment; filename="users.csv"'
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 51
+    assert rows[0]["email_verified"] in ("true", "false")
+
+
+@pytest.mark.asyncio
+async def test_export_requires_admin(async_client, manager_token):
+    response = await async_client.get("/users/export", headers={"Authorization": f"Bearer {manager_token}"})
+    assert response.status_code == 403
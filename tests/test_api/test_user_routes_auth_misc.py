@@ -1,7 +1,11 @@
+from builtins import int, range
 import pytest
 from httpx import AsyncClient
 from uuid import uuid4
 from unittest.mock import patch
+from app.dependencies import get_settings
+from app.services.user_service import LoginOutcome
+from app.utils.rate_limit import parse_rate
 
 @pytest.mark.asyncio
 async def test_register_success(async_client, user_base_data):
@@ -66,9 +70,34 @@ async def test_login_bad_password(async_client, admin_user):
 
 @pytest.mark.asyncio
 async def test_login_locked_account(async_client, admin_user):
-    # Patch is_account_locked to True
-    with patch("app.services.user_service.UserService.is_account_locked", return_value=True):
+    # Patch authenticate to report a locked account
+    with patch("app.services.user_service.UserService.authenticate", return_value=LoginOutcome(None, True)):
         login_data = {"username": admin_user.email, "password": "adminpassword"}
         resp = await async_client.post("/login/", data=login_data)
         assert resp.status_code == 400
         assert "Account locked" in resp.text
+
+@pytest.mark.asyncio
+async def test_login_rate_limited_per_email(async_client, admin_user):
+    limit = parse_rate(get_settings().rate_limit_email_rules["/login/"]).capacity
+    login_data = {"username": admin_user.email, "password": "wrongpassword"}
+    for i in range(limit):
+        resp = await async_client.post("/login/", data=login_data, headers={"X-Forwarded-For": f"198.51.100.{i}"})
+        assert resp.status_code in (400, 401)
+    resp = await async_client.post("/login/", data=login_data, headers={"X-Forwarded-For": "198.51.100.250"})
+    assert resp.status_code == 429
+    assert int(resp.headers["Retry-After"]) >= 1
+    other = await async_client.post("/login/", data={"username": "someone@example.com", "password": "x"})
+    assert other.status_code == 401
+
+@pytest.mark.asyncio
+async def test_register_rate_limited_per_ip(async_client):
+    limit = parse_rate(get_settings().rate_limit_ip_rules["/register/"]).capacity
+    headers = {"X-Forwarded-For": "203.0.113.9"}
+    for _ in range(limit):
+        resp = await async_client.post("/register/", json={}, headers=headers)
+        assert resp.status_code == 422
+    resp = await async_client.post("/register/", json={}, headers=headers)
+    assert resp.status_code == 429
+    resp = await async_client.post("/register/", json={}, headers={"X-Forwarded-For": "203.0.113.10"})
+    assert resp.status_code == 422
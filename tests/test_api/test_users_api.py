@@ -1,8 +1,9 @@
-from builtins import str
+from builtins import all, sorted, str
 import pytest
 from httpx import AsyncClient
 from app.main import app
 from app.models.user_model import User
+from app.schemas.user_schemas import UserListResponse, UserResponse
 from app.utils.nickname_gen import generate_nickname
 from app.utils.security import hash_password
 from app.services.jwt_service import decode_token  # Import your FastAPI app
@@ -189,3 +190,117 @@ async def test_list_users_unauthorized(async_client, user_token):
         headers={"Authorization": f"Bearer {user_token}"}
     )
     assert response.status_code == 403  # Forbidden, as expected for regular user
+
+@pytest.mark.asyncio
+async def test_list_users_cursor_pagination(async_client, admin_token, users_with_same_role_50_users):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await async_client.get("/users/?pagination=cursor&limit=20", headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["items"]) == 20
+    assert data["page"] is None
+    next_link = next(link["href"] for link in data["links"] if link["rel"] == "next")
+    assert "cursor=" in next_link
+
+    response = await async_client.get(next_link, headers=headers)
+    assert response.status_code == 200
+    second_page = response.json()
+    assert {item["id"] for item in second_page["items"]}.isdisjoint(item["id"] for item in data["items"])
+    assert any(link["rel"] == "prev" for link in second_page["links"])
+
+@pytest.mark.asyncio
+async def test_list_users_invalid_cursor(async_client, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await async_client.get("/users/?cursor=garbage", headers=headers)
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_list_users_reports_count_strategy(async_client, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await async_client.get("/users/?count=cached", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["total_strategy"] == "cached"
+    response = await async_client.get("/users/?count=bogus", headers=headers)
+    assert response.status_code == 422
+
+@pytest.mark.asyncio
+async def test_list_users_filters_and_sort(async_client, admin_token, admin_user, locked_user, verified_user):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await async_client.get("/users/?role=AUTHENTICATED&sort=-email", headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 2
+    assert [item["email"] for item in data["items"]] == sorted([locked_user.email, verified_user.email], reverse=True)
+    assert all("role=AUTHENTICATED" in link["href"] and "sort=-email" in link["href"] for link in data["links"])
+
+    response = await async_client.get("/users/?is_locked=true&pagination=cursor", headers=headers)
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()["items"]] == [str(locked_user.id)]
+
+@pytest.mark.asyncio
+async def test_list_users_rejects_bad_sort(async_client, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await async_client.get("/users/?sort=hashed_password", headers=headers)
+    assert response.status_code == 422
+    response = await async_client.get("/users/?sort=email&pagination=cursor", headers=headers)
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_get_user_conditional(async_client, admin_user, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await async_client.get(f"/users/{admin_user.id}", headers=headers)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    response = await async_client.get(f"/users/{admin_user.id}", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+    response = await async_client.get(f"/users/{admin_user.id}", headers={**headers, "If-None-Match": '"stale"'})
+    assert response.status_code == 200
+
+@pytest.mark.asyncio
+async def test_update_user_if_match(async_client, admin_user, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    etag = (await async_client.get(f"/users/{admin_user.id}", headers=headers)).headers["ETag"]
+    response = await async_client.put(f"/users/{admin_user.id}", json={"first_name": "Grace"}, headers={**headers, "If-Match": etag})
+    assert response.status_code == 200
+    new_etag = response.headers["ETag"]
+    assert new_etag != etag
+    response = await async_client.put(f"/users/{admin_user.id}", json={"first_name": "Lost"}, headers={**headers, "If-Match": etag})
+    assert response.status_code == 412
+    response = await async_client.get(f"/users/{admin_user.id}", headers={**headers, "If-None-Match": new_etag})
+    assert response.status_code == 304
+
+@pytest.mark.asyncio
+@pytest.mark.filterwarnings("error:Pydantic serializer warnings")
+async def test_list_users_projection_matches_response_model(async_client, admin_token, admin_user):
+    response = await async_client.get("/users/?limit=100", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["total"], data["size"], data["page"]) == (1, 1, 1)
+    expected = UserListResponse(
+        items=[UserResponse.model_validate(admin_user)], total=1, page=1, size=1, links=data["links"]
+    ).model_dump(mode="json")
+    assert data == expected
+
+@pytest.mark.asyncio
+@pytest.mark.filterwarnings("error:Pydantic serializer warnings")
+async def test_search_users(async_client, admin_token, users_with_same_role_50_users):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    target = users_with_same_role_50_users[0]
+    response = await async_client.get(f"/users/search?q={target.email[:-1]}&limit=5", headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["items"][0]["email"] == target.email
+    assert data["links"][0]["rel"] == "self"
+    assert "q=" in data["links"][0]["href"]
+
+    response = await async_client.get("/users/search?q=john&cursor=garbage", headers=headers)
+    assert response.status_code == 400
+    response = await async_client.get("/users/search", headers=headers)
+    assert response.status_code == 422
+
+@pytest.mark.asyncio
+async def test_search_users_unauthorized(async_client, user_token):
+    response = await async_client.get("/users/search?q=a", headers={"Authorization": f"Bearer {user_token}"})
+    assert response.status_code == 403
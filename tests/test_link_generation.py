@@ -6,7 +6,7 @@ from uuid import uuid4
 import pytest
 from fastapi import Request
 
-from app.utils.link_generation import create_link, create_pagination_link, create_user_links, generate_pagination_links
+from app.utils.link_generation import create_link, create_pagination_link, create_user_links, generate_cursor_pagination_links, generate_pagination_links
 
 from urllib.parse import urlparse, parse_qs, urlunparse, urlencode
 
@@ -49,3 +49,37 @@ def test_generate_pagination_links(mock_request):
     assert len(links) >= 4
     expected_self_url = "http://testserver/users?limit=5&skip=10"
     assert normalize_url(str(links[0].href)) == normalize_url(expected_self_url), "Self link should match expected URL"
+
+def test_generate_cursor_pagination_links(mock_request):
+    links = generate_cursor_pagination_links(mock_request, 5, "abc", "def", None)
+    hrefs = {link.rel: normalize_url(str(link.href)) for link in links}
+    assert hrefs["self"] == normalize_url("http://testserver/users?cursor=abc&limit=5")
+    assert hrefs["first"] == normalize_url("http://testserver/users?pagination=cursor&limit=5")
+    assert hrefs["next"] == normalize_url("http://testserver/users?cursor=def&limit=5")
+    assert "prev" not in hrefs
+
+def test_user_link_templates_resolve_routes_once(mock_request):
+    first, second = uuid4(), uuid4()
+    create_user_links(first, mock_request)
+    links = create_user_links(second, mock_request)
+    assert mock_request.url_for.call_count == 3
+    assert [str(link.href) for link in links] == [
+        f"http://testserver/get_user/{second}",
+        f"http://testserver/update_user/{second}",
+        f"http://testserver/delete_user/{second}",
+    ]
+    assert [link.action for link in links] == ["view", "update", "delete"]
+
+def test_pagination_links_replace_paging_params_and_keep_others(mock_request):
+    mock_request.url = "http://testserver/users?skip=10&limit=5&count=cached&q=a%26b"
+    links = generate_pagination_links(mock_request, 10, 5, 50)
+    hrefs = {link.rel: str(link.href) for link in links}
+    assert hrefs["self"] == "http://testserver/users?count=cached&q=a%26b&skip=10&limit=5"
+    assert hrefs["next"] == "http://testserver/users?count=cached&q=a%26b&skip=15&limit=5"
+    assert hrefs["prev"] == "http://testserver/users?count=cached&q=a%26b&skip=5&limit=5"
+
+def test_cursor_links_drop_offset_params(mock_request):
+    mock_request.url = "http://testserver/users?pagination=cursor&skip=20&count=estimated"
+    links = generate_cursor_pagination_links(mock_request, 5, None, "next_token", None)
+    hrefs = {link.rel: str(link.href) for link in links}
+    assert hrefs["next"] == "http://testserver/users?count=estimated&cursor=next_token&limit=5"
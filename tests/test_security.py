@@ -1,7 +1,11 @@
 # test_security.py
-from builtins import RuntimeError, ValueError, isinstance, str
+from builtins import RuntimeError, ValueError, isinstance, range, str
+import asyncio
 import pytest
-from app.utils.security import hash_password, verify_password
+from app.utils.metrics import PASSWORD_HASH_QUEUE_DEPTH, PASSWORD_HASH_QUEUE_WAIT
+from app.utils.security import (
+    get_hashing_pool_stats, hash_password, hash_password_async, verify_password, verify_password_async
+)
 
 def test_hash_password():
     """Test that hashing password returns a bcrypt hashed string."""
@@ -65,3 +69,30 @@ def test_hash_password_internal_error(monkeypatch):
     with pytest.raises(ValueError):
         hash_password("test")
 
+@pytest.mark.asyncio
+async def test_hash_and_verify_password_async():
+    """Test the pooled async variants round-trip like the sync functions."""
+    hashed = await hash_password_async("secure_password", 4)
+    assert hashed.startswith('$2b$04$')
+    assert await verify_password_async("secure_password", hashed) is True
+    assert await verify_password_async("wrong_password", hashed) is False
+
+@pytest.mark.asyncio
+async def test_verify_password_async_invalid_hash():
+    """Test that errors raised in the pool reach the caller."""
+    with pytest.raises(ValueError):
+        await verify_password_async("secure_password", "invalid_hash_format")
+
+@pytest.mark.asyncio
+async def test_hashing_pool_stats():
+    """Test that the pool records completed jobs and queue wait times."""
+    before = get_hashing_pool_stats()
+    observed = PASSWORD_HASH_QUEUE_WAIT.count("hash_password")
+    await asyncio.gather(*(hash_password_async("secure_password", 4) for _ in range(3)))
+    after = get_hashing_pool_stats()
+    assert PASSWORD_HASH_QUEUE_WAIT.count("hash_password") == observed + 3
+    assert PASSWORD_HASH_QUEUE_DEPTH.value() == 0
+    assert after["completed"] == before["completed"] + 3
+    assert after["in_flight"] == 0
+    assert after["wait_seconds_max"] >= 0.0
+    assert after["workers"] >= 1
@@ -0,0 +1,59 @@
+from datetime import timedelta
+from unittest.mock import patch
+import pytest
+from app.dependencies import get_current_user
+from app.services import jwt_service
+from app.services.jwt_service import clear_token_cache, create_access_token, decode_token_cached, get_token_cache_stats
+
+
+@pytest.fixture(autouse=True)
+def empty_token_cache():
+    clear_token_cache()
+    yield
+    clear_token_cache()
+
+
+def test_decode_token_cached_hits_after_first_decode():
+    token = create_access_token(data={"sub": "user@example.com", "role": "admin"})
+    with patch.object(jwt_service, "decode_token", wraps=jwt_service.decode_token) as mock_decode:
+        first = decode_token_cached(token)
+        second = decode_token_cached(token)
+    assert first == second
+    assert first["role"] == "ADMIN"
+    mock_decode.assert_called_once()
+    stats = get_token_cache_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["size"] == 1
+
+
+def test_decode_token_cached_rejects_invalid_token():
+    assert decode_token_cached("not-a-token") is None
+    assert get_token_cache_stats()["size"] == 0
+
+
+def test_decode_token_cached_expires_entries():
+    token = create_access_token(data={"sub": "user@example.com", "role": "admin"}, expires_delta=timedelta(minutes=5))
+    assert decode_token_cached(token) is not None
+    payload = decode_token_cached(token)
+    # Past the exp claim the cached payload must not be served; verification runs again.
+    with patch("app.services.jwt_service.time.time", return_value=payload["exp"] + 1), \
+         patch.object(jwt_service, "decode_token", return_value=None) as mock_decode:
+        assert decode_token_cached(token) is None
+    mock_decode.assert_called_once_with(token)
+    assert get_token_cache_stats()["size"] == 0
+
+
+def test_decode_token_cached_evicts_least_recently_used():
+    with patch.object(jwt_service.settings, "token_cache_size", 2):
+        tokens = [create_access_token(data={"sub": f"user{i}@example.com", "role": "admin"}) for i in range(3)]
+        for token in tokens:
+            decode_token_cached(token)
+        assert get_token_cache_stats()["size"] == 2
+
+
+def test_get_current_user_uses_cache():
+    token = create_access_token(data={"sub": "user@example.com", "role": "manager"})
+    assert get_current_user(token) == {"user_id": "user@example.com", "role": "MANAGER"}
+    assert get_current_user(token) == {"user_id": "user@example.com", "role": "MANAGER"}
+    assert get_token_cache_stats()["hits"] == 1
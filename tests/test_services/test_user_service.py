@@ -1,9 +1,9 @@
-from builtins import range
+from builtins import max, range, sorted
 import pytest
-from sqlalchemy import select
+from sqlalchemy import event, select, text
 from app.dependencies import get_settings
-from app.models.user_model import User
-from app.services.user_service import UserService
+from app.models.user_model import User, UserRole
+from app.services.user_service import SORT_COLUMNS, UserFilters, UserService
 from unittest.mock import patch, AsyncMock
 import pytest
 from uuid import uuid4
@@ -278,3 +278,304 @@ async def test_unlock_user_account(db_session, locked_user):
     assert unlocked, "The account should be unlocked"
     refreshed_user = await UserService.get_by_id(db_session, locked_user.id)
     assert not refreshed_user.is_locked, "The user should no longer be locked"
+
+# Test walking users with keyset pagination, forwards then back
+async def test_list_users_keyset_pagination(db_session, users_with_same_role_50_users):
+    seen = []
+    cursor = None
+    while True:
+        page, next_cursor, prev_cursor = await UserService.list_users_keyset(db_session, limit=15, cursor=cursor)
+        seen.extend(user.id for user in page)
+        if cursor is None:
+            assert prev_cursor is None
+        if next_cursor is None:
+            break
+        cursor = next_cursor
+    assert len(seen) == 50
+    assert len(set(seen)) == 50
+
+    last_page, _, prev_cursor = await UserService.list_users_keyset(db_session, limit=15, cursor=cursor)
+    previous_page, next_cursor, _ = await UserService.list_users_keyset(db_session, limit=15, cursor=prev_cursor)
+    assert [user.id for user in previous_page] == seen[30:45]
+    assert next_cursor is not None
+
+# Test that a malformed keyset cursor is rejected
+async def test_list_users_keyset_invalid_cursor(db_session):
+    with pytest.raises(ValueError):
+        await UserService.list_users_keyset(db_session, limit=10, cursor="not-a-cursor")
+
+# Test that the exact strategy reads the total from the page query's window count
+async def test_list_users_with_total_exact(db_session, users_with_same_role_50_users):
+    users, total, strategy = await UserService.list_users_with_total(db_session, skip=40, limit=20)
+    assert len(users) == 10
+    assert total == 50
+    assert strategy == "exact"
+    users, total, _ = await UserService.list_users_with_total(db_session, skip=100, limit=20)
+    assert users == []
+    assert total == 50
+
+# Test that the cached strategy reuses the count until a user is created
+async def test_total_users_cached(db_session, users_with_same_role_50_users, email_service):
+    UserService._invalidate_cached_count()
+    total, strategy = await UserService.total_users(db_session, "cached")
+    assert (total, strategy) == (50, "cached")
+    db_session.add(User(nickname="cache_probe", email="cache_probe@example.com", hashed_password="x"))
+    await db_session.commit()
+    total, _ = await UserService.total_users(db_session, "cached")
+    assert total == 50
+    with patch('app.services.email_service.EmailService.send_verification_email', AsyncMock()):
+        await UserService.create(db_session, {"email": "cache_bust@example.com", "password": "ValidPassword123!"}, email_service)
+    total, _ = await UserService.total_users(db_session, "cached")
+    assert total == 52
+
+# Test that the estimated strategy falls back to an exact count until the table is analyzed
+async def test_total_users_estimated(db_session, users_with_same_role_50_users):
+    total, strategy = await UserService.total_users(db_session, "estimated")
+    assert (total, strategy) == (50, "exact")
+    if db_session.get_bind().dialect.name != "postgresql":
+        pytest.skip("planner estimates are read from PostgreSQL's pg_class")
+    await db_session.execute(text("ANALYZE users"))
+    total, strategy = await UserService.total_users(db_session, "estimated")
+    assert strategy == "estimated"
+    assert total == 50
+
+# Test that filters apply to both the page and the window total
+async def test_list_users_with_filters(db_session, users_with_same_role_50_users, locked_user, admin_user):
+    users, total, _ = await UserService.list_users_with_total(db_session, limit=100, filters=UserFilters(is_locked=True))
+    assert [u.id for u in users] == [locked_user.id]
+    assert total == 1
+    users, total, _ = await UserService.list_users_with_total(db_session, limit=100, filters=UserFilters(role=UserRole.ADMIN, email_verified=True))
+    assert [u.id for u in users] == [admin_user.id]
+    users, total, _ = await UserService.list_users_with_total(db_session, limit=100, filters=UserFilters(role=UserRole.AUTHENTICATED, is_locked=False))
+    assert total == 50
+    cutoff = max(u.created_at for u in users_with_same_role_50_users + [locked_user, admin_user])
+    users, total, _ = await UserService.list_users_with_total(db_session, limit=100, filters=UserFilters(created_after=cutoff))
+    assert total == 1
+    assert await UserService.count(db_session, UserFilters(created_before=cutoff)) == 51
+
+# Test that whitelisted sort keys order the page and unknown keys are rejected
+async def test_list_users_sorted(db_session, users_with_same_role_50_users):
+    users = await UserService.list_users(db_session, limit=100, sort="email")
+    assert [u.email for u in users] == sorted(u.email for u in users_with_same_role_50_users)
+    users = await UserService.list_users(db_session, limit=100, sort="-nickname")
+    assert [u.nickname for u in users] == sorted((u.nickname for u in users_with_same_role_50_users), reverse=True)
+    with pytest.raises(ValueError):
+        await UserService.list_users(db_session, sort="hashed_password")
+
+# Test that every sort key, in both directions, is served by an index rather than a full sort
+@pytest.mark.parametrize("sort", [prefix + key for key in SORT_COLUMNS for prefix in ("", "-")])
+async def test_list_users_sort_uses_index(db_session, sort):
+    if db_session.get_bind().dialect.name != "postgresql":
+        pytest.skip("plans are checked on PostgreSQL")
+    query = select(User).order_by(*UserService._order_by(sort)).limit(10)
+    compiled = query.compile(dialect=db_session.get_bind().dialect, compile_kwargs={"literal_binds": True})
+    await db_session.execute(text("SET LOCAL enable_seqscan = off"))
+    plan = "\n".join((await db_session.execute(text(f"EXPLAIN {compiled}"))).scalars())
+    assert "Index Scan" in plan, plan
+    assert "Sort" not in plan, plan
+
+# Test that cached counts are kept per filter set and dropped when a user changes
+async def test_count_cached_per_filters(db_session, users_with_same_role_50_users, locked_user):
+    UserService._invalidate_cached_count()
+    locked = UserFilters(is_locked=True)
+    assert await UserService.count_cached(db_session) == 51
+    assert await UserService.count_cached(db_session, locked) == 1
+    total, strategy = await UserService.total_users(db_session, "estimated", locked)
+    assert (total, strategy) == (1, "exact")
+    assert await UserService.unlock_user_account(db_session, locked_user.id)
+    assert await UserService.count_cached(db_session, locked) == 0
+
+# Test that snapshots are read through the cache and dropped when the user changes
+async def test_user_snapshot_cache(db_session, verified_user):
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(db_session.bind.sync_engine, "before_cursor_execute", record)
+    try:
+        first = await UserService.get_snapshot_by_id(db_session, verified_user.id)
+        second = await UserService.get_snapshot_by_id(db_session, verified_user.id)
+        by_email = await UserService.get_snapshot_by_email(db_session, verified_user.email)
+    finally:
+        event.remove(db_session.bind.sync_engine, "before_cursor_execute", record)
+    assert first.email == verified_user.email
+    assert second is first and by_email is first
+    assert len(statements) == 1
+    assert not hasattr(first, "hashed_password")
+
+    old_email = verified_user.email
+    await UserService.update(db_session, verified_user.id, {"email": "renamed@example.com"})
+    assert (await UserService.get_snapshot_by_id(db_session, verified_user.id)).email == "renamed@example.com"
+    assert await UserService.get_snapshot_by_email(db_session, old_email) is None
+
+# Test that locking and unlocking an account is visible through the cached lookup
+async def test_user_snapshot_cache_invalidated_by_lock(db_session, verified_user):
+    assert await UserService.is_account_locked(db_session, verified_user.email) is False
+    for _ in range(get_settings().max_login_attempts):
+        await UserService.login_user(db_session, verified_user.email, "wrongpassword")
+    assert await UserService.is_account_locked(db_session, verified_user.email) is True
+    await UserService.unlock_user_account(db_session, verified_user.id)
+    assert await UserService.is_account_locked(db_session, verified_user.email) is False
+
+# Test that a conditional update only applies to the expected version
+async def test_update_if_match(db_session, verified_user):
+    version = await UserService.get_version(db_session, verified_user.id)
+    outcome = await UserService.update_if_match(db_session, verified_user.id, {"first_name": "First"}, [version])
+    assert outcome.user.first_name == "First"
+    assert outcome.user.updated_at > version
+    outcome = await UserService.update_if_match(db_session, verified_user.id, {"first_name": "Second"}, [version])
+    assert outcome == (None, True)
+    outcome = await UserService.update_if_match(db_session, uuid4(), {"first_name": "Nobody"}, [version])
+    assert outcome == (None, False)
+
+# Test that nickname allocation checks a batch of candidates in one query and skips taken ones
+async def test_allocate_nickname_skips_taken_names(db_session, user):
+    with patch('app.services.user_service.generate_nicknames', return_value=[user.nickname, "fresh_name_1"]) as mock_gen:
+        nickname = await UserService._allocate_nickname(db_session)
+    assert nickname == "fresh_name_1"
+    mock_gen.assert_called_once()
+
+# Test that a nickname claimed between the check and the insert is retried
+async def test_create_user_retries_nickname_conflict(db_session, user, email_service):
+    with patch.object(UserService, '_allocate_nickname', AsyncMock(side_effect=[user.nickname, "retry_name_1"])), \
+         patch('app.services.email_service.EmailService.send_verification_email', AsyncMock()):
+        created = await UserService.create(db_session, {"email": "retry@example.com", "password": "ValidPassword123!"}, email_service)
+    assert created is not None
+    assert created.nickname == "retry_name_1"
+
+# Test that a login is one lookup plus one update
+async def test_authenticate_statement_count(db_session, verified_user):
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split()[0])
+    event.listen(db_session.bind.sync_engine, "before_cursor_execute", record)
+    try:
+        outcome = await UserService.authenticate(db_session, verified_user.email, "MySuperPassword$1234")
+    finally:
+        event.remove(db_session.bind.sync_engine, "before_cursor_execute", record)
+    assert outcome.account.email == verified_user.email
+    assert outcome.locked is False
+    assert [s for s in statements if s in ("SELECT", "UPDATE")] == ["SELECT", "UPDATE"]
+
+# Test that failed attempts are counted in the database and lock the account
+async def test_authenticate_failures_lock_account(db_session, verified_user):
+    for _ in range(get_settings().max_login_attempts):
+        outcome = await UserService.authenticate(db_session, verified_user.email, "wrongpassword")
+        assert outcome.account is None
+    outcome = await UserService.authenticate(db_session, verified_user.email, "MySuperPassword$1234")
+    assert outcome.locked is True
+    result = await db_session.execute(select(User.failed_login_attempts).where(User.id == verified_user.id))
+    assert result.scalar() == get_settings().max_login_attempts
+
+# Test that reads no longer commit and a write commits exactly once
+async def test_reads_do_not_commit(db_session, verified_user):
+    commits = []
+    def record(conn):
+        commits.append(conn)
+    event.listen(db_session.bind.sync_engine, "commit", record)
+    try:
+        await UserService.get_by_id(db_session, verified_user.id)
+        await UserService.get_by_email(db_session, verified_user.email)
+        await UserService.list_users(db_session)
+        assert commits == []
+        await UserService.update(db_session, verified_user.id, {"bio": "one commit"})
+        assert len(commits) == 1
+    finally:
+        event.remove(db_session.bind.sync_engine, "commit", record)
+
+# Test that a bulk batch is validated, deduplicated and inserted with one multi-row INSERT
+async def test_create_many_inserts_batch(db_session, user):
+    rows = [
+        (1, {"email": "bulk_one@example.com", "password": "ValidPassword123!", "first_name": "One"}),
+        (2, {"email": "bulk_two@example.com", "password": "ValidPassword123!"}),
+        (3, {"email": "bulk_one@example.com", "password": "ValidPassword123!"}),
+        (4, {"email": user.email, "password": "ValidPassword123!"}),
+        (5, {"email": "not-an-email", "password": "ValidPassword123!"}),
+    ]
+    inserts = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT"):
+            inserts.append(statement)
+    event.listen(db_session.bind.sync_engine, "before_cursor_execute", record)
+    try:
+        created, errors = await UserService.create_many(db_session, rows, set())
+    finally:
+        event.remove(db_session.bind.sync_engine, "before_cursor_execute", record)
+    assert sorted(u.email for u in created) == ["bulk_one@example.com", "bulk_two@example.com"]
+    assert all(u.verification_token and u.nickname for u in created)
+    assert len(inserts) == 1
+    assert {error.row: error.errors[0] for error in errors if error.row != 5} == {3: "Duplicate email in upload", 4: "Email already exists"}
+    assert any(error.row == 5 and error.errors[0].startswith("email") for error in errors)
+    stored = await UserService.get_by_email(db_session, "bulk_one@example.com")
+    assert stored.first_name == "One"
+    assert stored.hashed_password != "ValidPassword123!"
+
+# Test that several nicknames are allocated with one query
+async def test_allocate_nicknames_batch(db_session, user):
+    with patch('app.services.user_service.generate_nicknames', return_value=[user.nickname, "bulk_a", "bulk_b", "bulk_c"]) as mock_gen:
+        nicknames = await UserService._allocate_nicknames(db_session, 3)
+    assert nicknames == ["bulk_a", "bulk_b", "bulk_c"]
+    mock_gen.assert_called_once()
+
+# Test that the export streams only the exported columns in batches
+async def test_stream_export_batches(db_session, users_with_same_role_50_users):
+    sizes = []
+    async for partition in UserService.stream_export(db_session, batch_size=20):
+        sizes.append(len(partition))
+        assert "hashed_password" not in partition[0]._fields
+    assert sizes == [20, 20, 10]
+
+@pytest.fixture
+async def searchable_users(db_session):
+    users = [
+        User(nickname="ada_lovelace", email="countess@example.com", first_name="Augusta", last_name="Lovelace", hashed_password="x"),
+        User(nickname="adamant", email="adam@example.com", first_name="Adam", last_name="Smith", hashed_password="x"),
+        User(nickname="bob_jones", email="bob@example.com", first_name="Adalbert", last_name="Jones", hashed_password="x"),
+        User(nickname="ada", email="plain@example.com", first_name="Zed", last_name="Zed", hashed_password="x"),
+        User(nickname="carol", email="carol@example.com", first_name="Carol", last_name="King", hashed_password="x"),
+    ]
+    db_session.add_all(users)
+    await db_session.commit()
+    return users
+
+# Test that prefix search ranks exact matches, then nickname/email prefixes, then name prefixes
+async def test_search_users_prefix_ranking(db_session, searchable_users, monkeypatch):
+    monkeypatch.setattr(UserService, "_trigram_available", False)
+    rows, next_cursor = await UserService.search_users(db_session, "Ada", limit=10)
+    assert [row.nickname for row in rows][0] == "ada"
+    assert {row.nickname for row in rows[1:3]} == {"ada_lovelace", "adamant"}
+    assert rows[3].nickname == "bob_jones"
+    assert next_cursor is None
+    assert "hashed_password" not in rows[0]._fields
+
+# Test that LIKE wildcards in the query are matched literally
+async def test_search_users_escapes_wildcards(db_session, searchable_users, monkeypatch):
+    monkeypatch.setattr(UserService, "_trigram_available", False)
+    rows, _ = await UserService.search_users(db_session, "ada_", limit=10)
+    assert [row.nickname for row in rows] == ["ada_lovelace"]
+    rows, _ = await UserService.search_users(db_session, "%", limit=10)
+    assert rows == []
+
+# Test that search results page through a keyset cursor without repeats
+async def test_search_users_keyset_pages(db_session, searchable_users, monkeypatch):
+    monkeypatch.setattr(UserService, "_trigram_available", False)
+    seen, cursor = [], None
+    while True:
+        rows, cursor = await UserService.search_users(db_session, "ad", limit=1, cursor=cursor)
+        seen.extend(row.nickname for row in rows)
+        if cursor is None:
+            break
+    assert sorted(seen) == ["ada", "ada_lovelace", "adamant", "bob_jones"]
+    with pytest.raises(ValueError):
+        await UserService.search_users(db_session, "ad", cursor="garbage")
+
+# Test fuzzy search when the pg_trgm extension can be installed
+async def test_search_users_trigram(db_session, searchable_users, monkeypatch):
+    try:
+        await db_session.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await db_session.commit()
+    except Exception:
+        pytest.skip("pg_trgm is not available on this server")
+    monkeypatch.setattr(UserService, "_trigram_available", None)
+    rows, _ = await UserService.search_users(db_session, "lovelase", limit=10)
+    assert rows[0].nickname == "ada_lovelace"
+    monkeypatch.setattr(UserService, "_trigram_available", None)
@@ -0,0 +1,34 @@
+import pytest
+from app.utils.bulk_import import FORMAT_CSV, FORMAT_NDJSON, detect_format, iter_csv_rows, iter_ndjson_rows
+
+
+async def chunked(data: bytes, size: int = 3):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def test_detect_format():
+    assert detect_format("application/x-ndjson; charset=utf-8") == FORMAT_NDJSON
+    assert detect_format("text/csv") == FORMAT_CSV
+    assert detect_format("application/json") is None
+
+
+@pytest.mark.asyncio
+async def test_ndjson_rows_report_bad_lines():
+    body = '{"email": "a@example.com"}\n\n[1]\n{oops\n{"email": "é@example.com"}'.encode()
+    rows = [row async for row in iter_ndjson_rows(chunked(body))]
+    assert rows[0] == (1, {"email": "a@example.com"}, None)
+    assert rows[1] == (2, None, "Each line must be a JSON object")
+    assert rows[2][0] == 3 and rows[2][2].startswith("Invalid JSON")
+    assert rows[3] == (4, {"email": "é@example.com"}, None)
+
+
+@pytest.mark.asyncio
+async def test_csv_rows_handle_quoted_newlines_and_empty_cells():
+    body = 'email,bio,first_name\r\na@example.com,"two\nlines, ""quoted""",Ann\r\nb@example.com,,Bob\nshort,row\n'.encode()
+    rows = [row async for row in iter_csv_rows(chunked(body))]
+    assert rows == [
+        (1, {"email": "a@example.com", "bio": 'two\nlines, "quoted"', "first_name": "Ann"}, None),
+        (2, {"email": "b@example.com", "first_name": "Bob"}, None),
+        (3, None, "Expected 3 columns, got 2"),
+    ]
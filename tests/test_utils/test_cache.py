@@ -0,0 +1,54 @@
+import importlib.util
+import pytest
+from app.utils.cache import CacheBackend, MemoryCacheBackend, NullCacheBackend, create_cache_backend
+
+pytestmark = pytest.mark.asyncio
+
+async def test_memory_cache_hits_and_expiry():
+    cache = MemoryCacheBackend(max_entries=10)
+    await cache.set("a", 1, ttl=60)
+    await cache.set("b", 2, ttl=-1)
+    assert await cache.get("a") == 1
+    assert await cache.get("b") is None
+    assert await cache.get("missing") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 2, 1)
+    assert stats["hit_ratio"] == pytest.approx(1 / 3)
+
+async def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCacheBackend(max_entries=2)
+    await cache.set("a", 1, ttl=60)
+    await cache.set("b", 2, ttl=60)
+    await cache.get("a")
+    await cache.set("c", 3, ttl=60)
+    assert await cache.get("b") is None
+    assert await cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+async def test_memory_cache_delete_and_clear():
+    cache = MemoryCacheBackend()
+    await cache.set("a", 1, ttl=60)
+    await cache.delete("a")
+    assert await cache.get("a") is None
+    await cache.set("a", 1, ttl=60)
+    await cache.clear()
+    assert cache.stats() == {"hits": 0, "misses": 0, "evictions": 0, "hit_ratio": 0.0, "size": 0}
+
+async def test_create_cache_backend():
+    assert isinstance(create_cache_backend("memory", 5), MemoryCacheBackend)
+    assert isinstance(create_cache_backend("none"), NullCacheBackend)
+    with pytest.raises(ValueError):
+        create_cache_backend("memcached")
+
+@pytest.mark.skipif(importlib.util.find_spec("redis") is not None, reason="redis is installed")
+async def test_redis_backend_requires_package():
+    with pytest.raises(RuntimeError):
+        create_cache_backend("redis", redis_url="redis://localhost:6379/0")
+
+def test_backend_must_implement_get_set_and_delete():
+    class GetOnly(CacheBackend):
+        async def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnly()
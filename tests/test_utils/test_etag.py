@@ -0,0 +1,23 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+from app.utils.etag import if_none_match, make_etag, versions_from_if_match
+
+def test_etag_round_trips_version():
+    user_id = uuid4()
+    updated_at = datetime(2026, 10, 18, 12, 30, 5, 123456, tzinfo=timezone.utc)
+    etag = make_etag(user_id, updated_at)
+    assert etag.startswith('"') and etag.endswith('"')
+    assert make_etag(user_id, updated_at.replace(tzinfo=None)) == etag
+    assert versions_from_if_match(f'"other", {etag}', user_id) == [updated_at]
+    assert versions_from_if_match(f"W/{etag}", user_id) == []
+    assert versions_from_if_match(make_etag(uuid4(), updated_at), user_id) == []
+    assert versions_from_if_match("*", user_id) is None
+    assert versions_from_if_match(None, user_id) is None
+
+def test_if_none_match():
+    etag = make_etag(uuid4(), datetime.now(timezone.utc))
+    assert if_none_match(etag, etag)
+    assert if_none_match(f'"x", W/{etag}', etag)
+    assert if_none_match("*", etag)
+    assert not if_none_match('"x"', etag)
+    assert not if_none_match(None, etag)
@@ -0,0 +1,31 @@
+import json
+import uuid
+from datetime import datetime, timezone
+import pytest
+from app.models.user_model import UserRole
+from app.utils.export import EXPORT_CSV, EXPORT_NDJSON, encode_rows
+
+
+async def batches(*rows_per_batch):
+    for rows in rows_per_batch:
+        yield rows
+
+
+@pytest.mark.asyncio
+async def test_encode_rows_ndjson_converts_values():
+    user_id = uuid.uuid4()
+    created_at = datetime(2024, 1, 2, tzinfo=timezone.utc)
+    chunks = [chunk async for chunk in encode_rows(("id", "role", "created_at", "bio"), batches([(user_id, UserRole.ADMIN, created_at, None)]), EXPORT_NDJSON)]
+    assert json.loads(chunks[0]) == {"id": str(user_id), "role": "ADMIN", "created_at": created_at.isoformat(), "bio": None}
+
+
+@pytest.mark.asyncio
+async def test_encode_rows_csv_one_chunk_per_batch():
+    chunks = [chunk async for chunk in encode_rows(("email", "is_locked"), batches([("a@example.com", False)], [("b@example.com", True)]), EXPORT_CSV)]
+    assert chunks == [b"email,is_locked\na@example.com,false\n", b"b@example.com,true\n"]
+
+
+@pytest.mark.asyncio
+async def test_encode_rows_csv_without_rows_has_header():
+    chunks = [chunk async for chunk in encode_rows(("email",), batches(), EXPORT_CSV)]
+    assert chunks == [b"email\n"]
@@ -0,0 +1,54 @@
+from builtins import Exception
+import pytest
+from sqlalchemy import create_engine, text
+from app.utils.metrics import DB_QUERY_DURATION, Gauge, Histogram, _statement_operation, instrument_engine
+
+def test_histogram_render():
+    histogram = Histogram("test_seconds", "Test histogram.", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.5, "/a")
+    histogram.observe(2.0, "/a")
+    assert histogram.render() == [
+        'test_seconds_bucket{route="/a",le="0.1"} 1',
+        'test_seconds_bucket{route="/a",le="1"} 2',
+        'test_seconds_bucket{route="/a",le="+Inf"} 3',
+        'test_seconds_sum{route="/a"} 2.55',
+        'test_seconds_count{route="/a"} 3',
+    ]
+
+def test_histogram_snapshot():
+    histogram = Histogram("test_seconds", "Test histogram.", ("pool",), buckets=(0.01, 0.1))
+    for seconds in (0.005, 0.05, 0.5, 1.0):
+        histogram.observe(seconds, "primary")
+    snapshot = histogram.snapshot("primary")
+    assert snapshot["buckets"] == [{"le": 0.01, "count": 1}, {"le": 0.1, "count": 2}, {"le": None, "count": 4}]
+    assert snapshot["count"] == 4
+    assert snapshot["sum"] == pytest.approx(1.555)
+    assert histogram.snapshot("replica_0")["count"] == 0
+
+def test_gauge_render():
+    gauge = Gauge("test_in_progress", "Test gauge.", ("method",))
+    gauge.inc("GET")
+    gauge.inc("GET")
+    gauge.dec("GET")
+    assert gauge.render() == ['test_in_progress{method="GET"} 1']
+
+def test_statement_operation():
+    assert _statement_operation("  select 1") == "SELECT"
+    assert _statement_operation("WITH x AS (SELECT 1) SELECT * FROM x") == "WITH"
+    assert _statement_operation("BEGIN") == "OTHER"
+
+def test_instrument_engine_times_statements():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    instrument_engine(engine)
+    before = DB_QUERY_DURATION.count("SELECT")
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        try:
+            connection.execute(text("SELECT * FROM missing_table"))
+        except Exception:
+            pass
+        connection.execute(text("SELECT 2"))
+    assert DB_QUERY_DURATION.count("SELECT") == before + 2
+    engine.dispose()
@@ -0,0 +1,18 @@
+import re
+from app.utils.nickname_gen import ADJECTIVES, ANIMALS, NUMBER_SPACE, generate_nickname, generate_nicknames
+
+
+def test_generate_nickname_format():
+    nickname = generate_nickname()
+    assert re.match(r'^[a-z]+_[a-z]+_\d+$', nickname)
+    assert 3 <= len(nickname) <= 32
+
+
+def test_nickname_space_is_large():
+    assert len(set(ADJECTIVES)) * len(set(ANIMALS)) * NUMBER_SPACE >= 100_000_000
+
+
+def test_generate_nicknames_returns_distinct_candidates():
+    candidates = generate_nicknames(20)
+    assert len(candidates) == 20
+    assert len(set(candidates)) == 20
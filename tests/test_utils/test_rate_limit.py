@@ -0,0 +1,81 @@
+from builtins import range
+import sqlite3
+import time
+import pytest
+from httpx import AsyncClient
+from starlette.responses import PlainTextResponse
+from app.utils.rate_limit import (
+    MemoryRateLimitBackend, RateLimit, RateLimiter, RateLimitMiddleware, SQLiteRateLimitBackend, extract_email, parse_rate
+)
+
+def test_parse_rate():
+    assert parse_rate("10/minute") == RateLimit(10, 60.0)
+    assert parse_rate("3/Second").refill_rate == 3.0
+    for bad in ("ten/minute", "10/fortnight", "0/minute", "10"):
+        with pytest.raises(ValueError):
+            parse_rate(bad)
+
+@pytest.mark.parametrize("make_backend", [
+    lambda tmp_path: MemoryRateLimitBackend(),
+    lambda tmp_path: SQLiteRateLimitBackend(str(tmp_path / "buckets.sqlite3")),
+])
+def test_token_bucket_refills(make_backend, tmp_path):
+    backend = make_backend(tmp_path)
+    limit = RateLimit(2, 10.0)
+    assert backend.hit("k", limit, now=100.0) == 0
+    assert backend.hit("k", limit, now=100.0) == 0
+    assert backend.hit("k", limit, now=100.0) == pytest.approx(5.0)
+    assert backend.hit("other", limit, now=100.0) == 0
+    assert backend.hit("k", limit, now=105.0) == 0
+    backend.reset()
+    assert backend.hit("k", limit, now=105.0) == 0
+
+def test_sqlite_buckets_are_shared(tmp_path):
+    path = str(tmp_path / "buckets.sqlite3")
+    first, second = SQLiteRateLimitBackend(path), SQLiteRateLimitBackend(path)
+    limit = RateLimit(1, 60.0)
+    assert first.hit("k", limit, now=0.0) == 0
+    assert second.hit("k", limit, now=1.0) == pytest.approx(59.0)
+    first.close()
+    second.close()
+
+def test_limiter_keys_by_ip_and_email():
+    limiter = RateLimiter(MemoryRateLimitBackend(), {"/login/": "3/minute"}, {"/login/": "2/minute"})
+    assert [limiter.check("/login/", "1.1.1.1", "a@example.com", now=0.0) for _ in range(2)] == [0, 0]
+    assert limiter.check("/login/", "2.2.2.2", "a@example.com", now=0.0) > 0
+    assert limiter.check("/login/", "1.1.1.1", "b@example.com", now=0.0) == 0
+    assert limiter.check("/login/", "1.1.1.1", "c@example.com", now=0.0) > 0
+    assert not limiter.applies_to("/users/")
+
+def test_client_ip_trusts_configured_proxies():
+    limiter = RateLimiter(MemoryRateLimitBackend(), {}, {}, trusted_proxies=1)
+    assert limiter.client_ip("10.0.0.2", "6.6.6.6, 203.0.113.7") == "203.0.113.7"
+    assert limiter.client_ip("10.0.0.2", None) == "10.0.0.2"
+    limiter.trusted_proxies = 0
+    assert limiter.client_ip("10.0.0.2", "203.0.113.7") == "10.0.0.2"
+
+def test_extract_email():
+    assert extract_email("application/x-www-form-urlencoded", b"username=Ada%40Example.com&password=x") == "ada@example.com"
+    assert extract_email("application/json; charset=utf-8", b'{"email": "bob@example.com"}') == "bob@example.com"
+    assert extract_email("application/json", b"not json") is None
+    assert extract_email("text/plain", b"email=a@example.com") is None
+
+async def test_locked_sqlite_store_lets_requests_through(tmp_path):
+    path = str(tmp_path / "buckets.sqlite3")
+    limiter = RateLimiter(SQLiteRateLimitBackend(path), {"/login/": "1/minute"}, {})
+    app = RateLimitMiddleware(PlainTextResponse("ok"), limiter)
+    # Another worker holding the write lock for longer than the busy timeout.
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    try:
+        async with AsyncClient(app=app, base_url="http://testserver") as client:
+            started = time.monotonic()
+            responses = [await client.post("/login/") for _ in range(2)]
+            assert time.monotonic() - started < 2
+        assert [r.status_code for r in responses] == [200, 200]
+    finally:
+        other.execute("ROLLBACK")
+        other.close()
+    async with AsyncClient(app=app, base_url="http://testserver") as client:
+        assert [(await client.post("/login/")).status_code for _ in range(2)] == [200, 429]
+    limiter.close()
@@ -0,0 +1,42 @@
+from builtins import str
+import time
+from fastapi import FastAPI, HTTPException
+from httpx import AsyncClient
+from app.utils.read_your_writes import LAST_WRITE_COOKIE, ReadYourWritesMiddleware, last_write_at, reads_from_primary
+
+def make_app(window_seconds: float = 5.0):
+    app = FastAPI()
+
+    @app.get("/items")
+    async def read_items():
+        return {"primary": reads_from_primary()}
+
+    @app.post("/items")
+    async def write_item():
+        return {}
+
+    @app.post("/failing")
+    async def fail():
+        raise HTTPException(status_code=422, detail="invalid")
+
+    app.add_middleware(ReadYourWritesMiddleware, window_seconds=window_seconds)
+    return app
+
+def test_last_write_at_parses_the_cookie_header():
+    assert last_write_at(f"session=abc; {LAST_WRITE_COOKIE}=1700000000.5") == 1700000000.5
+    assert last_write_at("session=abc") is None
+    assert last_write_at(f"{LAST_WRITE_COOKIE}=soon") is None
+
+async def test_successful_writes_send_reads_to_the_primary():
+    async with AsyncClient(app=make_app(), base_url="http://testserver") as client:
+        assert (await client.get("/items")).json() == {"primary": False}
+        response = await client.post("/failing")
+        assert LAST_WRITE_COOKIE not in response.cookies
+        response = await client.post("/items")
+        assert "Max-Age=5" in response.headers["set-cookie"]
+        assert (await client.get("/items")).json() == {"primary": True}
+
+async def test_stale_write_stamp_is_ignored():
+    async with AsyncClient(app=make_app(), base_url="http://testserver") as client:
+        client.cookies.set(LAST_WRITE_COOKIE, str(time.time() - 60))
+        assert (await client.get("/items")).json() == {"primary": False}
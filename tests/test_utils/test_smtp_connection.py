@@ -1,7 +1,9 @@
 import pytest
 from app.utils.smtp_connection import SMTPClient
-from unittest.mock import patch
+from settings.config import settings
+from unittest.mock import MagicMock, patch
 import smtplib
+import threading
 
 def test_smtp_send_email_success():
     client = SMTPClient("smtp.example.com", 587, "user@example.com", "password")
@@ -35,4 +37,63 @@ def test_smtp_send_email_starttls_failure():
         with pytest.raises(Exception):
             client.send_email("Subject", "<b>Hi</b>", "to@example.com")
 
+@pytest.fixture
+def pooled_client():
+    SMTPClient.close_pools()
+    yield SMTPClient("smtp.example.com", 587, "user@example.com", "password")
+    SMTPClient.close_pools()
+
+@pytest.mark.asyncio
+async def test_smtp_send_email_async_reuses_connection(pooled_client):
+    with patch("smtplib.SMTP") as mock_smtp:
+        instance = mock_smtp.return_value
+        instance.has_extn.return_value = True
+        await pooled_client.send_email_async("Subject", "<b>Hi</b>", "one@example.com")
+        await pooled_client.send_email_async("Subject", "<b>Hi</b>", "two@example.com")
+        mock_smtp.assert_called_once()
+        instance.starttls.assert_called_once()
+        instance.login.assert_called_once_with("user@example.com", "password")
+        assert instance.sendmail.call_count == 2
+
+@pytest.mark.asyncio
+async def test_smtp_send_emails_async_batches_on_one_connection(pooled_client):
+    with patch("smtplib.SMTP") as mock_smtp:
+        emails = [("Subject", "<b>Hi</b>", f"user{i}@example.com") for i in range(5)]
+        await pooled_client.send_emails_async(emails)
+        mock_smtp.assert_called_once()
+        assert mock_smtp.return_value.sendmail.call_count == 5
+
+@pytest.mark.asyncio
+async def test_smtp_send_email_async_reconnects_after_disconnect(pooled_client):
+    with patch("smtplib.SMTP") as mock_smtp:
+        stale, fresh = MagicMock(), MagicMock()
+        stale.sendmail.side_effect = smtplib.SMTPServerDisconnected("gone")
+        mock_smtp.side_effect = [stale, fresh]
+        await pooled_client.send_email_async("Subject", "<b>Hi</b>", "to@example.com")
+        assert mock_smtp.call_count == 2
+        fresh.sendmail.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_smtp_send_email_async_skips_login_without_auth(pooled_client):
+    with patch("smtplib.SMTP") as mock_smtp:
+        mock_smtp.return_value.has_extn.return_value = False
+        await pooled_client.send_email_async("Subject", "<b>Hi</b>", "to@example.com")
+        mock_smtp.return_value.login.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_smtp_send_email_async_failure(pooled_client):
+    with patch("smtplib.SMTP") as mock_smtp:
+        mock_smtp.return_value.sendmail.side_effect = smtplib.SMTPException("fail")
+        with pytest.raises(smtplib.SMTPException):
+            await pooled_client.send_email_async("Subject", "<b>Hi</b>", "to@example.com")
+
+@pytest.mark.asyncio
+async def test_smtp_send_email_async_uses_dedicated_executor(pooled_client):
+    threads = []
+    with patch("smtplib.SMTP") as mock_smtp:
+        mock_smtp.return_value.sendmail.side_effect = lambda *args: threads.append(threading.current_thread().name)
+        await pooled_client.send_email_async("Subject", "<b>Hi</b>", "to@example.com")
+    assert len(threads) == 1 and threads[0].startswith("smtp")
+    assert pooled_client._get_pool()._executor._max_workers == settings.smtp_pool_size
+
 # Add more tests for error handling, connection errors, etc.
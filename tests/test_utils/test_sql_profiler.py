@@ -0,0 +1,87 @@
+from builtins import float, len, range
+import logging
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.dependencies import get_settings
+from app.utils.metrics import DB_QUERY_DURATION
+from app.utils.sql_profiler import SQLProfiler, SQLProfilerMiddleware
+
+@pytest.fixture
+def sqlite_engine():
+    engine = create_engine("sqlite://")
+    SQLProfiler.instrument(engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def profiler_settings():
+    yield SQLProfiler
+    SQLProfiler.configure()
+
+def test_profile_counts_statements(sqlite_engine):
+    with SQLProfiler.profile() as profile, sqlite_engine.connect() as connection:
+        for i in range(3):
+            connection.execute(text("SELECT :i"), {"i": i})
+        connection.execute(text("SELECT 42"))
+    assert profile.statement_count == 4
+    assert profile.db_seconds > 0
+    assert profile.repeated_statements(3) == [("SELECT ?", 3)]
+    assert SQLProfiler.current() is None
+
+def test_profiler_shares_the_metrics_timing_hook(sqlite_engine):
+    SQLProfiler.instrument(sqlite_engine)
+    assert len(sqlite_engine.dispatch.before_cursor_execute) == 1
+    assert len(sqlite_engine.dispatch.after_cursor_execute) == 1
+    before = DB_QUERY_DURATION.count("SELECT")
+    with SQLProfiler.profile() as profile, sqlite_engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    assert profile.statement_count == 1
+    assert DB_QUERY_DURATION.count("SELECT") == before + 1
+
+def test_slow_queries_are_logged(sqlite_engine, profiler_settings, caplog):
+    profiler_settings.configure(slow_query_seconds=0.0)
+    with caplog.at_level(logging.WARNING, logger="app.utils.sql_profiler"), sqlite_engine.connect() as connection:
+        connection.execute(text("SELECT :value"), {"value": "needle"})
+    assert "Slow query" in caplog.text
+    assert "needle" in caplog.text
+
+async def test_slow_select_plan_is_captured(profiler_settings, caplog):
+    database_url = get_settings().database_url
+    if make_url(database_url).get_backend_name() != "postgresql":
+        pytest.skip("plans are only captured on PostgreSQL")
+    profiler_settings.configure(slow_query_seconds=0.0, explain_slow_queries=True)
+    engine = create_async_engine(database_url)
+    SQLProfiler.instrument(engine)
+    try:
+        with caplog.at_level(logging.WARNING, logger="app.utils.sql_profiler"):
+            async with engine.connect() as connection:
+                result = await connection.execute(text("SELECT n FROM generate_series(1, 3) AS n WHERE n > :low"), {"low": 1})
+                assert result.scalars().all() == [2, 3]
+                await connection.execute(text("SELECT 1"))
+    finally:
+        await engine.dispose()
+    assert "Plan of slow query" in caplog.text
+    assert "Function Scan on generate_series" in caplog.text
+
+async def test_middleware_exposes_headers_and_flags_repeats(sqlite_engine, profiler_settings, caplog):
+    profiler_settings.configure(repeat_threshold=3)
+    app = FastAPI()
+
+    @app.get("/items")
+    def items():
+        with sqlite_engine.connect() as connection:
+            for i in range(3):
+                connection.execute(text("SELECT :i"), {"i": i})
+        return {}
+
+    app.add_middleware(SQLProfilerMiddleware, expose_headers=True)
+    with caplog.at_level(logging.WARNING, logger="app.utils.sql_profiler"):
+        async with AsyncClient(app=app, base_url="http://testserver") as client:
+            response = await client.get("/items")
+    assert response.headers["X-DB-Query-Count"] == "3"
+    assert float(response.headers["X-DB-Time-Ms"]) >= 0
+    assert "Possible N+1: GET /items executed the same statement 3 times" in caplog.text
@@ -1,3 +1,6 @@
+import os
+from unittest.mock import patch
+import markdown2
 import pytest
 from app.utils.template_manager import TemplateManager
 
@@ -53,4 +56,55 @@ def test_render_template_from_file_context_edge(tmp_path, monkeypatch):
     assert "Welcome!" in html
 
 
+def test_render_template_from_file_matches_uncompiled_output():
+    tm = TemplateManager()
+    context = {"name": "Ada", "verification_url": "http://example.com/verify/1/abc"}
+    html = tm.render_template_from_file("email_verification", **context)
+    full_markdown = "\n".join([
+        tm._read_template("header.md"),
+        tm._read_template("email_verification.md").format(**context),
+        tm._read_template("footer.md"),
+    ])
+    assert html == tm._apply_email_styles(markdown2.markdown(full_markdown))
+
+
+def test_render_template_from_file_compiles_once(tmp_path):
+    tm = TemplateManager()
+    tm.templates_dir = tmp_path
+    (tmp_path / "header.md").write_text("HEADER")
+    (tmp_path / "footer.md").write_text("FOOTER")
+    (tmp_path / "hello.md").write_text("Hello {name}, your code is {{literal}}")
+    with patch("app.utils.template_manager.markdown2.markdown", wraps=markdown2.markdown) as mock_markdown:
+        first = tm.render_template_from_file("hello", name="Alpha")
+        second = TemplateManager.__new__(TemplateManager)
+        second.templates_dir = tmp_path
+        assert second.render_template_from_file("hello", name="Omega") == first.replace("Alpha", "Omega")
+    mock_markdown.assert_called_once()
+    assert "{literal}" in first
+
+
+def test_render_template_from_file_recompiles_on_change(tmp_path):
+    tm = TemplateManager()
+    tm.templates_dir = tmp_path
+    (tmp_path / "header.md").write_text("HEADER")
+    (tmp_path / "footer.md").write_text("FOOTER")
+    body = tmp_path / "change.md"
+    body.write_text("Version one {name}")
+    assert "Version one" in tm.render_template_from_file("change", name="X")
+    body.write_text("Version two {name}")
+    os.utime(body, ns=(body.stat().st_atime_ns, body.stat().st_mtime_ns + 1_000_000))
+    assert "Version two" in tm.render_template_from_file("change", name="X")
+
+
+def test_render_template_from_file_escapes_values(tmp_path):
+    tm = TemplateManager()
+    tm.templates_dir = tmp_path
+    (tmp_path / "header.md").write_text("HEADER")
+    (tmp_path / "footer.md").write_text("FOOTER")
+    (tmp_path / "greet.md").write_text("Hi {name}")
+    html = tm.render_template_from_file("greet", name="<script>x</script>")
+    assert "<script>" not in html
+    assert "&lt;script&gt;" in html
+
+
 # Add more tests for error handling and edge cases as needed